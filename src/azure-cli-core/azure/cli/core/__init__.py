@@ -38,7 +38,7 @@ class AzCli(CLI):
             register_ids_argument, register_global_subscription_argument)
         from azure.cli.core.cloud import get_active_cloud
         from azure.cli.core.commands.transform import register_global_transforms
-        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX
 
         from knack.util import ensure_dir
 
@@ -53,6 +53,7 @@ class AzCli(CLI):
         ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
         CONFIG.load(os.path.join(azure_folder, 'az.json'))
         SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
+        INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
         self.cloud = get_active_cloud(self)
         logger.debug('Current cloud config:\n%s', str(self.cloud.name))
 
@@ -123,11 +124,7 @@ class MainCommandsLoader(CLICommandsLoader):
         from azure.cli.core.extension import (
             get_extensions, get_extension_path, get_extension_modname)
 
-        def _update_command_table_from_modules(args):
-            '''Loads command table(s)
-            When `module_name` is specified, only commands from that module will be loaded.
-            If the module is not found, all commands are loaded.
-            '''
+        def _get_installed_command_modules():
             installed_command_modules = []
             try:
                 mods_ns_pkg = import_module('azure.cli.command_modules')
@@ -136,10 +133,21 @@ class MainCommandsLoader(CLICommandsLoader):
                                              if modname not in BLACKLISTED_MODS]
             except ImportError as e:
                 logger.warning(e)
+            return installed_command_modules
+
+        def _add_to_command_index(kind, name, command_table):
+            for cmd_name in command_table:
+                entry = command_index_entries.setdefault(cmd_name.split()[0], {'modules': [], 'extensions': []})
+                if name not in entry[kind]:
+                    entry[kind].append(name)
 
-            logger.debug('Installed command modules %s', installed_command_modules)
+        def _update_command_table_from_modules(args, command_modules):
+            '''Loads command table(s)
+            Only the commands from `command_modules` will be loaded.
+            '''
+            logger.debug('Installed command modules %s', command_modules)
             cumulative_elapsed_time = 0
-            for mod in [m for m in installed_command_modules if m not in BLACKLISTED_MODS]:
+            for mod in [m for m in command_modules if m not in BLACKLISTED_MODS]:
                 try:
                     start_time = timeit.default_timer()
                     module_command_table, module_group_table = _load_module_command_loader(self, args, mod)
@@ -147,6 +155,7 @@ class MainCommandsLoader(CLICommandsLoader):
                         cmd.command_source = mod
                     self.command_table.update(module_command_table)
                     self.command_group_table.update(module_group_table)
+                    _add_to_command_index('modules', mod, module_command_table)
                     elapsed_time = timeit.default_timer() - start_time
                     logger.debug("Loaded module '%s' in %.3f seconds.", mod, elapsed_time)
                     cumulative_elapsed_time += elapsed_time
@@ -162,7 +171,7 @@ class MainCommandsLoader(CLICommandsLoader):
                          "(note: there's always an overhead with the first module loaded)",
                          cumulative_elapsed_time)
 
-        def _update_command_table_from_extensions(ext_suppressions):
+        def _update_command_table_from_extensions(ext_suppressions, extensions, extension_names=None):
 
             from azure.cli.core.extension.operations import check_version_compatibility
 
@@ -177,7 +186,8 @@ class MainCommandsLoader(CLICommandsLoader):
                         filtered_extensions.append(ext)
                 return filtered_extensions
 
-            extensions = get_extensions()
+            if extension_names is not None:
+                extensions = [ext for ext in extensions if ext.name in extension_names]
             if extensions:
                 logger.debug("Found %s extensions: %s", len(extensions), [e.name for e in extensions])
                 allowed_extensions = _handle_extension_suppressions(extensions)
@@ -209,6 +219,7 @@ class MainCommandsLoader(CLICommandsLoader):
 
                         self.command_table.update(extension_command_table)
                         self.command_group_table.update(extension_group_table)
+                        _add_to_command_index('extensions', ext_name, extension_command_table)
                         elapsed_time = timeit.default_timer() - start_time
                         logger.debug("Loaded extension '%s' in %.3f seconds.", ext_name, elapsed_time)
                     except Exception:  # pylint: disable=broad-except
@@ -245,16 +256,44 @@ class MainCommandsLoader(CLICommandsLoader):
                             res.append(sup)
             return res
 
-        _update_command_table_from_modules(args)
+        installed_command_modules = _get_installed_command_modules()
+        try:
+            extensions = get_extensions()
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to load extensions. Use --debug for more information.")
+            logger.debug(traceback.format_exc())
+            extensions = []
+
+        command_index = None
+        command_index_entries = {}
+        if args and not self.cli_ctx.data.get('completer_active', False) and \
+                self.cli_ctx.config.getboolean('core', 'use_command_index', fallback=True):
+            command_index = CommandIndex(self.cli_ctx, installed_command_modules, extensions)
+            index_result = command_index.get(args)
+            if index_result:
+                index_modules, index_extensions = index_result
+                _update_command_table_from_modules(args, index_modules)
+                try:
+                    # The index never contains suppressed extensions, so no suppressions need to be applied.
+                    _update_command_table_from_extensions([], extensions, index_extensions)
+                except Exception:  # pylint: disable=broad-except
+                    logger.warning("Unable to load extensions. Use --debug for more information.")
+                    logger.debug(traceback.format_exc())
+                return self.command_table
+
+        _update_command_table_from_modules(args, installed_command_modules)
         try:
             ext_suppressions = _get_extension_suppressions(self.loaders)
             # We always load extensions even if the appropriate module has been loaded
             # as an extension could override the commands already loaded.
-            _update_command_table_from_extensions(ext_suppressions)
+            _update_command_table_from_extensions(ext_suppressions, extensions)
         except Exception:  # pylint: disable=broad-except
             logger.warning("Unable to load extensions. Use --debug for more information.")
             logger.debug(traceback.format_exc())
 
+        if command_index and not command_index.is_valid():
+            command_index.update(command_index_entries)
+
         return self.command_table
 
     def load_arguments(self, command):
@@ -280,6 +319,67 @@ class MainCommandsLoader(CLICommandsLoader):
                 loader._update_command_definitions()  # pylint: disable=protected-access
 
 
+class CommandIndex(object):
+    """ Persisted map from a top-level command name to the command modules and extensions providing it.
+
+    The index is stamped with the CLI version, the cloud profile and the installed command modules and
+    extensions. Any change to these invalidates it and the next full load of the command table rebuilds it.
+    """
+
+    _INDEX_KEY = 'commandIndex'
+    _SIGNATURE_KEY = 'signature'
+
+    def __init__(self, cli_ctx, installed_command_modules, extensions):
+        from azure.cli.core._session import INDEX
+        self.index = INDEX
+        self.signature = {
+            'version': __version__,
+            'cloudProfile': cli_ctx.cloud.profile,
+            'commandModules': sorted(installed_command_modules),
+            'extensions': sorted(CommandIndex._get_extension_signature(ext) for ext in extensions)
+        }
+
+    @staticmethod
+    def _get_extension_signature(ext):
+        # the extension directory is recreated on `az extension add/update`, so its mtime tracks the version
+        from azure.cli.core.extension import get_extension_path
+        ext_path = ext.path or get_extension_path(ext.name)
+        try:
+            mtime = os.path.getmtime(ext_path)
+        except (OSError, TypeError):
+            mtime = None
+        return '{}:{}:{}'.format(ext.name, ext_path, mtime)
+
+    def is_valid(self):
+        return self.index.get(self._SIGNATURE_KEY) == self.signature
+
+    def get(self, args):
+        """ Returns a tuple of (command modules, extension names) owning the command in `args`, or None if
+        the command index cannot answer and the full command table must be loaded. """
+        top_command = args[0] if args else None
+        if not top_command or top_command.startswith('-'):
+            return None
+        if not self.is_valid():
+            logger.debug("Command index is missing or out of date.")
+            return None
+        entry = (self.index.get(self._INDEX_KEY) or {}).get(top_command)
+        if not entry:
+            logger.debug("Command '%s' not found in command index.", top_command)
+            return None
+        logger.debug("Command index found modules %s and extensions %s for '%s'",
+                     entry['modules'], entry['extensions'], top_command)
+        return entry['modules'], entry['extensions']
+
+    def update(self, command_index_entries):
+        self.index.data[self._SIGNATURE_KEY] = self.signature
+        self.index.data[self._INDEX_KEY] = command_index_entries
+        try:
+            self.index.save_with_retry()
+            logger.debug("Updated command index with %d top-level commands.", len(command_index_entries))
+        except (OSError, IOError):
+            logger.debug("Unable to save command index.", exc_info=True)
+
+
 class ModExtensionSuppress(object):  # pylint: disable=too-few-public-methods
 
     def __init__(self, mod_name, suppress_extension_name, suppress_up_to_version, reason=None, recommend_remove=False,
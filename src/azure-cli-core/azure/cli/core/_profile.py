@@ -6,12 +6,15 @@
 from __future__ import print_function
 
 import collections
+import datetime
 import errno
 import json
 import os
 import os.path
 import re
 import string
+import threading
+import time
 from copy import deepcopy
 from enum import Enum
 from six.moves import BaseHTTPServer
@@ -55,6 +58,17 @@ _TOKEN_ENTRY_TOKEN_TYPE = 'tokenType'
 # This naming is no good, but can't change because xplat-cli does so.
 _ACCESS_TOKEN = 'accessToken'
 _REFRESH_TOKEN = 'refreshToken'
+_TOKEN_ENTRY_EXPIRES_ON = 'expiresOn'
+
+# Tokens kept in memory are acquired again this long before they expire
+_TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+# Subscriptions of the tenants of a user are discovered concurrently. The tenants of a user are remembered in the
+# session file for `_TENANTS_CACHE_TTL` seconds when refreshing the accounts.
+_TENANT_DISCOVERY_WORKERS = 8
+_TENANT_DISCOVERY_TIMEOUT = 30
+_TENANTS_SESSION_KEY = 'tenants'
+_TENANTS_CACHE_TTL = 3600
 
 TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE = ['familyName',
                                           'givenName',
@@ -546,16 +560,19 @@ class Profile(object):
                                                                               account[_TENANT_ID],
                                                                               use_cert_sn_issuer)
 
+            def _retrieve_external_tenant_token(sub):
+                if user_type == _USER:
+                    return self._creds_cache.retrieve_token_for_user(username_or_sp_id, sub[_TENANT_ID], resource)
+                use_cert_sn_issuer = account[_USER_ENTITY].get(_SERVICE_PRINCIPAL_CERT_SN_ISSUER_AUTH)
+                return self._creds_cache.retrieve_token_for_service_principal(username_or_sp_id, resource,
+                                                                              sub[_TENANT_ID], use_cert_sn_issuer)
+
             def _retrieve_tokens_from_external_tenants():
-                external_tokens = []
-                for s in external_tenants_info:
-                    if user_type == _USER:
-                        external_tokens.append(self._creds_cache.retrieve_token_for_user(
-                            username_or_sp_id, s[_TENANT_ID], resource))
-                    else:
-                        external_tokens.append(self._creds_cache.retrieve_token_for_service_principal(
-                            username_or_sp_id, resource, s[_TENANT_ID], resource))
-                return external_tokens
+                if len(external_tenants_info) == 1:
+                    return [_retrieve_external_tenant_token(external_tenants_info[0])]
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=len(external_tenants_info)) as executor:
+                    return list(executor.map(_retrieve_external_tenant_token, external_tenants_info))
 
             from azure.cli.core.adal_authentication import AdalAuthentication
             auth_object = AdalAuthentication(_retrieve_token,
@@ -636,7 +653,8 @@ class Profile(object):
                                                                                        self._ad_resource_uri)
                 else:
                     subscriptions = subscription_finder.find_from_user_account(user_name, None, None,
-                                                                               self._ad_resource_uri)
+                                                                               self._ad_resource_uri,
+                                                                               use_cached_tenants=True)
             except Exception as ex:  # pylint: disable=broad-except
                 logger.warning("Refreshing for '%s' failed with an error '%s'. The existing accounts were not "
                                "modified. You can run 'az login' later to explicitly refresh them", user_name, ex)
@@ -761,7 +779,7 @@ class SubscriptionFinder(object):
         self._arm_client_factory = create_arm_client_factory
         self.tenants = []
 
-    def find_from_user_account(self, username, password, tenant, resource):
+    def find_from_user_account(self, username, password, tenant, resource, use_cached_tenants=False):
         context = self._create_auth_context(tenant)
         if password:
             token_entry = context.acquire_token_with_username_password(resource, username, password, _CLIENT_ID)
@@ -773,7 +791,7 @@ class SubscriptionFinder(object):
         self.user_id = token_entry[_TOKEN_ENTRY_USER_ID]
 
         if tenant is None:
-            result = self._find_using_common_tenant(token_entry[_ACCESS_TOKEN], resource)
+            result = self._find_using_common_tenant(token_entry[_ACCESS_TOKEN], resource, use_cached_tenants)
         else:
             result = self._find_using_specific_tenant(tenant, token_entry[_ACCESS_TOKEN])
         return result
@@ -828,16 +846,20 @@ class SubscriptionFinder(object):
         token_cache = self._adal_token_cache if use_token_cache else None
         return self._auth_context_factory(self.cli_ctx, tenant, token_cache)
 
-    def _find_using_common_tenant(self, access_token, resource):
+    def _find_using_common_tenant(self, access_token, resource, use_cached_tenants=False):
         import adal
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         from msrest.authentication import BasicTokenAuthentication
+        from msrest.exceptions import ClientRequestError
 
-        all_subscriptions = []
-        token_credential = BasicTokenAuthentication({'access_token': access_token})
-        client = self._arm_client_factory(token_credential)
-        tenants = client.tenants.list()
-        for t in tenants:
-            tenant_id = t.tenant_id
+        tenant_ids = self._load_cached_tenant_ids() if use_cached_tenants else None
+        if tenant_ids is None:
+            token_credential = BasicTokenAuthentication({'access_token': access_token})
+            client = self._arm_client_factory(token_credential)
+            tenant_ids = [t.tenant_id for t in client.tenants.list()]
+            self._cache_tenant_ids(tenant_ids)
+
+        def _find_in_tenant(tenant_id):
             temp_context = self._create_auth_context(tenant_id)
             try:
                 temp_credentials = temp_context.acquire_token(resource, self.user_id, _CLIENT_ID)
@@ -845,26 +867,66 @@ class SubscriptionFinder(object):
                 # because user creds went through the 'common' tenant, the error here must be
                 # tenant specific, like the account was disabled. For such errors, we will continue
                 # with other tenants.
-                logger.warning("Failed to authenticate '%s' due to error '%s'", t, ex)
-                continue
-            subscriptions = self._find_using_specific_tenant(
-                tenant_id,
-                temp_credentials[_ACCESS_TOKEN])
-            all_subscriptions.extend(subscriptions)
+                logger.warning("Failed to authenticate '%s' due to error '%s'", tenant_id, ex)
+                return None
+            try:
+                return self._list_subscriptions(tenant_id, temp_credentials[_ACCESS_TOKEN],
+                                                timeout=_TENANT_DISCOVERY_TIMEOUT)
+            except ClientRequestError as ex:
+                logger.warning("Failed to list the subscriptions of tenant '%s' due to error '%s'", tenant_id, ex)
+                return None
+
+        subscriptions_by_tenant = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(len(tenant_ids), _TENANT_DISCOVERY_WORKERS))) as executor:
+            futures = {executor.submit(_find_in_tenant, tenant_id): tenant_id for tenant_id in tenant_ids}
+            for future in as_completed(futures):
+                tenant_id = futures[future]
+                subscriptions_by_tenant[tenant_id] = future.result()
+                if subscriptions_by_tenant[tenant_id] is not None:
+                    logger.info("Found %s subscription(s) in tenant '%s'",
+                                len(subscriptions_by_tenant[tenant_id]), tenant_id)
 
+        all_subscriptions = []
+        for tenant_id in tenant_ids:
+            if subscriptions_by_tenant[tenant_id] is not None:
+                all_subscriptions.extend(subscriptions_by_tenant[tenant_id])
+                self.tenants.append(tenant_id)
         return all_subscriptions
 
+    def _get_tenants_cache_key(self):
+        return '{} {}'.format(self.cli_ctx.cloud.name, self.user_id)
+
+    def _load_cached_tenant_ids(self):
+        from azure.cli.core._session import SESSION
+        entry = (SESSION.get(_TENANTS_SESSION_KEY) or {}).get(self._get_tenants_cache_key())
+        if entry and entry['timestamp'] + _TENANTS_CACHE_TTL > time.time():
+            logger.debug("Using the tenants of '%s' cached in the session.", self.user_id)
+            return entry['tenantIds']
+        return None
+
+    def _cache_tenant_ids(self, tenant_ids):
+        from azure.cli.core._session import SESSION
+        cached_tenants = SESSION[_TENANTS_SESSION_KEY]
+        cached_tenants[self._get_tenants_cache_key()] = {'timestamp': time.time(), 'tenantIds': tenant_ids}
+        SESSION.save_with_retry()
+
     def _find_using_specific_tenant(self, tenant, access_token):
+        all_subscriptions = self._list_subscriptions(tenant, access_token)
+        self.tenants.append(tenant)
+        return all_subscriptions
+
+    def _list_subscriptions(self, tenant, access_token, timeout=None):
         from msrest.authentication import BasicTokenAuthentication
 
         token_credential = BasicTokenAuthentication({'access_token': access_token})
         client = self._arm_client_factory(token_credential)
+        if timeout:
+            client.config.connection.timeout = timeout
         subscriptions = client.subscriptions.list()
         all_subscriptions = []
         for s in subscriptions:
             setattr(s, 'tenant_id', tenant)
             all_subscriptions.append(s)
-        self.tenants.append(tenant)
         return all_subscriptions
 
 
@@ -883,6 +945,8 @@ class CredsCache(object):
         self._should_flush_to_disk = False
         self._async_persist = async_persist
         self._ctx = cli_ctx
+        self._tokens = {}
+        self._tokens_lock = threading.Lock()
         if async_persist:
             import atexit
             atexit.register(self.flush_to_disk)
@@ -907,8 +971,24 @@ class CredsCache(object):
 
                 all_creds.extend(self._service_principal_creds)
                 cred_file.write(json.dumps(all_creds))
+            self._should_flush_to_disk = False
+
+    def _retrieve_token(self, key, acquire_token):
+        """ Returns the token acquired for the key earlier in the process unless it is about to expire. """
+        with self._tokens_lock:
+            token = self._tokens.get(key)
+        if token and not _is_token_expiring(token[2]):
+            return token
+        token = acquire_token()
+        with self._tokens_lock:
+            self._tokens[key] = token
+        return token
 
     def retrieve_token_for_user(self, username, tenant, resource):
+        return self._retrieve_token((username, tenant, resource),
+                                    lambda: self._acquire_token_for_user(username, tenant, resource))
+
+    def _acquire_token_for_user(self, username, tenant, resource):
         context = self._auth_ctx_factory(self._ctx, tenant, cache=self.adal_token_cache)
         token_entry = context.acquire_token(resource, username, _CLIENT_ID)
         if not token_entry:
@@ -920,6 +1000,11 @@ class CredsCache(object):
         return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
 
     def retrieve_token_for_service_principal(self, sp_id, resource, tenant, use_cert_sn_issuer=False):
+        return self._retrieve_token((sp_id, tenant, resource, bool(use_cert_sn_issuer)),
+                                    lambda: self._acquire_token_for_service_principal(sp_id, resource, tenant,
+                                                                                      use_cert_sn_issuer))
+
+    def _acquire_token_for_service_principal(self, sp_id, resource, tenant, use_cert_sn_issuer=False):
         self.load_adal_token_cache()
         matched = [x for x in self._service_principal_creds if sp_id == x[_SERVICE_PRINCIPAL_ID] and
                    tenant == x[_SERVICE_PRINCIPAL_TENANT]]
@@ -982,6 +1067,8 @@ class CredsCache(object):
 
     def remove_cached_creds(self, user_or_sp):
         state_changed = False
+        with self._tokens_lock:
+            self._tokens = {k: v for k, v in self._tokens.items() if k[0] != user_or_sp}
         # clear AAD tokens
         tokens = self.adal_token_cache.find({_TOKEN_ENTRY_USER_ID: user_or_sp})
         if tokens:
@@ -1000,10 +1087,26 @@ class CredsCache(object):
             self.persist_cached_creds()
 
     def remove_all_cached_creds(self):
+        with self._tokens_lock:
+            self._tokens = {}
         # we can clear file contents, but deleting it is simpler
         _delete_file(self._token_file)
 
 
+def _is_token_expiring(token_entry):
+    expires_on = token_entry.get(_TOKEN_ENTRY_EXPIRES_ON) if isinstance(token_entry, dict) else None
+    if not expires_on:
+        return True
+    for time_format in ['%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S']:
+        try:
+            # ADAL records the expiry in local time
+            return datetime.datetime.strptime(expires_on, time_format) - _TOKEN_REFRESH_MARGIN < \
+                datetime.datetime.now()
+        except ValueError:
+            pass
+    return True
+
+
 class ServicePrincipalAuth(object):
 
     def __init__(self, password_arg_value, use_cert_sn_issuer=None):
@@ -23,30 +23,46 @@ except AttributeError:  # in Python 2.7
     t_JSONDecodeError = ValueError
 
 
+_DELETED = object()
+_LOCK_TIMEOUT = 10
+_LOCK_CHECK_INTERVAL = 0.1
+
+
 class Session(collections.MutableMapping):
     """
     A simple dict-like class that is backed by a JSON file.
 
     All direct modifications will save the file. Indirect modifications should
     be followed by a call to `save_with_retry` or `save`.
+
+    The file is replaced atomically and written under an advisory lock. The top-level keys modified since the file was
+    read, directly or not, are applied on top of its latest content, so that concurrent processes do not lose each
+    other's changes. With `write_behind`, direct modifications are batched and saved by `flush`, which runs at exit.
     """
 
-    def __init__(self, encoding=None):
+    def __init__(self, encoding=None, write_behind=False):
         super(Session, self).__init__()
         self.filename = None
         self.data = {}
         self._encoding = encoding if encoding else 'utf-8-sig'
+        self._write_behind = write_behind
+        self._base = {}
+        self._mtime = None
+        if write_behind:
+            import atexit
+            atexit.register(self.flush)
 
     def load(self, filename, max_age=0):
         self.filename = filename
         self.data = {}
+        self._base = {}
         try:
             if max_age > 0:
                 st = os.stat(self.filename)
-                if st.st_mtime + max_age < time.clock():
-                    self.save()
-            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
-                self.data = json.load(f)
+                if st.st_mtime + max_age < time.time():
+                    with self._lock():
+                        self._write()
+            self.data = self._read()
         except (OSError, IOError, t_JSONDecodeError) as load_exception:
             # OSError / IOError should imply file not found issues which are expected on fresh runs (e.g. on build
             # agents or new systems). A parse error indicates invalid/bad data in the file. We do not wish to warn
@@ -61,19 +77,88 @@ class Session(collections.MutableMapping):
             self.save()
 
     def save(self):
+        """ Saves the modifications on top of the latest content of the file. """
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            with self._lock():
+                if self._has_file_changed():
+                    self._merge_into_file_content()
+                self._write()
 
     def save_with_retry(self, retries=5):
+        self._retry(self.save, retries)
+
+    def flush(self, retries=5):
+        """ Saves the pending modifications, if any. """
+        if self.filename and self._get_changes():
+            self._retry(self.save, retries)
+
+    def _get_changes(self):
+        """ Returns the top-level keys modified since the file was read or written, with _DELETED for removed keys. """
+        changes = {key: value for key, value in self.data.items() if key not in self._base or self._base[key] != value}
+        changes.update((key, _DELETED) for key in self._base if key not in self.data)
+        return changes
+
+    def _merge_into_file_content(self):
+        changes = self._get_changes()
+        try:
+            data = self._read()
+        except (OSError, IOError, t_JSONDecodeError):
+            data = {}
+        for key, value in data.items():
+            # keep the objects handed out for the keys nobody changed, so that later indirect modifications count
+            if key in self.data and key not in changes and self._base.get(key) == value:
+                data[key] = self.data[key]
+        for key, value in changes.items():
+            if value is _DELETED:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        self.data = data
+
+    @staticmethod
+    def _retry(func, retries):
         for _ in range(retries - 1):
             try:
-                self.save()
+                func()
                 break
             except OSError:
                 time.sleep(0.1)
         else:
-            self.save()
+            func()
+
+    def _read(self):
+        import copy
+        with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+            data = json.load(f)
+            self._mtime = os.fstat(f.fileno()).st_mtime
+        self._base = copy.deepcopy(data)
+        return data
+
+    def _write(self):
+        import copy
+        import tempfile
+        directory, name = os.path.split(os.path.abspath(self.filename))
+        fd, temp_path = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+        os.close(fd)
+        try:
+            with codecs_open(temp_path, 'w', encoding=self._encoding) as f:
+                json.dump(self.data, f)
+            _replace_file(temp_path, self.filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._mtime = os.path.getmtime(self.filename)
+        self._base = copy.deepcopy(self.data)
+
+    def _has_file_changed(self):
+        try:
+            return os.path.getmtime(self.filename) != self._mtime
+        except OSError:
+            return self._mtime is not None
+
+    def _lock(self):
+        return _FileLock(self.filename + '.lock')
 
     def get(self, key, default=None):
         return self.data.get(key, default)
@@ -83,11 +168,13 @@ class Session(collections.MutableMapping):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.save_with_retry()
+        if not self._write_behind:
+            self.flush()
 
     def __delitem__(self, key):
         del self.data[key]
-        self.save_with_retry()
+        if not self._write_behind:
+            self.flush()
 
     def __iter__(self):
         return iter(self.data)
@@ -96,6 +183,47 @@ class Session(collections.MutableMapping):
         return len(self.data)
 
 
+def _replace_file(source, destination):
+    try:
+        os.replace(source, destination)
+    except AttributeError:  # in Python 2.7
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+class _FileLock(object):
+    """
+    An advisory lock on a file shared by the Azure CLI processes. The lock is retried for up to _LOCK_TIMEOUT seconds,
+    after which the session file is written unlocked with a warning, as it is still replaced atomically. The empty
+    lock file is left in place: removing it would let a process lock a new file while another one holds the old one.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = None
+
+    def __enter__(self):
+        try:
+            import portalocker
+        except ImportError:
+            return self
+        lock = portalocker.Lock(self.filename, timeout=_LOCK_TIMEOUT, check_interval=_LOCK_CHECK_INTERVAL,
+                                fail_when_locked=False)
+        try:
+            lock.acquire()
+            self._lock = lock
+        except Exception as ex:  # pylint: disable=broad-except
+            get_logger(__name__).warning("Failed to lock %s within %s seconds, writing without the lock: %s",
+                                         self.filename, _LOCK_TIMEOUT, ex)
+        return self
+
+    def __exit__(self, *args):
+        if self._lock:
+            self._lock.release()
+            self._lock = None
+
+
 # ACCOUNT contains subscriptions information
 ACCOUNT = Session()
 
@@ -103,4 +231,7 @@ ACCOUNT = Session()
 CONFIG = Session()
 
 # SESSION provides read-write session variables
-SESSION = Session()
+SESSION = Session(write_behind=True)
+
+# INDEX maps top-level command names to the command modules and extensions that provide them
+INDEX = Session()
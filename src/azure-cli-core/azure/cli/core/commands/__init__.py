@@ -8,6 +8,7 @@
 from __future__ import print_function
 
 import argparse
+from collections import OrderedDict
 import datetime
 import json
 import logging as logs
@@ -15,6 +16,7 @@ import os
 import re
 import sys
 import time
+import timeit
 import copy
 from importlib import import_module
 import six
@@ -26,7 +28,9 @@ from azure.cli.core.commands.constants import (
 from azure.cli.core.commands.parameters import (
     AzArgumentContext, patch_arg_make_required, patch_arg_make_optional)
 from azure.cli.core.extension import get_extension
-from azure.cli.core.util import get_command_type_kwarg, read_file_content, get_arg_list, poller_classes
+from azure.cli.core.util import (get_command_type_kwarg, read_file_content, get_arg_list, poller_classes,
+                                 get_throttling_retry_after, RequestThrottle, MAX_THROTTLING_BACKOFF,
+                                 DEFAULT_MAX_CONCURRENT_IDS)
 import azure.cli.core.telemetry as telemetry
 
 from knack.arguments import CLICommandArgument
@@ -45,6 +49,10 @@ except AttributeError:  # in Python 2.7
 
 logger = get_logger(__name__)
 
+_TEMPLATE_PROGRESS_EVENT_FIELDS = \
+    'eventDataId,operationId,eventTimestamp,resourceId,resourceType,status,eventName,properties'
+_TEMPLATE_PROGRESS_LOOKBACK = 300
+
 
 def _explode_list_args(args):
     '''Iterate through each attribute member of args and create a copy with
@@ -433,6 +441,11 @@ class AzCliCommandInvoker(CommandInvoker):
                                   EVENT_INVOKER_FILTER_RESULT)
         from azure.cli.core.commands.events import EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE
 
+        from azure.cli.core.commands.client_factory import MgmtServiceClientCache
+
+        # management clients are reused within this invocation, including by the validators and completers
+        self.data['mgmt_service_client_cache'] = MgmtServiceClientCache()
+
         # TODO: Can't simply be invoked as an event because args are transformed
         args = _pre_command_table_create(self.cli_ctx, args)
 
@@ -540,7 +553,8 @@ class AzCliCommandInvoker(CommandInvoker):
         for expanded_arg in _explode_list_args(parsed_args):
             cmd_copy = copy.copy(cmd)
             cmd_copy.cli_ctx = copy.copy(cmd.cli_ctx)
-            cmd_copy.cli_ctx.data = copy.deepcopy(cmd.cli_ctx.data)
+            # the values are shared between the jobs, which only rebind their own keys such as subscription_id
+            cmd_copy.cli_ctx.data = dict(cmd.cli_ctx.data)
             expanded_arg.cmd = expanded_arg._cmd = cmd_copy
 
             if hasattr(expanded_arg, '_subscription'):
@@ -550,18 +564,23 @@ class AzCliCommandInvoker(CommandInvoker):
             jobs.append((expanded_arg, cmd_copy))
 
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
-        if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
-            results, exceptions = self._run_jobs_serially(jobs, ids)
-        else:
-            results, exceptions = self._run_jobs_concurrently(jobs, ids)
+        results, exceptions = [], []
+        try:
+            for result, exception, id_arg in self._iter_job_results(jobs, ids):
+                if exception is None:
+                    results.append(result)
+                    continue
+                exceptions.append((exception, id_arg))
+                if len(jobs) > 1:
+                    logger.warning('%s: "%s"', id_arg, str(exception))
+        finally:
+            self.data['mgmt_service_client_cache'].close()
 
         # handle exceptions
         if len(exceptions) == 1 and not results:
             ex, id_arg = exceptions[0]
             raise ex
         if exceptions:
-            for exception, id_arg in exceptions:
-                logger.warning('%s: "%s"', id_arg, str(exception))
             if not results:
                 return CommandResultItem(None, exit_code=1, error=CLIError('Encountered more than one exception.'))
             logger.warning('Encountered more than one exception.')
@@ -596,7 +615,7 @@ class AzCliCommandInvoker(CommandInvoker):
             if transform_op:
                 result = transform_op(result)
 
-            if _is_poller(result):
+            if _is_poller(result) or (isinstance(result, list) and result and all(_is_poller(r) for r in result)):
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
             elif _is_paged(result):
                 result = list(result)
@@ -611,28 +630,66 @@ class AzCliCommandInvoker(CommandInvoker):
                 return CommandResultItem(None, exit_code=1, error=ex)
             six.reraise(*sys.exc_info())
 
-    def _run_jobs_serially(self, jobs, ids):
-        results, exceptions = [], []
-        for job, id_arg in zip(jobs, ids):
-            expanded_arg, cmd_copy = job
-            try:
-                results.append(self._run_job(expanded_arg, cmd_copy))
-            except(Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                exceptions.append((ex, id_arg))
-        return results, exceptions
-
-    def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        tasks, results, exceptions = [], [], []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for expanded_arg, cmd_copy in jobs:
-                tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
+    def _run_throttled_job(self, expanded_arg, cmd_copy, id_arg, throttle):
+        """
+        Run a job once the jobs of the command resume. The clients retry throttled requests themselves, honoring
+        Retry-After. A job that is still throttled fails, and the jobs that did not start yet are held back.
+        """
+        throttle.wait()
+        start_time = timeit.default_timer()
+        try:
+            result = self._run_job(expanded_arg, cmd_copy)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.debug('Job for "%s" failed in %.3f seconds', id_arg, timeit.default_timer() - start_time)
+            retry_after = get_throttling_retry_after(ex)
+            if retry_after is not None:
+                retry_after = retry_after or MAX_THROTTLING_BACKOFF
+                logger.warning('%s: request throttled, holding back the other jobs for %s seconds', id_arg, retry_after)
+                throttle.pause(retry_after)
+            raise
+        logger.debug('Job for "%s" finished in %.3f seconds', id_arg, timeit.default_timer() - start_time)
+        return result
+
+    def _iter_job_results(self, jobs, ids):
+        """
+        Run the jobs, up to `core.max_concurrent_ids` at a time, and yield a (result, exception, id) tuple for each
+        of them in the order of the ids, as soon as it and the jobs before it are done.
+        """
+        throttle = RequestThrottle()
+        max_workers = 1
+        if len(jobs) > 1 and not self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False):
+            max_workers = self.cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=DEFAULT_MAX_CONCURRENT_IDS)
+
+        if max_workers <= 1:
+            for (expanded_arg, cmd_copy), id_arg in zip(jobs, ids):
                 try:
-                    results.append(task.result())
+                    yield self._run_throttled_job(expanded_arg, cmd_copy, id_arg, throttle), None, id_arg
                 except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
-        return results, exceptions
+                    yield None, ex, id_arg
+            return
+
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _get_job_result(task, id_arg):
+            try:
+                return task.result(), None, id_arg
+            except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                return None, ex, id_arg
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for (expanded_arg, cmd_copy), id_arg in zip(jobs, ids):
+                    pending.append((executor.submit(self._run_throttled_job, expanded_arg, cmd_copy, id_arg,
+                                                    throttle), id_arg))
+                    if len(pending) >= max_workers * 2:
+                        yield _get_job_result(*pending.popleft())
+                while pending:
+                    yield _get_job_result(*pending.popleft())
+            finally:
+                for task, _ in pending:
+                    task.cancel()
 
     def resolve_warnings(self, cmd, parsed_args):
         self._resolve_preview_and_deprecation_warnings(cmd, parsed_args)
@@ -749,80 +806,115 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         self.poller_done_interval_ms = poller_done_interval_ms
         self.deploy_dict = {}
         self.last_progress_report = datetime.datetime.now()
+        self.last_event_timestamp = None
+        self.seen_events = {}
 
-    def _delay(self):
-        time.sleep(self.poller_done_interval_ms / 1000.0)
+    def _delay(self, poller=None):
+        timeout = self.poller_done_interval_ms / 1000.0
+        if poller is None:
+            time.sleep(timeout)
+            return
+        # returns as soon as the operation completes; its failure is raised by result()
+        try:
+            poller.wait(timeout=timeout)
+        except Exception:  # pylint: disable=broad-except
+            pass
 
     def _generate_template_progress(self, correlation_id):  # pylint: disable=no-self-use
         """ gets the progress for template deployments """
         from azure.cli.core.commands.client_factory import get_mgmt_service_client
         from azure.mgmt.monitor import MonitorManagementClient
 
-        if correlation_id is not None:  # pylint: disable=too-many-nested-blocks
+        if correlation_id is not None:
             formatter = "eventTimestamp ge {}"
 
-            end_time = datetime.datetime.utcnow()
-            start_time = end_time - datetime.timedelta(seconds=DEFAULT_QUERY_TIME_RANGE)
-            odata_filters = formatter.format(start_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            # only query the events logged since the last progress report. The activity log can make an event
+            # available after later ones, so the last few minutes are queried again and the events seen are skipped
+            if self.last_event_timestamp is None:
+                start_time = datetime.datetime.utcnow() - datetime.timedelta(seconds=DEFAULT_QUERY_TIME_RANGE)
+            else:
+                start_time = self.last_event_timestamp - datetime.timedelta(seconds=_TEMPLATE_PROGRESS_LOOKBACK)
+            self.seen_events = {key: timestamp for key, timestamp in self.seen_events.items()
+                                if timestamp >= start_time}
+            odata_filters = formatter.format(start_time.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
 
             odata_filters = "{} and {} eq '{}'".format(odata_filters, 'correlationId', correlation_id)
 
             activity_log = get_mgmt_service_client(
-                self.cli_ctx, MonitorManagementClient).activity_logs.list(filter=odata_filters)
-
-            results = []
-            max_events = 50  # default max value for events in list_activity_log
-            for index, item in enumerate(activity_log):
-                if index < max_events:
-                    results.append(item)
-                else:
-                    break
-
-            if results:
-                for event in results:
-                    update = False
-                    long_name = event.resource_id.split('/')[-1]
-                    if long_name not in self.deploy_dict:
-                        self.deploy_dict[long_name] = {}
-                        update = True
-                    deploy_values = self.deploy_dict[long_name]
-
-                    checked_values = {
-                        str(event.resource_type.value): 'type',
-                        str(event.status.value): 'status value',
-                        str(event.event_name.value): 'request',
-                    }
-                    try:
-                        checked_values[str(event.properties.get('statusCode', ''))] = 'status'
-                    except AttributeError:
-                        pass
-
-                    if deploy_values.get('timestamp', None) is None or \
-                            event.event_timestamp > deploy_values.get('timestamp'):
-                        for value in checked_values:
-                            if deploy_values.get(checked_values[value], None) != value:
-                                update = True
-                            deploy_values[checked_values[value]] = value
-                        deploy_values['timestamp'] = event.event_timestamp
-
-                        # don't want to show the timestamp
-                        json_val = deploy_values.copy()
-                        json_val.pop('timestamp', None)
-                        status_val = deploy_values.get('status value', None)
-                        if status_val and status_val != 'Started':
-                            result = deploy_values['status value'] + ': ' + long_name
-                            result += ' (' + deploy_values.get('type', '') + ')'
-
-                            if update:
-                                logger.info(result)
+                self.cli_ctx, MonitorManagementClient).activity_logs.list(filter=odata_filters,
+                                                                          select=_TEMPLATE_PROGRESS_EVENT_FIELDS)
+
+            for event in sorted(activity_log, key=lambda e: e.event_timestamp):
+                timestamp = event.event_timestamp.replace(tzinfo=None)
+                event_key = event.event_data_id or (event.operation_id, event.event_name.value, event.status.value)
+                if event_key in self.seen_events:
+                    continue
+                self.seen_events[event_key] = timestamp
+                if self.last_event_timestamp is None or timestamp > self.last_event_timestamp:
+                    self.last_event_timestamp = timestamp
+                progress = self._update_template_progress(event)
+                if progress:
+                    self._report_template_progress(progress)
+
+    def _update_template_progress(self, event):
+        """ records the event in `deploy_dict` and returns the progress of the resource if it changed """
+        update = False
+        long_name = event.resource_id.split('/')[-1]
+        if long_name not in self.deploy_dict:
+            self.deploy_dict[long_name] = {}
+            update = True
+        deploy_values = self.deploy_dict[long_name]
+
+        checked_values = {
+            str(event.resource_type.value): 'type',
+            str(event.status.value): 'status value',
+            str(event.event_name.value): 'request',
+        }
+        try:
+            checked_values[str(event.properties.get('statusCode', ''))] = 'status'
+        except AttributeError:
+            pass
+
+        if deploy_values.get('timestamp', None) is not None and \
+                event.event_timestamp <= deploy_values.get('timestamp'):
+            return None
+
+        for value in checked_values:
+            if deploy_values.get(checked_values[value], None) != value:
+                update = True
+            deploy_values[checked_values[value]] = value
+        deploy_values['timestamp'] = event.event_timestamp
+
+        status_val = deploy_values.get('status value', None)
+        if not update or not status_val or status_val == 'Started':
+            return None
+        return OrderedDict([
+            ('timestamp', event.event_timestamp.isoformat()),
+            ('name', long_name),
+            ('type', deploy_values.get('type', '')),
+            ('status', status_val),
+            ('statusCode', deploy_values.get('status')),
+            ('request', deploy_values.get('request'))])
+
+    def _report_template_progress(self, progress):
+        if self.cli_ctx.config.get('core', 'template_progress_format', fallback='text').lower() == 'json':
+            logger.info(json.dumps(progress))
+        else:
+            logger.info('%s: %s (%s)', progress['status'], progress['name'], progress['type'])
 
     def __call__(self, poller):
+        """
+        Waits for the operation and returns its result. Given a list of pollers, waits for all the operations
+        together on the calling thread and returns the list of their results.
+        """
         import colorama
         from msrest.exceptions import ClientException
 
         # https://github.com/azure/azure-cli/issues/3555
         colorama.init()
 
+        wait_all = isinstance(poller, list)
+        pollers = poller if wait_all else [poller]
         correlation_message = ''
         self.cli_ctx.get_progress_controller().begin()
         correlation_id = None
@@ -830,8 +922,13 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         cli_logger = get_logger()  # get CLI logger which has the level set through command lines
         is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
 
-        while not poller.done():
-            self.cli_ctx.get_progress_controller().add(message='Running')
+        pending = [p for p in pollers if not p.done()]
+        while pending:
+            poller = pending[0]
+            message = 'Running'
+            if wait_all:
+                message = 'Running ({} of {} operations done)'.format(len(pollers) - len(pending), len(pollers))
+            self.cli_ctx.get_progress_controller().add(message=message)
             try:
                 # pylint: disable=protected-access
                 correlation_id = json.loads(
@@ -849,23 +946,26 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
                 except Exception as ex:  # pylint: disable=broad-except
                     logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
             try:
-                self._delay()
+                self._delay(poller)
             except KeyboardInterrupt:
                 self.cli_ctx.get_progress_controller().stop()
                 logger.error('Long-running operation wait cancelled.  %s', correlation_message)
                 raise
+            pending = [p for p in pending if not p.done()]
 
-        try:
-            result = poller.result()
-        except ClientException as client_exception:
-            from azure.cli.core.commands.arm import handle_long_running_operation_exception
-            self.cli_ctx.get_progress_controller().stop()
-            handle_long_running_operation_exception(client_exception)
+        results = []
+        for poller in pollers:
+            try:
+                results.append(poller.result())
+            except ClientException as client_exception:
+                from azure.cli.core.commands.arm import handle_long_running_operation_exception
+                self.cli_ctx.get_progress_controller().stop()
+                handle_long_running_operation_exception(client_exception)
 
         self.cli_ctx.get_progress_controller().end()
         colorama.deinit()
 
-        return result
+        return results if wait_all else results[0]
 
 
 # pylint: disable=too-few-public-methods
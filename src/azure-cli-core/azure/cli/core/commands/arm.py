@@ -27,6 +27,7 @@ from knack.util import todict, CLIError
 
 logger = get_logger(__name__)
 EXCLUDED_NON_CLIENT_PARAMS = list(set(EXCLUDED_PARAMS) - set(['self', 'client']))
+WAIT_INITIAL_INTERVAL = 2
 
 
 # pylint:disable=too-many-lines
@@ -590,7 +591,8 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
         )
         cmd_args['interval'] = CLICommandArgument(
             'interval', options_list=['--interval'], default=30, arg_group=group_name, type=int,
-            help='polling interval in seconds'
+            help='maximum polling interval in seconds. Polling starts every {} seconds and backs off up to it'
+                 .format(WAIT_INITIAL_INTERVAL)
         )
         cmd_args['deleted'] = CLICommandArgument(
             'deleted', options_list=['--deleted'], action='store_true', arg_group=group_name,
@@ -660,20 +662,25 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
 
         progress_indicator = context_copy.cli_ctx.get_progress_controller()
         progress_indicator.begin()
-        for _ in range(0, timeout, interval):
+        start_time = time.time()
+        delay = max(1, min(WAIT_INITIAL_INTERVAL, interval))
+        while True:
             try:
                 progress_indicator.add(message='Waiting')
                 instance = getter(**args)
                 if wait_for_exists:
                     progress_indicator.end()
                     return None
-                provisioning_state = get_provisioning_state(instance)
+                # getters accepting several ids, like `resource show`, return a list of instances
+                instances = instance if isinstance(instance, list) else [instance]
+                provisioning_states = [get_provisioning_state(i) for i in instances]
                 # until we have any needs to wait for 'Failed', let us bail out on this
-                if provisioning_state == 'Failed':
+                if 'Failed' in provisioning_states:
                     progress_indicator.stop()
                     raise CLIError('The operation failed')
-                if ((wait_for_created or wait_for_updated) and provisioning_state == 'Succeeded') or \
-                        custom_condition and bool(verify_property(instance, custom_condition)):
+                if ((wait_for_created or wait_for_updated) and
+                        all(state == 'Succeeded' for state in provisioning_states)) or \
+                        custom_condition and all(bool(verify_property(i, custom_condition)) for i in instances):
                     progress_indicator.end()
                     return None
             except ClientException as ex:
@@ -689,7 +696,11 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
                 progress_indicator.stop()
                 raise
 
-            time.sleep(interval)
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max(1, interval))
 
         progress_indicator.end()
         return CLIError('Wait operation timed-out after {} seconds'.format(timeout))
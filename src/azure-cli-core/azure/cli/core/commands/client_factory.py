@@ -119,6 +119,30 @@ def _get_mgmt_service_client(cli_ctx,
                              sdk_profile=None,
                              aux_subscriptions=None,
                              **kwargs):
+    client_cache = _get_mgmt_service_client_cache(cli_ctx)
+    if client_cache is not None:
+        # the command name and parameters are sent as headers by the clients
+        cache_key = (client_type, subscription_bound, subscription_id, api_version, base_url_bound, resource,
+                     repr(sdk_profile), tuple(aux_subscriptions or []), tuple(sorted(kwargs.items())),
+                     cli_ctx.data['command'], tuple(cli_ctx.data.get('safe_params') or []))
+        try:
+            hash(cache_key)
+        except TypeError:  # client arguments that cannot be compared, such as a dict
+            client_cache = None
+    if client_cache is not None:
+        return client_cache.get_or_create(cache_key, lambda: _create_mgmt_service_client(
+            cli_ctx, client_type, subscription_bound=subscription_bound, subscription_id=subscription_id,
+            api_version=api_version, base_url_bound=base_url_bound, resource=resource, sdk_profile=sdk_profile,
+            aux_subscriptions=aux_subscriptions, keep_alive=True, **kwargs))
+    return _create_mgmt_service_client(cli_ctx, client_type, subscription_bound=subscription_bound,
+                                       subscription_id=subscription_id, api_version=api_version,
+                                       base_url_bound=base_url_bound, resource=resource, sdk_profile=sdk_profile,
+                                       aux_subscriptions=aux_subscriptions, **kwargs)
+
+
+def _create_mgmt_service_client(cli_ctx, client_type, subscription_bound=True, subscription_id=None,
+                                api_version=None, base_url_bound=True, resource=None, sdk_profile=None,
+                                aux_subscriptions=None, keep_alive=False, **kwargs):
     from azure.cli.core._profile import Profile
     logger.debug('Getting management service client client_type=%s', client_type.__name__)
     resource = resource or cli_ctx.cloud.endpoints.active_directory_resource_id
@@ -142,10 +166,50 @@ def _get_mgmt_service_client(cli_ctx,
         client = client_type(cred, **client_kwargs)
 
     configure_common_settings(cli_ctx, client)
+    if keep_alive:
+        # keep the HTTP session, and its connection pool, open between requests
+        client.config.keep_alive = True
 
     return client, subscription_id
 
 
+class MgmtServiceClientCache(object):
+    """
+    The management clients created during a command invocation. Clients created with the same arguments are reused by
+    the --ids jobs of the invocation, sharing their credentials and HTTP connections.
+    """
+
+    def __init__(self):
+        import threading
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = factory()
+            else:
+                logger.debug('Reusing management service client client_type=%s', key[0].__name__)
+            return self._clients[key]
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client, _ in clients.values():
+            try:
+                client._client.close()  # pylint: disable=protected-access
+            except AttributeError:
+                pass
+
+
+def _get_mgmt_service_client_cache(cli_ctx):
+    invocation = getattr(cli_ctx, 'invocation', None)
+    try:
+        return invocation.data['mgmt_service_client_cache']
+    except (AttributeError, KeyError, TypeError):
+        return None
+
+
 def get_data_service_client(cli_ctx, service_type, account_name, account_key, connection_string=None,
                             sas_token=None, socket_timeout=None, token_credential=None, endpoint_suffix=None):
     logger.debug('Getting data service client service_type=%s', service_type.__name__)
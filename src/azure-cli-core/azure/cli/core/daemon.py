@@ -0,0 +1,328 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Daemon mode for Azure CLI
+
+- Server: `python -m azure.cli.core.daemon` keeps a warm AzCli instance resident, with all command modules imported,
+          the session files parsed and the credentials cache loaded. Commands are served one at a time over a Unix
+          domain socket located in the configuration directory. The server exits after being idle for
+          `--idle-timeout` seconds.
+
+- Client: when AZURE_CORE_USE_DAEMON is set to true, `az` forwards its arguments, environment, working directory and
+          (if referenced through `@-`) stdin to the server and streams back stdout, stderr and the exit code. If no
+          server is listening, the command runs in-process as usual. AZURE_CORE_DAEMON_SOCKET overrides the socket
+          path used by both sides.
+
+- Protocol: every frame is a 4-byte big-endian length followed by a UTF-8 JSON object. The client sends a single
+            request frame, the server answers with any number of {'stream': ..., 'data': ...} frames and a final
+            {'exit_code': ...} frame.
+"""
+
+from __future__ import print_function
+
+import io
+import json
+import os
+import socket
+import struct
+import sys
+
+DAEMON_SOCKET_NAME = 'daemon.sock'
+DEFAULT_IDLE_TIMEOUT = 3600
+_FRAME_HEADER = struct.Struct('>I')
+_TRUE_VALUES = ('1', 'yes', 'true', 'on')
+
+
+def get_daemon_socket_path():
+    from azure.cli.core._environment import get_config_dir
+    return os.environ.get('AZURE_CORE_DAEMON_SOCKET', None) or os.path.join(get_config_dir(), DAEMON_SOCKET_NAME)
+
+
+def is_daemon_client_enabled():
+    from knack.completion import ARGCOMPLETE_ENV_NAME
+    if not hasattr(socket, 'AF_UNIX') or ARGCOMPLETE_ENV_NAME in os.environ:
+        return False
+    return os.environ.get('AZURE_CORE_USE_DAEMON', '').lower() in _TRUE_VALUES
+
+
+def _send_frame(sock, obj):
+    payload = json.dumps(obj).encode('utf-8')
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise EOFError('Connection closed by peer.')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock):
+    size, = _FRAME_HEADER.unpack(_recv_exactly(sock, _FRAME_HEADER.size))
+    return json.loads(_recv_exactly(sock, size).decode('utf-8'))
+
+
+class _SocketStream(object):
+    """ A write-only text stream forwarding everything written to it to the daemon client. """
+
+    encoding = 'utf-8'
+
+    def __init__(self, sock, name):
+        self._sock = sock
+        self.name = name
+
+    def write(self, data):
+        if data:
+            if isinstance(data, bytes):
+                data = data.decode(self.encoding, 'replace')
+            _send_frame(self._sock, {'stream': self.name, 'data': data})
+        return len(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def isatty(self):  # pylint: disable=no-self-use
+        return False
+
+    def fileno(self):  # pylint: disable=no-self-use
+        raise io.UnsupportedOperation('fileno')
+
+
+def run_daemon_client(args):
+    """ Runs the command on the daemon. Returns its exit code, or None if no daemon is listening. """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(get_daemon_socket_path())
+    except (socket.error, IOError):
+        sock.close()
+        return None
+
+    stdin = None
+    if any('@-' in arg for arg in args) and not sys.stdin.isatty():
+        stdin = sys.stdin.read()
+
+    streams = {'stdout': sys.stdout, 'stderr': sys.stderr}
+    try:
+        _send_frame(sock, {'argv': args, 'env': dict(os.environ), 'cwd': os.getcwd(), 'stdin': stdin})
+        while True:
+            frame = _recv_frame(sock)
+            if 'exit_code' in frame:
+                return frame['exit_code']
+            stream = streams[frame['stream']]
+            stream.write(frame['data'])
+            stream.flush()
+    except (socket.error, IOError, EOFError, ValueError) as ex:
+        print('The connection to the Azure CLI daemon was lost: {}'.format(ex), file=sys.stderr)
+        return 1
+    finally:
+        sock.close()
+
+
+class AzDaemonServer(object):
+    """ Serves `az` commands on a Unix domain socket using a single warm AzCli instance. """
+
+    def __init__(self, socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        import copy
+        from azure.cli.core import get_default_cli
+        import azure.cli.core.telemetry as telemetry
+        from knack.completion import ARGCOMPLETE_ENV_NAME
+
+        self.socket_path = socket_path or get_daemon_socket_path()
+        self.idle_timeout = idle_timeout
+        self.cli = get_default_cli()
+        telemetry.set_application(self.cli, ARGCOMPLETE_ENV_NAME)
+        self._initial_data = copy.deepcopy(self.cli.data)
+        self._file_mtimes = {}
+
+    def warm_up(self):
+        """ Imports every command module and extension so that subsequent commands skip module imports. """
+        from knack.log import get_logger
+        from azure.cli.core import MainCommandsLoader
+        try:
+            MainCommandsLoader(self.cli).load_command_table(None)
+        except Exception:  # pylint: disable=broad-except
+            get_logger(__name__).debug('Failed to warm up the command table.', exc_info=True)
+
+    def serve_forever(self):
+        from knack.log import get_logger
+        from knack.util import CLIError
+        logger = get_logger(__name__)
+
+        if not hasattr(socket, 'AF_UNIX'):
+            raise CLIError('The Azure CLI daemon requires Unix domain socket support.')
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise CLIError('An Azure CLI daemon is already listening on {}'.format(self.socket_path))
+            except (socket.error, IOError):
+                os.remove(self.socket_path)  # stale socket left behind by a daemon that did not exit cleanly
+            finally:
+                probe.close()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # the socket is created accessible to its owner only, so that no other user can connect before chmod
+            old_umask = os.umask(0o177)
+            try:
+                listener.bind(self.socket_path)
+            finally:
+                os.umask(old_umask)
+            os.chmod(self.socket_path, 0o600)
+            listener.listen(16)
+            listener.settimeout(self.idle_timeout or None)
+            self._record_file_mtimes()
+            logger.warning('Azure CLI daemon listening on %s', self.socket_path)
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    logger.warning('Azure CLI daemon idle for %s seconds. Exiting.', self.idle_timeout)
+                    break
+                conn.settimeout(None)
+                try:
+                    self._handle_connection(conn)
+                except Exception:  # pylint: disable=broad-except
+                    logger.debug('Failed to serve daemon request.', exc_info=True)
+                finally:
+                    conn.close()
+        finally:
+            listener.close()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+
+    def _handle_connection(self, conn):
+        request = _recv_frame(conn)
+        saved_streams = sys.stdin, sys.stdout, sys.stderr
+        saved_environ = dict(os.environ)
+        saved_cwd = os.getcwd()
+        try:
+            os.environ.clear()
+            os.environ.update(request['env'])
+            os.chdir(request['cwd'])
+            sys.stdin = io.StringIO(request.get('stdin') or u'')
+            sys.stdout = _SocketStream(conn, 'stdout')
+            sys.stderr = _SocketStream(conn, 'stderr')
+            exit_code = self._invoke(request['argv'])
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            os.chdir(saved_cwd)
+        _send_frame(conn, {'exit_code': exit_code})
+
+    def _invoke(self, args):
+        import azure.cli.core.telemetry as telemetry
+
+        self._refresh_cli_state()
+        exit_code = 1
+        telemetry.start(mode='daemon')
+        try:
+            exit_code = self.cli.invoke(args, out_file=sys.stdout)
+            if exit_code:
+                telemetry.set_failure()
+            else:
+                telemetry.set_success()
+        except KeyboardInterrupt:
+            telemetry.set_user_fault('keyboard interrupt')
+        except SystemExit as ex:  # some code directly call sys.exit
+            exit_code = ex.code if ex.code is not None else 1
+            if not isinstance(exit_code, int):
+                print(exit_code, file=sys.stderr)
+                exit_code = 1
+        finally:
+            self.cli.logging.end_cmd_metadata_logging(exit_code)
+            telemetry.flush()
+            self._persist_state()
+        return exit_code
+
+    def _refresh_cli_state(self):
+        """ Resets the per-command state of the resident AzCli and reloads files changed by other processes. """
+        import copy
+        import logging
+        from knack.log import CLI_LOGGER_NAME
+        from azure.cli.core._config import ENV_VAR_PREFIX
+        from azure.cli.core._profile import Profile
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX
+        from azure.cli.core.cloud import get_active_cloud
+
+        self.cli.data = copy.deepcopy(self._initial_data)
+        self.cli.config = self.cli.config_cls(config_dir=self.cli.config.config_dir,
+                                              config_env_var_prefix=ENV_VAR_PREFIX)
+        self.cli.progress_controller = None
+        self.cli.result = None
+
+        # console handlers are bound to the streams of the previous command and carry its verbosity
+        for logger_name in [None, CLI_LOGGER_NAME]:
+            logger = logging.getLogger(logger_name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+        for session in [ACCOUNT, CONFIG, SESSION, INDEX]:
+            if self._has_file_changed(session.filename):
+                session.load(session.filename)
+        if self._has_file_changed(self._get_token_file()):
+            Profile._global_creds_cache = None  # pylint: disable=protected-access
+
+        self.cli.cloud = get_active_cloud(self.cli)
+
+    def _persist_state(self):
+        from azure.cli.core._profile import Profile
+        from azure.cli.core._session import SESSION
+        creds_cache = Profile._global_creds_cache  # pylint: disable=protected-access
+        if creds_cache:
+            creds_cache.flush_to_disk()
+        SESSION.flush()
+        self._record_file_mtimes()
+
+    def _record_file_mtimes(self):
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX
+        for filename in [s.filename for s in [ACCOUNT, CONFIG, SESSION, INDEX]] + [self._get_token_file()]:
+            self._file_mtimes[filename] = self._get_mtime(filename)
+
+    def _has_file_changed(self, filename):
+        return bool(filename) and self._file_mtimes.get(filename) != self._get_mtime(filename)
+
+    @staticmethod
+    def _get_mtime(filename):
+        try:
+            return os.path.getmtime(filename)
+        except (OSError, TypeError):
+            return None
+
+    @staticmethod
+    def _get_token_file():
+        from azure.cli.core._environment import get_config_dir
+        return os.environ.get('AZURE_ACCESS_TOKEN_FILE', None) or os.path.join(get_config_dir(), 'accessTokens.json')
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='python -m azure.cli.core.daemon',
+                                     description='Serve Azure CLI commands from a long-lived process.')
+    parser.add_argument('--socket', help='Path of the Unix domain socket to listen on.')
+    parser.add_argument('--idle-timeout', type=int, default=DEFAULT_IDLE_TIMEOUT,
+                        help='Exit after this many seconds without a command. 0 to never exit.')
+    parsed_args = parser.parse_args(args)
+
+    server = AzDaemonServer(socket_path=parsed_args.socket, idle_timeout=parsed_args.idle_timeout)
+    server.warm_up()
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
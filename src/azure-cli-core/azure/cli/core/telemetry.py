@@ -229,7 +229,7 @@ def flush():
 
     # flush out current information
     _session.end_time = datetime.datetime.utcnow()
-    save(get_config_dir(), _session.generate_payload())
+    save(get_config_dir(), _session.generate_payload(), in_process=_session.mode == 'daemon')
 
     # reset session fields, retaining correlation id and application
     _session.__init__(correlation_id=_session.correlation_id, application=_session.application)
@@ -120,5 +120,139 @@ class TestApplication(unittest.TestCase):
         os.remove(f.name)
 
 
+class TestIdsJobs(unittest.TestCase):
+
+    def setUp(self):
+        from azure.cli.core.commands import AzCliCommandInvoker
+        cli = DummyCli()
+        self.invoker = AzCliCommandInvoker(cli_ctx=cli, parser_cls=cli.parser_cls,
+                                           commands_loader_cls=cli.commands_loader_cls, help_cls=cli.help_cls)
+
+    def test_concurrent_jobs_keep_the_order_of_the_ids(self):
+        import time
+
+        def _run_job(expanded_arg, _):
+            time.sleep(0.01 * (5 - expanded_arg))
+            if expanded_arg == 2:
+                raise CLIError('job 2 failed')
+            return expanded_arg
+
+        jobs = [(i, None) for i in range(6)]
+        ids = ['id{}'.format(i) for i in range(6)]
+        with mock.patch.object(self.invoker, '_run_job', side_effect=_run_job):
+            job_results = list(self.invoker._iter_job_results(jobs, ids))
+        self.assertEqual([(result, str(ex) if ex else None, id_arg) for result, ex, id_arg in job_results],
+                         [(0, None, 'id0'), (1, None, 'id1'), (None, 'job 2 failed', 'id2'), (3, None, 'id3'),
+                          (4, None, 'id4'), (5, None, 'id5')])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_throttled_jobs_hold_back_the_other_jobs(self, sleep):
+        throttled = mock.MagicMock()
+        throttled.response.status_code = 429
+        throttled.response.headers = {'Retry-After': '7'}
+
+        class ThrottledError(Exception):
+            response = throttled.response
+
+        calls = []
+
+        def _run_job(expanded_arg, _):
+            calls.append(expanded_arg)
+            if expanded_arg == 1:
+                raise ThrottledError()
+            return expanded_arg
+
+        with mock.patch.object(self.invoker, '_run_job', side_effect=_run_job), \
+                mock.patch.dict('os.environ', {'AZURE_CORE_DISABLE_CONCURRENT_IDS': 'true'}):
+            job_results = list(self.invoker._iter_job_results([(0, None), (1, None), (2, None)],
+                                                              ['id0', 'id1', 'id2']))
+        # the throttled job is not run again, it is up to the client to retry the request
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual([result for result, _, _ in job_results], [0, None, 2])
+        self.assertIsInstance(job_results[1][1], ThrottledError)
+        self.assertTrue(6 < sleep.call_args[0][0] <= 7)
+
+
+class _FakePoller(object):
+    def __init__(self, result, delay, exception=None):
+        import threading
+        self._result = result
+        self._exception = exception
+        self._done = threading.Event()
+        threading.Timer(delay, self._done.set).start()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        if self._exception:
+            raise self._exception
+
+    def result(self):
+        self._done.wait()
+        if self._exception:
+            raise self._exception
+        return self._result
+
+
+class TestLongRunningOperation(unittest.TestCase):
+
+    def test_wait_for_multiple_pollers(self):
+        import time
+        from azure.cli.core.commands import LongRunningOperation
+
+        pollers = [_FakePoller('a', 0.2), _FakePoller('b', 0.05), _FakePoller('c', 0.3)]
+        start = time.time()
+        results = LongRunningOperation(DummyCli(), poller_done_interval_ms=10000.0)(pollers)
+        # returns when the slowest operation completes rather than after a polling interval
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(results, ['a', 'b', 'c'])
+        self.assertEqual(LongRunningOperation(DummyCli())(_FakePoller('d', 0)), 'd')
+
+    def test_wait_for_multiple_pollers_failure(self):
+        from msrest.exceptions import ClientException
+        from azure.cli.core.commands import LongRunningOperation
+
+        pollers = [_FakePoller('a', 0.05), _FakePoller(None, 0.01, exception=ClientException('operation failed'))]
+        with self.assertRaises(CLIError) as context:
+            LongRunningOperation(DummyCli(), poller_done_interval_ms=10.0)(pollers)
+        self.assertIn('operation failed', str(context.exception))
+
+    @mock.patch('azure.cli.core.commands.client_factory.get_mgmt_service_client', autospec=True)
+    def test_template_progress_queries_recent_events(self, get_client):
+        import datetime
+        from azure.cli.core.commands import LongRunningOperation
+
+        def _event(name, status, minute):
+            event = mock.MagicMock()
+            event.event_data_id = '{}-{}'.format(name, status)
+            event.event_timestamp = datetime.datetime(2019, 5, 1, 10, minute)
+            event.resource_id = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/' + name
+            event.resource_type.value = 'Microsoft.Network/virtualNetworks'
+            event.status.value = status
+            event.event_name.value = 'EndRequest'
+            event.properties = {'statusCode': 'Created'}
+            return event
+
+        activity_logs = get_client.return_value.activity_logs
+        # vnet3 is only made available by the activity log after the events that followed it
+        activity_logs.list.side_effect = [[_event('vnet2', 'Succeeded', 3), _event('vnet1', 'Started', 1)],
+                                          [_event('vnet2', 'Succeeded', 3), _event('vnet1', 'Succeeded', 5),
+                                           _event('vnet3', 'Succeeded', 2)]]
+        operation = LongRunningOperation(DummyCli())
+        reported = []
+        with mock.patch.dict('sys.modules', {'azure.mgmt.monitor': mock.MagicMock()}), \
+                mock.patch.object(operation, '_report_template_progress', side_effect=reported.append):
+            operation._generate_template_progress('correlation')
+            operation._generate_template_progress('correlation')
+
+        self.assertEqual([(p['name'], p['status']) for p in reported],
+                         [('vnet2', 'Succeeded'), ('vnet3', 'Succeeded'), ('vnet1', 'Succeeded')])
+        second_filter = activity_logs.list.call_args_list[1][1]['filter']
+        self.assertIn("eventTimestamp ge 2019-05-01T09:58:00.000000Z and correlationId eq 'correlation'", second_filter)
+        self.assertIn('eventTimestamp', activity_logs.list.call_args[1]['select'])
+
+
 if __name__ == '__main__':
     unittest.main()
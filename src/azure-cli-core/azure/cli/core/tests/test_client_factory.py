@@ -0,0 +1,56 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+import mock
+
+from azure.cli.core.commands.client_factory import get_mgmt_service_client, MgmtServiceClientCache
+from azure.cli.core.mock import DummyCli
+from azure.cli.core.profiles import ResourceType
+
+
+class TestMgmtServiceClientCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cli = DummyCli()
+        self.cli.invocation = mock.MagicMock()
+        self.cli.invocation.data = {'mgmt_service_client_cache': MgmtServiceClientCache()}
+
+    @mock.patch('azure.cli.core._profile.Profile.get_login_credentials', autospec=True)
+    def test_clients_are_reused_within_an_invocation(self, get_login_credentials):
+        get_login_credentials.side_effect = lambda _, subscription_id=None, **kwargs: (
+            mock.MagicMock(), subscription_id or 'default-sub', 'tenant')
+
+        client = get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES)
+        self.assertIs(get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES), client)
+        self.assertTrue(client.config.keep_alive)
+        self.assertEqual(get_login_credentials.call_count, 1)
+
+        # a different subscription or api version gets its own client
+        other_sub_client = get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES,
+                                                   subscription_id='other-sub')
+        self.assertIsNot(other_sub_client, client)
+        self.assertEqual(other_sub_client.config.subscription_id, 'other-sub')
+        self.assertIsNot(get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES,
+                                                 api_version='2017-05-10'), client)
+        self.assertEqual(get_login_credentials.call_count, 3)
+
+        # clients are not reused across invocations
+        self.cli.invocation.data['mgmt_service_client_cache'].close()
+        self.assertIsNot(get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES), client)
+
+    @mock.patch('azure.cli.core._profile.Profile.get_login_credentials', autospec=True)
+    def test_clients_are_not_cached_outside_an_invocation(self, get_login_credentials):
+        get_login_credentials.return_value = (mock.MagicMock(), 'sub', 'tenant')
+        self.cli.invocation = None
+
+        client = get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES)
+        self.assertIsNot(get_mgmt_service_client(self.cli, ResourceType.MGMT_RESOURCE_RESOURCES), client)
+        self.assertFalse(client.config.keep_alive)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -220,6 +220,57 @@ class TestCommandRegistration(unittest.TestCase):
         self.assertTrue(isinstance(ext2.command_source, ExtensionCommandSource))
         self.assertTrue(ext2.command_source.overrides_command)
 
+    def test_command_index(self):
+        from azure.cli.core._session import Session
+        from azure.cli.core.commands import AzCliCommand
+
+        installed_modules = ['hello', 'extra']
+        loaded_modules = []
+
+        def _mock_iter_modules(_):
+            return [(None, mod, None) for mod in installed_modules]
+
+        def _mock_load_command_loader(loader, args, name, prefix):
+            loaded_modules.append(name)
+            command_loader = AzCommandsLoader(cli_ctx=loader.cli_ctx)
+            cmd_name = '{} list'.format(name)
+            command_loader.command_table = {cmd_name: AzCliCommand(command_loader, cmd_name, None)}
+            loader.loaders.append(command_loader)
+            return command_loader.command_table, {}
+
+        with mock.patch('importlib.import_module', TestCommandRegistration._mock_import_lib), \
+                mock.patch('pkgutil.iter_modules', _mock_iter_modules), \
+                mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader), \
+                mock.patch('azure.cli.core.extension.get_extensions', lambda: []), \
+                mock.patch('azure.cli.core._session.INDEX', Session()):
+            cli = DummyCli()
+
+            # the first run loads every module and builds the index
+            cmd_tbl = MainCommandsLoader(cli).load_command_table(['hello', 'list'])
+            self.assertEqual(sorted(loaded_modules), ['extra', 'hello'])
+            self.assertEqual(sorted(cmd_tbl), ['extra list', 'hello list'])
+
+            # subsequent runs only load the module owning the command
+            del loaded_modules[:]
+            cmd_tbl = MainCommandsLoader(cli).load_command_table(['hello', 'list'])
+            self.assertEqual(loaded_modules, ['hello'])
+            self.assertEqual(list(cmd_tbl), ['hello list'])
+
+            # unknown commands and bare invocations fall back to loading everything
+            for args in [['unknown'], ['--help'], None]:
+                del loaded_modules[:]
+                MainCommandsLoader(cli).load_command_table(args)
+                self.assertEqual(sorted(loaded_modules), ['extra', 'hello'])
+
+            # installing a new module invalidates the index
+            installed_modules.append('other')
+            del loaded_modules[:]
+            MainCommandsLoader(cli).load_command_table(['hello', 'list'])
+            self.assertEqual(sorted(loaded_modules), ['extra', 'hello', 'other'])
+            del loaded_modules[:]
+            MainCommandsLoader(cli).load_command_table(['other', 'list'])
+            self.assertEqual(loaded_modules, ['other'])
+
     def test_argument_with_overrides(self):
 
         global_vm_name_type = CLIArgumentType(
@@ -0,0 +1,94 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from azure.cli.core.daemon import (_send_frame, _recv_frame, _SocketStream, AzDaemonServer, is_daemon_client_enabled)
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'requires Unix domain sockets')
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.server_sock, self.client_sock = socket.socketpair()
+
+    def tearDown(self):
+        self.server_sock.close()
+        self.client_sock.close()
+
+    def test_frame_round_trip(self):
+        _send_frame(self.client_sock, {'argv': ['vm', 'list'], 'stdin': u'\u00e9' * 10000})
+        frame = _recv_frame(self.server_sock)
+        self.assertEqual(frame['argv'], ['vm', 'list'])
+        self.assertEqual(frame['stdin'], u'\u00e9' * 10000)
+
+    def test_socket_stream(self):
+        stream = _SocketStream(self.server_sock, 'stderr')
+        stream.write('hello ')
+        stream.write(b'world')
+        stream.write('')
+        self.assertFalse(stream.isatty())
+        self.assertEqual(_recv_frame(self.client_sock), {'stream': 'stderr', 'data': 'hello '})
+        self.assertEqual(_recv_frame(self.client_sock), {'stream': 'stderr', 'data': 'world'})
+
+    @mock.patch('azure.cli.core.get_default_cli', mock.MagicMock())
+    def test_handle_connection(self):
+        server = AzDaemonServer(socket_path='unused')
+        observed = {}
+
+        def _invoke(args):
+            observed['env'] = os.environ.get('AZ_DAEMON_TEST')
+            observed['stdin'] = sys.stdin.read()
+            print('result for {}'.format(' '.join(args)))
+            return 3
+
+        cwd = os.getcwd()
+        _send_frame(self.client_sock, {'argv': ['group', 'show'], 'env': {'AZ_DAEMON_TEST': 'yes'},
+                                       'cwd': os.path.dirname(cwd), 'stdin': 'piped'})
+        with mock.patch.object(server, '_invoke', _invoke):
+            server._handle_connection(self.server_sock)
+
+        self.assertEqual(_recv_frame(self.client_sock), {'stream': 'stdout', 'data': 'result for group show'})
+        self.assertEqual(_recv_frame(self.client_sock), {'stream': 'stdout', 'data': '\n'})
+        self.assertEqual(_recv_frame(self.client_sock), {'exit_code': 3})
+        self.assertEqual(observed, {'env': 'yes', 'stdin': 'piped'})
+        # the daemon's own process state is restored after each command
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertNotIn('AZ_DAEMON_TEST', os.environ)
+
+    @mock.patch('azure.cli.core.get_default_cli', mock.MagicMock())
+    def test_socket_is_private_when_bound(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        server = AzDaemonServer(socket_path=os.path.join(temp_dir, 'd.sock'), idle_timeout=0.01)
+        modes = []
+        real_chmod = os.chmod
+
+        def _chmod(path, mode):
+            modes.append(stat.S_IMODE(os.stat(path).st_mode))
+            real_chmod(path, mode)
+
+        with mock.patch('os.chmod', _chmod), mock.patch.object(server, '_record_file_mtimes'):
+            server.serve_forever()
+        self.assertEqual(modes, [0o600])
+        self.assertFalse(os.path.exists(server.socket_path))
+
+    def test_daemon_client_opt_in(self):
+        with mock.patch.dict('os.environ', {'AZURE_CORE_USE_DAEMON': 'true'}):
+            self.assertTrue(is_daemon_client_enabled())
+        with mock.patch.dict('os.environ', {'AZURE_CORE_USE_DAEMON': 'false'}):
+            self.assertFalse(is_daemon_client_enabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import logging
+import sys
+import unittest
+
+import mock
+
+from azure.cli.core import AzCommandsLoader
+from azure.cli.core.mock import DummyCli
+
+
+class ProvisionedTestObject(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, provisioning_state):
+        self.provisioning_state = provisioning_state
+
+
+def _prepare_test_loader(states):
+
+    class GenericWaitTestCommandsLoader(AzCommandsLoader):
+
+        def load_command_table(self, args):
+            super(GenericWaitTestCommandsLoader, self).load_command_table(args)
+
+            from azure.cli.core.commands import CliCommandType
+
+            def my_wait_get():
+                state = states.pop(0)
+                if isinstance(state, list):
+                    return [ProvisionedTestObject(s) for s in state]
+                return ProvisionedTestObject(state)
+
+            test_type = CliCommandType(operations_tmpl='{}#{{}}'.format(__name__))
+            setattr(sys.modules[__name__], my_wait_get.__name__, my_wait_get)
+            with self.command_group('', test_type) as g:
+                g.wait_command('genwait', getter_name='my_wait_get')
+
+            return self.command_table
+    return GenericWaitTestCommandsLoader
+
+
+class GenericWaitTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger().setLevel(logging.ERROR)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_generic_wait_backs_off(self, sleep):
+        states = ['Creating'] * 6 + ['Succeeded']
+        cli = DummyCli(commands_loader_cls=_prepare_test_loader(states))
+        self.assertEqual(cli.invoke('genwait --created --interval 10'.split()), 0)
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [2, 4, 8, 10, 10, 10])
+        self.assertEqual(states, [])
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_generic_wait_for_several_instances(self, sleep):
+        states = [['Succeeded', 'Creating'], ['Succeeded', 'Succeeded']]
+        cli = DummyCli(commands_loader_cls=_prepare_test_loader(states))
+        self.assertEqual(cli.invoke('genwait --created'.split()), 0)
+        self.assertEqual(sleep.call_count, 1)
+
+        states = [['Succeeded', 'Failed']]
+        cli = DummyCli(commands_loader_cls=_prepare_test_loader(states))
+        self.assertEqual(cli.invoke('genwait --created'.split()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
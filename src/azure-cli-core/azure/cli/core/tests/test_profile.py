@@ -17,6 +17,7 @@ from adal import AdalError
 from azure.mgmt.resource.subscriptions.models import \
     (SubscriptionState, Subscription, SubscriptionPolicies, SpendingLimit)
 
+from azure.cli.core._session import Session
 from azure.cli.core._profile import (Profile, CredsCache, SubscriptionFinder,
                                      ServicePrincipalAuth, _AUTH_CTX_FACTORY)
 from azure.cli.core.mock import DummyCli
@@ -1120,6 +1121,45 @@ class TestProfile(unittest.TestCase):
         self.assertEqual([], subs)
         mock_logger.warning.assert_called_once_with(mock.ANY, mock.ANY, mock.ANY)
 
+    @mock.patch('adal.AuthenticationContext', autospec=True)
+    @mock.patch('azure.cli.core._session.SESSION', new_callable=Session)
+    def test_find_subscriptions_in_many_tenants(self, _, mock_auth_context):
+        cli = DummyCli()
+        tenants = ['tenant{}'.format(i) for i in range(20)]
+
+        def _create_auth_context(_, tenant, cache):  # pylint: disable=unused-argument
+            context = mock.MagicMock()
+            if tenant == 'tenant3':
+                context.acquire_token.side_effect = AdalError('Account is disabled')
+            else:
+                context.acquire_token.return_value = {'accessToken': tenant or 'common', 'userId': self.user1}
+            context.acquire_token_with_username_password.return_value = context.acquire_token.return_value
+            return context
+
+        def _create_arm_client(credentials):
+            client = mock.MagicMock()
+            client.tenants.list.return_value = [TenantStub(t) for t in tenants]
+            token = credentials.token['access_token']
+            client.subscriptions.list.return_value = [] if token == 'tenant5' else [
+                SubscriptionStub('/subscriptions/sub-' + token, 'sub', self.state1, token)]
+            return client
+
+        arm_client_factory = mock.MagicMock(side_effect=_create_arm_client)
+        finder = SubscriptionFinder(cli, _create_auth_context, None, arm_client_factory)
+        subs = finder.find_from_user_account(self.user1, 'bar', None, 'http://someresource')
+
+        expected_tenants = [t for t in tenants if t != 'tenant3']
+        self.assertEqual([s.tenant_id for s in subs], [t for t in expected_tenants if t != 'tenant5'])
+        self.assertEqual(finder.tenants, expected_tenants)
+        self.assertEqual(arm_client_factory.call_count, len(tenants))
+
+        # refreshing the accounts reuses the tenants found at login
+        arm_client_factory.reset_mock()
+        finder = SubscriptionFinder(cli, _create_auth_context, None, arm_client_factory)
+        subs = finder.find_from_user_account(self.user1, None, None, 'http://someresource', use_cached_tenants=True)
+        self.assertEqual(len(subs), len(tenants) - 2)
+        self.assertEqual(arm_client_factory.call_count, len(tenants) - 1)
+
     @mock.patch('adal.AuthenticationContext', autospec=True)
     def test_find_subscriptions_from_particular_tenent(self, mock_auth_context):
         def just_raise(ex):
@@ -1563,6 +1603,45 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(token, 'new token')
         self.assertEqual(token_type, token_entry2['tokenType'])
 
+    @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
+    @mock.patch('adal.AuthenticationContext', autospec=True)
+    def test_credscache_reuses_tokens_until_they_expire(self, mock_adal_auth_context, mock_read_file):
+        import datetime
+        cli = DummyCli()
+        expires_on = [datetime.datetime.now() + datetime.timedelta(hours=1)]
+
+        def acquire_token_side_effect(resource, *args):  # pylint: disable=unused-argument
+            return {
+                "accessToken": "token for " + resource,
+                "tokenType": "Bearer",
+                "expiresOn": str(expires_on[0])
+            }
+
+        mock_adal_auth_context.acquire_token.side_effect = acquire_token_side_effect
+        mock_read_file.return_value = [self.token_entry1]
+        creds_cache = CredsCache(cli, auth_ctx_factory=lambda *_, **__: mock_adal_auth_context, async_persist=False)
+
+        # action
+        _, token, _ = creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, 'resource1')
+        creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, 'resource1')
+        _, token2, _ = creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, 'resource2')
+
+        # assert
+        self.assertEqual(token, 'token for resource1')
+        self.assertEqual(token2, 'token for resource2')
+        self.assertEqual(mock_adal_auth_context.acquire_token.call_count, 2)
+
+        # a token about to expire is acquired again ahead of its expiry
+        expires_on[0] = datetime.datetime.now() + datetime.timedelta(minutes=2)
+        creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, 'resource3')
+        creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, 'resource3')
+        self.assertEqual(mock_adal_auth_context.acquire_token.call_count, 4)
+
+        # logging out forgets the tokens
+        creds_cache.remove_cached_creds(self.user1)
+        creds_cache.retrieve_token_for_user(self.user1, self.tenant_id, 'resource1')
+        self.assertEqual(mock_adal_auth_context.acquire_token.call_count, 5)
+
     @mock.patch('azure.cli.core._profile.get_file_json', autospec=True)
     def test_credscache_good_error_on_file_corruption(self, mock_read_file):
         mock_read_file.side_effect = ValueError('a bad error for you')
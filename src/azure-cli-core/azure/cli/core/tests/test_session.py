@@ -0,0 +1,115 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from codecs import open as codecs_open
+
+import mock
+
+from azure.cli.core._session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'az.sess')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read_file(self):
+        with codecs_open(self.filename, 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+
+    def test_session_saves_direct_modifications(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        session['b'] = {'c': 2}
+        del session['a']
+        self.assertEqual(self._read_file(), {'b': {'c': 2}})
+        # the file is replaced atomically, without leaving temporary files behind
+        self.assertEqual(sorted(f for f in os.listdir(self.temp_dir) if not f.endswith('.lock')), ['az.sess'])
+
+    def test_session_write_behind(self):
+        session = Session(write_behind=True)
+        session.load(self.filename)
+        session['a'] = 1
+        session['b'] = 2
+        self.assertEqual(self._read_file(), {})
+        session.flush()
+        self.assertEqual(self._read_file(), {'a': 1, 'b': 2})
+
+    def test_session_keeps_changes_of_other_processes(self):
+        session1 = Session()
+        session1.load(self.filename)
+        session2 = Session(write_behind=True)
+        session2.load(self.filename)
+
+        session1['a'] = 1
+        session2['b'] = 2
+        # make sure the modification time differs on file systems with a coarse resolution
+        os.utime(self.filename, (time.time() - 10, time.time() - 10))
+        session2.flush()
+
+        self.assertEqual(self._read_file(), {'a': 1, 'b': 2})
+        self.assertEqual(session2.data, {'a': 1, 'b': 2})
+
+    def test_session_save_keeps_changes_of_other_processes(self):
+        session1 = Session()
+        session1.load(self.filename)
+        session2 = Session()
+        session2.load(self.filename)
+
+        session1['a'] = 1
+        # indirect modifications are only saved by save()
+        session2['tenants']['t1'] = {'time': 1}
+        os.utime(self.filename, (time.time() - 10, time.time() - 10))
+        session2.save_with_retry()
+        self.assertEqual(self._read_file(), {'a': 1, 'tenants': {'t1': {'time': 1}}})
+
+        tenants = session2['tenants']
+        tenants['t2'] = {'time': 2}
+        del session1['a']
+        os.utime(self.filename, (time.time() - 20, time.time() - 20))
+        session2.save()
+        self.assertEqual(self._read_file(), {'tenants': {'t1': {'time': 1}, 't2': {'time': 2}}})
+
+    @mock.patch('portalocker.Lock', autospec=True)
+    def test_session_warns_when_not_locked(self, lock_cls):
+        import portalocker
+        lock_cls.return_value.acquire.side_effect = portalocker.AlreadyLocked()
+        session = Session()
+        session.load(self.filename)
+        with mock.patch('azure.cli.core._session.get_logger') as get_logger:
+            session['a'] = 1
+        self.assertTrue(get_logger.return_value.warning.called)
+        self.assertEqual(lock_cls.call_args[1]['fail_when_locked'], False)
+        self.assertEqual(self._read_file(), {'a': 1})
+
+    def test_session_expires(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        os.utime(self.filename, (time.time() - 7200, time.time() - 7200))
+
+        session = Session()
+        session.load(self.filename, max_age=3600)
+        self.assertEqual(session.data, {})
+
+        session['a'] = 1
+        session = Session()
+        session.load(self.filename, max_age=3600)
+        self.assertEqual(session.data, {'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,8 @@ import json
 
 from azure.cli.core.util import \
     (get_file_json, truncate_text, shell_safe_json_parse, b64_to_hex, hash_string, random_string,
-     open_page_in_browser, can_launch_browser, handle_exception, ConfiguredDefaultSetter)
+     open_page_in_browser, can_launch_browser, handle_exception, ConfiguredDefaultSetter,
+     get_throttling_retry_after, RequestThrottle)
 
 
 class TestUtils(unittest.TestCase):
@@ -318,6 +319,27 @@ class TestHandleException(unittest.TestCase):
             self.assertEqual(config.use_local_config, False)
         self.assertTrue(config.use_local_config)
 
+    def test_get_throttling_retry_after(self):
+        ex = mock.MagicMock()
+        ex.response.status_code = 429
+        ex.response.headers = {'Retry-After': '7'}
+        self.assertEqual(get_throttling_retry_after(ex), 7)
+        ex.response.headers = {}
+        self.assertEqual(get_throttling_retry_after(ex), 0)
+        ex.response.status_code = 500
+        self.assertIsNone(get_throttling_retry_after(ex))
+        self.assertIsNone(get_throttling_retry_after(ValueError()))
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_request_throttle(self, sleep):
+        throttle = RequestThrottle()
+        throttle.wait()
+        self.assertFalse(sleep.called)
+        throttle.pause(7)
+        throttle.pause(3)
+        throttle.wait()
+        self.assertTrue(6 < sleep.call_args[0][0] <= 7)
+
     @staticmethod
     def _get_mock_HttpOperationError(response_text):
         from msrest.exceptions import HttpOperationError
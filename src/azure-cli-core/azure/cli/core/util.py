@@ -491,6 +491,41 @@ def check_connectivity(url='https://example.org', max_retries=5, timeout=1):
     return success
 
 
+DEFAULT_MAX_CONCURRENT_IDS = 10
+MAX_THROTTLING_BACKOFF = 60
+
+
+def get_throttling_retry_after(ex):
+    """ Return the Retry-After of a throttled request in seconds, 0 if not specified, or None if not throttled. """
+    response = getattr(ex, 'response', None)
+    if getattr(response, 'status_code', None) != 429:
+        return None
+    try:
+        return max(0, int(response.headers.get('Retry-After')))
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+class RequestThrottle(object):
+    """ Holds back the requests of concurrent jobs once one of them was throttled by the service. """
+
+    def __init__(self):
+        import threading
+        self._lock = threading.Lock()
+        self._resume_time = 0
+
+    def wait(self):
+        import time
+        delay = self._resume_time - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        import time
+        with self._lock:
+            self._resume_time = max(self._resume_time, time.time() + seconds)
+
+
 class ConfiguredDefaultSetter(object):
 
     def __init__(self, cli_config, use_local_config=None):
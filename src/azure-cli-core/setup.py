@@ -55,7 +55,7 @@ CLASSIFIERS = [
 DEPENDENCIES = [
     'adal>=1.2.0',
     'argcomplete>=1.8.0',
-    'azure-cli-telemetry',
+    'azure-cli-telemetry>=1.0.3',
     'colorama>=0.3.9',
     'humanfriendly>=4.7',
     'jmespath',
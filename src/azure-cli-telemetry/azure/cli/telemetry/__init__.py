@@ -6,6 +6,7 @@
 import sys
 import os
 import subprocess
+import threading
 
 try:
     import portalocker
@@ -57,22 +58,76 @@ def _start(config_dir):
     logger.info('Return from creating process')
 
 
-def save(config_dir, payload):
+_upload_thread = None
+
+
+def _start_in_process(config_dir):
+    """Upload the telemetry records on a background thread of the current process. Used by long-lived processes, which
+    can spare starting a Python process and importing this package again for every upload."""
+    from azure.cli.telemetry.components.telemetry_logging import get_logger
+
+    global _upload_thread  # pylint: disable=global-statement
+    if _upload_thread and _upload_thread.is_alive():
+        return
+
+    logger = get_logger('process')
+
+    def _upload():
+        try:
+            upload(config_dir)
+        except portalocker.AlreadyLocked:
+            logger.info('Lock out from note file under %s which means another process is running.', config_dir)
+        except Exception as err:  # pylint: disable=broad-except
+            logger.warning('Fail to upload telemetry in process. Reason: %s.', err)
+
+    _upload_thread = threading.Thread(target=_upload, name='telemetry-upload')
+    _upload_thread.daemon = True
+    _upload_thread.start()
+    logger.info('Started upload thread')
+
+
+def save(config_dir, payload, in_process=False):
     from azure.cli.telemetry.util import should_upload
     from azure.cli.telemetry.components.telemetry_logging import get_logger
 
     if save_payload(config_dir, payload) and should_upload(config_dir):
         logger = get_logger('main')
-        logger.info('Begin creating telemetry upload process.')
-        _start(config_dir)
-        logger.info('Finish creating telemetry upload process.')
+        if in_process:
+            logger.info('Begin uploading telemetry in process.')
+            _start_in_process(config_dir)
+        else:
+            logger.info('Begin creating telemetry upload process.')
+            _start(config_dir)
+            logger.info('Finish creating telemetry upload process.')
 
 
-def main():
-    from azure.cli.telemetry.util import should_upload
+def upload(config_dir):
+    """Upload the telemetry records spooled under the given configuration directory since the last upload.
+
+    The records are sent in batches of up to TELEMETRY_UPLOAD_BATCH_SIZE events per request. Raises
+    portalocker.AlreadyLocked if another process is uploading.
+    """
     from azure.cli.telemetry.components.telemetry_note import TelemetryNote
     from azure.cli.telemetry.components.records_collection import RecordsCollection
     from azure.cli.telemetry.components.telemetry_client import CliTelemetryClient
+
+    with TelemetryNote(config_dir) as telemetry_note:
+        telemetry_note.touch()
+
+        collection = RecordsCollection(telemetry_note.get_last_sent(), config_dir)
+        collection.snapshot_and_read()
+
+        # the queue of each client sends its events once it holds a full batch
+        client = CliTelemetryClient()
+        for each in collection:
+            client.add(each)
+        client.flush(force=True)
+
+        telemetry_note.update_telemetry_note(collection.next_send)
+
+
+def main():
+    from azure.cli.telemetry.util import should_upload
     from azure.cli.telemetry.components.telemetry_logging import config_logging_for_upload, get_logger
 
     try:
@@ -87,18 +142,7 @@ def main():
             sys.exit(0)
 
         try:
-            with TelemetryNote(config_dir) as telemetry_note:
-                telemetry_note.touch()
-
-                collection = RecordsCollection(telemetry_note.get_last_sent(), config_dir)
-                collection.snapshot_and_read()
-
-                client = CliTelemetryClient()
-                for each in collection:
-                    client.add(each, flush=True)
-                client.flush(force=True)
-
-                telemetry_note.update_telemetry_note(collection.next_send)
+            upload(config_dir)
         except portalocker.AlreadyLocked:
             # another upload process is running.
             logger.info('Lock out from note file under %s which means another process is running. Exit 0.', config_dir)
@@ -29,14 +29,15 @@ class RecordsCollection(object):
 
     def snapshot_and_read(self):
         """ Scan the telemetry cache files and move all the rotated files to a temp directory. """
-        from azure.cli.telemetry.const import TELEMETRY_CACHE_DIR
+        from azure.cli.telemetry.const import TELEMETRY_CACHE_DIR, TELEMETRY_CACHE_NAME
 
         folder = os.path.join(self._config_dir, TELEMETRY_CACHE_DIR)
         if not os.path.isdir(folder):
             return
 
         # sort the cache files base on their last modification time.
-        candidates = [(fn, os.stat(os.path.join(folder, fn))) for fn in os.listdir(folder) if fn != 'cache']
+        candidates = [(fn, os.stat(os.path.join(folder, fn))) for fn in os.listdir(folder)
+                      if fn != TELEMETRY_CACHE_NAME]
         candidates = [(fn, file_stat) for fn, file_stat in candidates if stat.S_ISREG(file_stat.st_mode)]
         candidates.sort(key=lambda pair: pair[1].st_mtime, reverse=True)  # move the newer cache file first
 
@@ -83,7 +83,11 @@ class CliTelemetryClient(object):
             # In the original implementation there is a line of code enable the exception hook. Removed.
             # enable(instrumentation_key)
 
-            channel = TelemetryChannel(queue=SynchronousQueue(self._sender()))
+            from azure.cli.telemetry.const import TELEMETRY_UPLOAD_BATCH_SIZE
+
+            queue = SynchronousQueue(self._sender())
+            queue.max_queue_length = TELEMETRY_UPLOAD_BATCH_SIZE
+            channel = TelemetryChannel(queue=queue)
             client = TelemetryClient(instrumentation_key=instrumentation_key, telemetry_channel=channel)
             self._clients[instrumentation_key] = client
 
@@ -94,7 +98,10 @@ class _NoRetrySender(SynchronousSender):
     def __init__(self):
         from azure.cli.telemetry.components.telemetry_logging import get_logger
 
+        from azure.cli.telemetry.const import TELEMETRY_UPLOAD_BATCH_SIZE
+
         super(_NoRetrySender, self).__init__()
+        self.send_buffer_size = TELEMETRY_UPLOAD_BATCH_SIZE
         self._logger = get_logger('sender')
 
     def send(self, data_to_send):
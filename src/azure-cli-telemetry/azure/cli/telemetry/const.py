@@ -7,7 +7,14 @@ from datetime import timedelta
 
 MANDATORY_WAIT_PERIOD = timedelta(minutes=10)
 
+# the records still in the current cache file are uploaded once the oldest of them is this old
+MAX_RECORD_AGE = timedelta(hours=24)
+
+# maximum number of events sent in a single upload request
+TELEMETRY_UPLOAD_BATCH_SIZE = 500
+
 TELEMETRY_CACHE_DIR = 'telemetry'
+TELEMETRY_CACHE_NAME = 'cache'
 TELEMETRY_NOTE_NAME = 'telemetry.txt'
 TELEMETRY_LOG_NAME = 'telemetry.log'
 TELEMETRY_LOG_DIR = 'logs'
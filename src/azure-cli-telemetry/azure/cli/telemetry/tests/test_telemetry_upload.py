@@ -0,0 +1,72 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import datetime
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from azure.cli.telemetry import upload
+from azure.cli.telemetry.const import TELEMETRY_CACHE_DIR, TELEMETRY_NOTE_NAME
+from azure.cli.telemetry.components.telemetry_client import _NoRetrySender
+from azure.cli.telemetry.util import save_payload, should_upload
+
+
+class TestTelemetryUpload(unittest.TestCase):
+    TEST_RESOURCE_FOLDER = os.path.join(os.path.dirname(__file__), 'resources')
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.work_dir, TELEMETRY_CACHE_DIR)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_should_upload_once_cache_is_rotated(self):
+        self.assertFalse(should_upload(self.work_dir))
+
+        self.assertTrue(save_payload(self.work_dir, '{"key": []}'))
+        self.assertFalse(should_upload(self.work_dir))
+
+        shutil.copy(os.path.join(self.TEST_RESOURCE_FOLDER, 'cache.1'), self.cache_dir)
+        self.assertTrue(should_upload(self.work_dir))
+
+        # uploads are at least MANDATORY_WAIT_PERIOD apart
+        note_path = os.path.join(self.work_dir, TELEMETRY_NOTE_NAME)
+        with open(note_path, 'w') as f:
+            f.write('2018-06-05T16:41:05')
+        self.assertFalse(should_upload(self.work_dir))
+        os.utime(note_path, (time.time() - 3600, time.time() - 3600))
+        self.assertTrue(should_upload(self.work_dir))
+
+    def test_should_upload_stale_records(self):
+        self.assertTrue(save_payload(self.work_dir, '{"key": []}'))
+        self.assertFalse(should_upload(self.work_dir))
+
+        # the records of the current cache file are uploaded once the oldest of them is a day old
+        with open(os.path.join(self.cache_dir, 'cache'), 'w') as f:
+            f.write('{},{{"key": []}}\n'.format(
+                (datetime.datetime.now() - datetime.timedelta(hours=25)).strftime('%Y-%m-%dT%H:%M:%S')))
+        self.assertTrue(should_upload(self.work_dir))
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['cache', 'cache.1'])
+
+    def test_upload_sends_records_in_batches(self):
+        shutil.copytree(self.TEST_RESOURCE_FOLDER, self.cache_dir)
+
+        with mock.patch.object(_NoRetrySender, 'send', autospec=True) as send:
+            upload(self.work_dir)
+
+        self.assertEqual([len(c[0][1]) for c in send.call_args_list], [500, 500, 500, 250])
+        self.assertEqual(os.listdir(self.cache_dir), ['cache'])
+        with open(os.path.join(self.work_dir, TELEMETRY_NOTE_NAME)) as f:
+            self.assertEqual(f.read(), '2018-06-05T16:41:03')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,8 @@ import logging
 import logging.handlers
 from datetime import datetime
 
-from azure.cli.telemetry.const import TELEMETRY_NOTE_NAME, MANDATORY_WAIT_PERIOD
+from azure.cli.telemetry.const import (TELEMETRY_NOTE_NAME, TELEMETRY_CACHE_DIR, TELEMETRY_CACHE_NAME,
+                                       MANDATORY_WAIT_PERIOD, MAX_RECORD_AGE)
 
 
 def should_upload(config_dir):
@@ -18,26 +19,67 @@ def should_upload(config_dir):
     The conditions are:
         1. The telemetry.txt file doesn't exist; OR
         2. The telemetry.txt file is a regular file AND there have been enough time passed since last add.
+    AND
+        3. The cache has been rotated at least once, so that there is a full cache file to upload. The cache is
+           rotated here once its oldest record is older than MAX_RECORD_AGE, so that a slow trickle of records is
+           still uploaded.
     """
     logger = logging.getLogger('telemetry.check')
 
     telemetry_note_path = os.path.join(config_dir, TELEMETRY_NOTE_NAME)
-    if not os.path.exists(telemetry_note_path):
-        logger.info('Positive: The %s does not exist.', telemetry_note_path)
-        return True
-
-    file_stat = os.stat(telemetry_note_path)
-    if not stat.S_ISREG(file_stat.st_mode):
-        logger.warning('Negative: The %s is not a regular file.', telemetry_note_path)
+    if os.path.exists(telemetry_note_path):
+        file_stat = os.stat(telemetry_note_path)
+        if not stat.S_ISREG(file_stat.st_mode):
+            logger.warning('Negative: The %s is not a regular file.', telemetry_note_path)
+            return False
+
+        modify_time = datetime.fromtimestamp(file_stat.st_mtime)
+        if datetime.now() - modify_time < MANDATORY_WAIT_PERIOD:
+            logger.warning('Negative: The %s was modified at %s, which in less than %f s',
+                           telemetry_note_path, modify_time, MANDATORY_WAIT_PERIOD.total_seconds())
+            return False
+    else:
+        logger.info('The %s does not exist.', telemetry_note_path)
+
+    # only the rotated cache files are uploaded, the current one is still being written to
+    cache_dir = os.path.join(config_dir, TELEMETRY_CACHE_DIR)
+    try:
+        if not [fn for fn in os.listdir(cache_dir) if fn != TELEMETRY_CACHE_NAME] and \
+                not _rotate_stale_cache(config_dir):
+            logger.info('Negative: There is no rotated cache file under %s.', cache_dir)
+            return False
+    except OSError:
+        logger.info('Negative: The %s does not exist.', cache_dir)
         return False
 
-    modify_time = datetime.fromtimestamp(file_stat.st_mtime)
-    if datetime.now() - modify_time < MANDATORY_WAIT_PERIOD:
-        logger.warning('Negative: The %s was modified at %s, which in less than %f s',
-                       telemetry_note_path, modify_time, MANDATORY_WAIT_PERIOD.total_seconds())
+    logger.info('Returns Positive.')
+    return True
+
+
+def _rotate_stale_cache(config_dir):
+    """Rotates the cache if its oldest record is older than MAX_RECORD_AGE. Returns True if it was rotated."""
+    logger = logging.getLogger('telemetry.check')
+
+    cache_path = os.path.join(config_dir, TELEMETRY_CACHE_DIR, TELEMETRY_CACHE_NAME)
+    try:
+        with open(cache_path, mode='r') as fh:
+            oldest_record_time = datetime.strptime(fh.readline().split(',', 1)[0], '%Y-%m-%dT%H:%M:%S')
+    except (IOError, OSError, ValueError):
+        return False
+    if datetime.now() - oldest_record_time <= MAX_RECORD_AGE:
         return False
 
-    logger.info('Returns Positive.')
+    cache_saver = _create_rotate_file_logger(config_dir)
+    if not cache_saver:
+        return False
+    try:
+        for handler in cache_saver.handlers:
+            handler.doRollover()
+            handler.close()
+    except (IOError, OSError) as err:
+        logger.info('Fail to rotate the cache file %s. Reason %s.', cache_path, err)
+        return False
+    logger.info('Rotated the cache file %s, whose oldest record was logged at %s.', cache_path, oldest_record_time)
     return True
 
 
@@ -51,6 +93,8 @@ def save_payload(config_dir, payload):
         cache_saver = _create_rotate_file_logger(config_dir)
         if cache_saver:
             cache_saver.info(payload)
+            for handler in cache_saver.handlers:
+                handler.close()
             logger.info('Save telemetry record of length %d in cache', len(payload))
 
             return True
@@ -58,7 +102,7 @@ def save_payload(config_dir, payload):
 
 
 def _create_rotate_file_logger(log_dir):
-    cache_name = os.path.join(log_dir, 'telemetry', 'cache')
+    cache_name = os.path.join(log_dir, TELEMETRY_CACHE_DIR, TELEMETRY_CACHE_NAME)
     try:
         if not os.path.exists(os.path.dirname(cache_name)):
             os.makedirs(os.path.dirname(cache_name))
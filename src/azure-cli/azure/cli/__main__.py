@@ -11,6 +11,7 @@ from knack.completion import ARGCOMPLETE_ENV_NAME
 from knack.log import get_logger
 
 from azure.cli.core import get_default_cli
+from azure.cli.core.daemon import is_daemon_client_enabled, run_daemon_client
 
 import azure.cli.core.telemetry as telemetry
 
@@ -30,6 +31,12 @@ def cli_main(cli, args):
     return cli.invoke(args)
 
 
+if is_daemon_client_enabled():
+    daemon_exit_code = run_daemon_client(sys.argv[1:])
+    if daemon_exit_code is not None:
+        sys.exit(daemon_exit_code)
+    logger.debug('No Azure CLI daemon is listening. Running the command in-process.')
+
 az_cli = get_default_cli()
 
 telemetry.set_application(az_cli, ARGCOMPLETE_ENV_NAME)
@@ -1923,10 +1923,16 @@ examples:
 helps['network dns zone import'] = """
 type: command
 short-summary: Create a DNS zone using a DNS zone file.
+long-summary: >
+    If the zone exists, only the record sets which differ from the zone file are written. Up to 10 record sets are
+    written at a time, which can be changed with `az configure` in the `dns` section as `max_concurrent_record_sets`.
 examples:
   - name: Import a local zone file into a DNS zone resource.
     text: >
         az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file
+  - name: List the changes that importing a zone file would make to an existing DNS zone, including deletions.
+    text: >
+        az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file --delete-missing --dry-run
 """
 
 helps['network dns zone list'] = """
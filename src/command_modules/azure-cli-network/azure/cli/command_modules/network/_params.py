@@ -424,6 +424,8 @@ def load_arguments(self, _):
 
     with self.argument_context('network dns zone import') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to import')
+        c.argument('delete_missing', action='store_true', help='Delete the record sets of the zone which are not in the zone file. The SOA and NS record sets of the zone apex and alias record sets are kept.')
+        c.argument('dry_run', action='store_true', help='List the record sets that would be created, updated or deleted without changing the zone.')
 
     with self.argument_context('network dns zone export') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to save')
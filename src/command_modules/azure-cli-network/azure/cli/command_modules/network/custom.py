@@ -1419,7 +1419,7 @@ def _build_record(cmd, data):
 
 
 # pylint: disable=too-many-statements
-def import_zone(cmd, resource_group_name, zone_name, file_name):
+def import_zone(cmd, resource_group_name, zone_name, file_name, delete_missing=False, dry_run=False):
     from azure.cli.core.util import read_file_content
     import sys
     RecordSet = cmd.get_models('RecordSet', resource_type=ResourceType.MGMT_NETWORK_DNS)
@@ -1465,52 +1465,172 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
                 _add_record(record_set, record, record_set_type,
                             is_list=record_set_type.lower() not in ['soa', 'cname'])
 
-    total_records = 0
+    imported = OrderedDict()
     for key, rs in record_sets.items():
         rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = rs_name[:-(len(origin) + 1)] if rs_name != origin else '@'
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
-        total_records += record_count
-    cum_records = 0
+        rs_name = '@' if rs_name == origin else rs_name
+        if rs_name.endswith(origin):
+            rs_name = rs_name[:-(len(origin) + 1)]
+        imported[(rs_name, rs_type)] = rs
 
     client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
     print('== BEGINNING ZONE IMPORT: {} ==\n'.format(zone_name), file=sys.stderr)
 
+    existing = _get_existing_record_sets(cmd, client, resource_group_name, zone_name, imported, dry_run)
+    changes, total_records, unchanged_records = _diff_record_sets(imported, existing, delete_missing)
+    if dry_run:
+        for operation, rs_name, rs_type, _, record_count in changes:
+            print("Would {} {} records of type '{}' and name '{}'".format(operation, record_count, rs_type, rs_name),
+                  file=sys.stderr)
+        print("\n== {}/{} RECORDS ARE UP TO DATE: '{}' ==".format(unchanged_records, total_records, zone_name),
+              file=sys.stderr)
+        return [{'operation': operation, 'name': rs_name, 'type': rs_type, 'records': record_count}
+                for operation, rs_name, rs_type, _, record_count in changes]
+
+    if unchanged_records:
+        print('{} records are already up to date'.format(unchanged_records), file=sys.stderr)
+    from azure.cli.core.util import DEFAULT_MAX_CONCURRENT_IDS
+    max_workers = cmd.cli_ctx.config.getint('dns', 'max_concurrent_record_sets', fallback=DEFAULT_MAX_CONCURRENT_IDS)
+    imported_records = _apply_record_set_changes(client, resource_group_name, zone_name, changes, total_records,
+                                                 max_workers)
+    print("\n== {}/{} RECORDS IMPORTED SUCCESSFULLY: '{}' =="
+          .format(unchanged_records + imported_records, total_records, zone_name), file=sys.stderr)
+
+
+def _get_record_count(record_set, record_type):
+    try:
+        return len(getattr(record_set, _type_to_property_name(record_type)))
+    except TypeError:
+        return 1
+
+
+def _get_existing_record_sets(cmd, client, resource_group_name, zone_name, imported, dry_run):
+    """ Return the record sets of the zone by (name, type) that the import may change, creating the zone if it does
+    not exist. """
     Zone = cmd.get_models('Zone', resource_type=ResourceType.MGMT_NETWORK_DNS)
-    client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'))
-    for key, rs in record_sets.items():
+    zone_created = False
+    try:
+        if dry_run:
+            client.zones.get(resource_group_name, zone_name)
+        else:
+            # does not reset the zone if it exists
+            client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'), if_none_match='*')
+            zone_created = True
+    except CloudError as ex:
+        if dry_run and ex.status_code == 404:
+            return {}
+        if dry_run or ex.status_code != 412:
+            raise
+
+    if zone_created:
+        # a new zone only holds its root SOA and NS record sets
+        return {('@', t): client.record_sets.get(resource_group_name, zone_name, '@', t.upper())
+                for t in ['soa', 'ns'] if ('@', t) in imported}
+    return {(rs.name.lower(), rs.type.rsplit('/', 1)[1].lower()): rs
+            for rs in client.record_sets.list_by_dns_zone(resource_group_name, zone_name)}
+
+
+def _record_set_matches(record_set, other, record_type):
+    import json
+    if record_set.ttl != other.ttl:
+        return False
 
-        rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = '@' if rs_name == origin else rs_name
-        if rs_name.endswith(origin):
-            rs_name = rs_name[:-(len(origin) + 1)]
+    def _get_records(rs):
+        records = getattr(rs, _type_to_property_name(record_type), None)
+        records = records if isinstance(records, list) else [records]
+        return sorted(json.dumps(r.as_dict(), sort_keys=True) for r in records if r is not None)
 
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
-        if rs_name == '@' and rs_type == 'soa':
-            root_soa = client.record_sets.get(resource_group_name, zone_name, '@', 'SOA')
-            rs.soa_record.host = root_soa.soa_record.host
-            rs_name = '@'
-        elif rs_name == '@' and rs_type == 'ns':
-            root_ns = client.record_sets.get(resource_group_name, zone_name, '@', 'NS')
-            root_ns.ttl = rs.ttl
-            rs = root_ns
-            rs_type = rs.type.rsplit('/', 1)[1]
-        try:
-            client.record_sets.create_or_update(
-                resource_group_name, zone_name, rs_name, rs_type, rs)
-            cum_records += record_count
-            print("({}/{}) Imported {} records of type '{}' and name '{}'"
-                  .format(cum_records, total_records, record_count, rs_type, rs_name), file=sys.stderr)
-        except CloudError as ex:
-            logger.error(ex)
-    print("\n== {}/{} RECORDS IMPORTED SUCCESSFULLY: '{}' =="
-          .format(cum_records, total_records, zone_name), file=sys.stderr)
+    return _get_records(record_set) == _get_records(other)
+
+
+def _diff_record_sets(imported, existing, delete_missing=False):
+    """ Return the (operation, name, type, record set, record count) changes which make the zone hold the imported
+    record sets, the number of imported records and the number of those already up to date. """
+    import copy
+    existing = dict(existing)
+    changes = []
+    total_records = unchanged_records = 0
+    for (rs_name, rs_type), rs in imported.items():
+        record_count = _get_record_count(rs, rs_type)
+        total_records += record_count
+        current = existing.pop((rs_name, rs_type), None)
+        if current is not None and rs_name == '@' and rs_type == 'soa':
+            rs.soa_record.host = current.soa_record.host
+        elif current is not None and rs_name == '@' and rs_type == 'ns':
+            # only the TTL of the name servers of the zone is imported
+            rs = copy.copy(current)
+            rs.ttl = imported[(rs_name, rs_type)].ttl
+        if current is None:
+            changes.append(('create', rs_name, rs_type, rs, record_count))
+        elif _record_set_matches(rs, current, rs_type):
+            unchanged_records += record_count
+        else:
+            rs.metadata = rs.metadata or current.metadata
+            changes.append(('update', rs_name, rs_type, rs, record_count))
+
+    if delete_missing:
+        for (rs_name, rs_type), rs in existing.items():
+            # the root SOA and NS record sets cannot be deleted, and alias record sets are not in zone files
+            try:
+                if rs_name == '@' and rs_type in ['soa', 'ns'] or not getattr(rs, _type_to_property_name(rs_type)):
+                    continue
+            except KeyError:
+                continue
+            changes.append(('delete', rs_name, rs_type, rs, _get_record_count(rs, rs_type)))
+    return changes, total_records, unchanged_records
+
+
+def _apply_record_set_change(client, resource_group_name, zone_name, change, throttle):
+    """ Apply a change once the import resumes. The client retries throttled requests itself, honoring Retry-After.
+    A change that is still throttled fails, and the changes that did not start yet are held back. """
+    from azure.cli.core.util import get_throttling_retry_after, MAX_THROTTLING_BACKOFF
+    operation, rs_name, rs_type, rs, _ = change
+    throttle.wait()
+    try:
+        if operation == 'delete':
+            client.record_sets.delete(resource_group_name, zone_name, rs_name, rs_type)
+        else:
+            client.record_sets.create_or_update(resource_group_name, zone_name, rs_name, rs_type, rs)
+    except CloudError as ex:
+        retry_after = get_throttling_retry_after(ex)
+        if retry_after is not None:
+            retry_after = retry_after or MAX_THROTTLING_BACKOFF
+            logger.warning("Request throttled, pausing the import for %s seconds", retry_after)
+            throttle.pause(retry_after)
+        raise
+
+
+def _apply_record_set_changes(client, resource_group_name, zone_name, changes, total_records, max_workers):
+    """ Apply the changes concurrently, and return the number of records created or updated. The deletions are
+    applied first, as a CNAME record set cannot be created while another record set has the same name. """
+    import sys
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from azure.cli.core.util import RequestThrottle
+    throttle = RequestThrottle()
+    imported_records = 0
+    past_tense = {'create': 'Created', 'update': 'Updated', 'delete': 'Deleted'}
+    deletions = [change for change in changes if change[0] == 'delete']
+    writes = [change for change in changes if change[0] != 'delete']
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for batch in [deletions, writes]:
+            tasks = {executor.submit(_apply_record_set_change, client, resource_group_name, zone_name, change,
+                                     throttle): change for change in batch}
+            for task in as_completed(tasks):
+                operation, rs_name, rs_type, _, record_count = tasks[task]
+                try:
+                    task.result()
+                except CloudError as ex:
+                    logger.error(ex)
+                    continue
+                if operation == 'delete':
+                    print("Deleted {} records of type '{}' and name '{}'".format(record_count, rs_type, rs_name),
+                          file=sys.stderr)
+                    continue
+                imported_records += record_count
+                print("({}/{}) {} {} records of type '{}' and name '{}'".format(
+                    imported_records, total_records, past_tense[operation], record_count, rs_type, rs_name),
+                    file=sys.stderr)
+    return imported_records
 
 
 def add_dns_aaaa_record(cmd, resource_group_name, zone_name, record_set_name, ipv6_address):
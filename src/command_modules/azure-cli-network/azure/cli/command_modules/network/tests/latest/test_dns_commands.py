@@ -6,6 +6,8 @@
 import os
 import unittest
 
+import mock
+
 from azure.cli.testsdk import ScenarioTest, ResourceGroupPreparer
 
 from azure.cli.command_modules.network.zone_file import parse_zone_file
@@ -15,6 +17,14 @@ TEST_DIR = os.path.abspath(os.path.join(os.path.abspath(__file__), '..'))
 
 class DnsZoneImportTest(ScenarioTest):
 
+    def setUp(self):
+        super(DnsZoneImportTest, self).setUp()
+        if not self.is_live:
+            # the recordings are played back one request at a time
+            patcher = mock.patch.dict('os.environ', {'AZURE_DNS_MAX_CONCURRENT_RECORD_SETS': '1'})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def _match_record(self, record_set, name, type):
         matches = [x for x in record_set if x['name'] == name and x['type'] == type]
         self.assertEqual(len(matches), 1)
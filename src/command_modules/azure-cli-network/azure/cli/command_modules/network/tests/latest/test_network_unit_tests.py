@@ -3,11 +3,15 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
 
 from knack.util import CLIError
+from msrestazure.azure_exceptions import CloudError
 
 
 class TestNetworkUnitTests(unittest.TestCase):
@@ -77,5 +81,88 @@ class TestNetworkUnitTests(unittest.TestCase):
         self.assertEqual(result[1].value, 'noodle')
 
 
+class TestDnsZoneImport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.zone_file = os.path.join(self.temp_dir, 'zone.txt')
+        with open(self.zone_file, 'w') as f:
+            f.write('$ORIGIN zone.com.\n'
+                    '@ 3600 IN SOA ns1.zone.com. hostmaster.zone.com. ( 1 3600 300 2419200 300 )\n'
+                    '@ 600 IN NS ns1-01.azure-dns.com.\n'
+                    'www 3600 IN A 1.2.3.4\n'
+                    'api 300 IN A 1.2.3.5\n'
+                    'new 3600 IN TXT "hello"\n')
+
+        from azure.cli.core import AzCommandsLoader
+        from azure.cli.core.commands import AzCliCommand
+        from azure.cli.core.mock import DummyCli
+        from azure.cli.core.profiles import ResourceType
+        cli_ctx = DummyCli()
+        self.cmd = AzCliCommand(AzCommandsLoader(cli_ctx, resource_type=ResourceType.MGMT_NETWORK_DNS), 'test', None)
+        self.cmd.cli_ctx = cli_ctx
+
+        RecordSet, ARecord, CnameRecord, NsRecord, SoaRecord = self.cmd.get_models(
+            'RecordSet', 'ARecord', 'CnameRecord', 'NsRecord', 'SoaRecord', resource_type=ResourceType.MGMT_NETWORK_DNS)
+
+        def _record_set(name, record_type, ttl, **kwargs):
+            record_set = RecordSet(ttl=ttl, **kwargs)
+            record_set.name = name
+            record_set.type = 'Microsoft.Network/dnszones/' + record_type
+            return record_set
+
+        self.client = mock.MagicMock()
+        self.client.zones.create_or_update.side_effect = CloudError(
+            mock.MagicMock(status_code=412, text='', headers={}), 'Precondition failed')
+        self.client.record_sets.list_by_dns_zone.return_value = [
+            _record_set('@', 'SOA', 3600, soa_record=SoaRecord(
+                host='ns1-01.azure-dns.com.', email='hostmaster.zone.com.', serial_number=1, refresh_time=3600,
+                retry_time=300, expire_time=2419200, minimum_ttl=300)),
+            _record_set('@', 'NS', 172800, ns_records=[NsRecord(nsdname='ns1-01.azure-dns.com.')]),
+            _record_set('www', 'A', 3600, arecords=[ARecord(ipv4_address='1.2.3.4')]),
+            _record_set('api', 'A', 300, arecords=[ARecord(ipv4_address='1.2.3.9')]),
+            _record_set('old', 'CNAME', 3600, cname_record=CnameRecord(cname='www.zone.com.')),
+            _record_set('alias', 'A', 3600)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _import_zone(self, **kwargs):
+        from azure.cli.command_modules.network.custom import import_zone
+        with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client', return_value=self.client):
+            return import_zone(self.cmd, 'rg', 'zone.com', self.zone_file, **kwargs)
+
+    def test_dns_zone_import_dry_run(self):
+        result = self._import_zone(dry_run=True, delete_missing=True)
+        self.assertEqual(sorted((x['operation'], x['name'], x['type'], x['records']) for x in result),
+                         [('create', 'new', 'txt', 1), ('delete', 'old', 'cname', 1), ('update', '@', 'ns', 1),
+                          ('update', 'api', 'a', 1)])
+        self.client.zones.create_or_update.assert_not_called()
+        self.client.record_sets.create_or_update.assert_not_called()
+        self.client.record_sets.delete.assert_not_called()
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_dns_zone_import_applies_changes(self, sleep):
+        throttled = CloudError(mock.MagicMock(status_code=429, text='', headers={'Retry-After': '7'}), 'Throttled')
+        self.client.record_sets.create_or_update.side_effect = [throttled, None, None]
+
+        with mock.patch.dict('os.environ', {'AZURE_DNS_MAX_CONCURRENT_RECORD_SETS': '1'}):
+            self._import_zone()
+        # the zone is not reset, and only the changed record sets are written
+        self.assertEqual(self.client.zones.create_or_update.call_args[1], {'if_none_match': '*'})
+        calls = [(c[0][2], c[0][3], c[0][4].ttl) for c in self.client.record_sets.create_or_update.call_args_list]
+        self.assertEqual(sorted(calls), [('@', 'ns', 600), ('api', 'a', 300), ('new', 'txt', 3600)])
+        self.client.record_sets.delete.assert_not_called()
+        # the throttled request is not made again, it is up to the client to retry it, but the next ones are held back
+        self.assertAlmostEqual(max(c[0][0] for c in sleep.call_args_list), 7, delta=1)
+
+        self.client.record_sets.reset_mock()
+        self.client.record_sets.create_or_update.side_effect = None
+        self._import_zone(delete_missing=True)
+        self.client.record_sets.delete.assert_called_once_with('rg', 'zone.com', 'old', 'cname')
+        # the deletions are applied before the record sets are written
+        self.assertEqual([c[0] for c in self.client.record_sets.method_calls if c[0] != 'list_by_dns_zone'],
+                         ['delete', 'create_or_update', 'create_or_update', 'create_or_update'])
+
+
 if __name__ == '__main__':
     unittest.main()
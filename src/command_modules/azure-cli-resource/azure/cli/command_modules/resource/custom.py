@@ -14,8 +14,12 @@ import os
 import re
 import ssl
 import sys
+import threading
+import time
 import uuid
 
+from six import string_types
+
 from six.moves.urllib.request import urlopen  # pylint: disable=import-error
 from six.moves.urllib.parse import urlparse  # pylint: disable=import-error
 
@@ -836,12 +840,120 @@ def show_resource(cmd, resource_ids=None, resource_group_name=None,
                                                                               parent_resource_path,
                                                                               resource_type,
                                                                               resource_name)]
+    _prefetch_provider_api_versions(cmd.cli_ctx, resource_ids, api_version)
 
     return _single_or_collection(
         [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).get_resource(
             include_response_body) for id_dict in parsed_ids])
 
 
+# Resources of the key type are deleted after the resources of the listed types in the same resource group,
+# which would otherwise fail their deletion while they still reference them
+_DELETE_DEPENDENCIES = {
+    'microsoft.compute/availabilitysets': ['microsoft.compute/virtualmachines'],
+    'microsoft.compute/disks': ['microsoft.compute/virtualmachines'],
+    'microsoft.network/loadbalancers': ['microsoft.compute/virtualmachinescalesets',
+                                        'microsoft.network/networkinterfaces'],
+    'microsoft.network/networkinterfaces': ['microsoft.compute/virtualmachines',
+                                            'microsoft.network/privateendpoints'],
+    'microsoft.network/networksecuritygroups': ['microsoft.network/networkinterfaces',
+                                                'microsoft.network/virtualnetworks'],
+    'microsoft.network/publicipaddresses': ['microsoft.network/applicationgateways',
+                                            'microsoft.network/bastionhosts',
+                                            'microsoft.network/loadbalancers',
+                                            'microsoft.network/networkinterfaces',
+                                            'microsoft.network/virtualnetworkgateways'],
+    'microsoft.network/routetables': ['microsoft.network/virtualnetworks'],
+    'microsoft.network/virtualnetworks': ['microsoft.compute/virtualmachinescalesets',
+                                          'microsoft.network/applicationgateways',
+                                          'microsoft.network/bastionhosts',
+                                          'microsoft.network/networkinterfaces',
+                                          'microsoft.network/privateendpoints',
+                                          'microsoft.network/virtualnetworkgateways'],
+}
+
+
+def _get_delete_dependencies(id_dicts):
+    """
+    Returns, for each resource, the indexes of the resources to delete before it: its child resources and the
+    resources of the types it depends on in the same resource group.
+    """
+    resources = []
+    for id_dict in id_dicts:
+        resource_id = (id_dict.get('resource_id') or '').lower()
+        parts = parse_resource_id(resource_id) if resource_id else {}
+        group = (parts.get('subscription'), parts.get('resource_group'))
+        resource_type = None
+        if parts.get('namespace') and parts.get('type') and not parts.get('child_type_1'):
+            resource_type = '{}/{}'.format(parts['namespace'], parts['type'])
+        resources.append((resource_id, group, resource_type))
+
+    dependencies = []
+    for resource_id, group, resource_type in resources:
+        dependency_types = _DELETE_DEPENDENCIES.get(resource_type, [])
+        dependencies.append(set(
+            i for i, (other_id, other_group, other_type) in enumerate(resources)
+            if resource_id and other_id != resource_id and
+            (other_id.startswith(resource_id + '/') or (other_group == group and other_type in dependency_types))))
+    return dependencies
+
+
+def _delete_resources_concurrently(to_be_deleted, max_workers):
+    """
+    Deletes the resources, each one as soon as the resources it depends on are deleted, and waits for the
+    deletions together. Returns the {index: result} of the deleted resources and the entries to retry: the ones
+    that failed and the ones that are left until the resources they depend on are deleted.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from msrestazure.azure_exceptions import CloudError
+
+    def _delete(rsrc_utils, id_dict):
+        logger.debug("deleting %s", _build_resource_id(**id_dict) or id_dict.get('resource_id'))
+        return rsrc_utils.delete().result()
+
+    dependencies = _get_delete_dependencies([id_dict for _, _, id_dict in to_be_deleted])
+    pending = set(range(len(to_be_deleted)))
+    succeeded = set()
+    unresolved = set()
+    running = {}
+    deleted = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            ready = [i for i in sorted(pending) if dependencies[i] <= succeeded]
+            if not ready and not running:
+                # the resources depending on a failed deletion are left for the next pass, the others can only be
+                # waiting for each other, so try them anyway
+                blocked = set()
+                while True:
+                    newly_blocked = set(i for i in pending - blocked if dependencies[i] & (unresolved | blocked))
+                    if not newly_blocked:
+                        break
+                    blocked |= newly_blocked
+                for i in blocked:
+                    to_be_deleted[i][2]['exception'] = 'Not deleted as the resources depending on it were not deleted.'
+                pending -= blocked
+                unresolved |= blocked
+                ready = sorted(pending)
+            for i in ready:
+                pending.discard(i)
+                _, rsrc_utils, id_dict = to_be_deleted[i]
+                running[executor.submit(_delete, rsrc_utils, id_dict)] = i
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                index, _, id_dict = to_be_deleted[i]
+                try:
+                    deleted[index] = future.result()
+                    succeeded.add(i)
+                except CloudError as e:
+                    # request to delete failed, add parsed id dict back to queue
+                    id_dict['exception'] = str(e)
+                    unresolved.add(i)
+    return deleted, [to_be_deleted[i] for i in sorted(unresolved)]
+
+
 # pylint: disable=unused-argument
 def delete_resource(cmd, resource_ids=None, resource_group_name=None,
                     resource_provider_namespace=None, parent_resource_path=None, resource_type=None,
@@ -849,7 +961,8 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     """
     Deletes the given resource(s).
     This function allows deletion of ids with dependencies on one another.
-    This is done with multiple passes through the given ids.
+    Child resources and known dependent resource types are deleted first, independent resources are deleted
+    concurrently, and the deletions that failed are retried in further passes.
     """
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
                                                                               resource_group_name,
@@ -857,43 +970,31 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
                                                                               parent_resource_path,
                                                                               resource_type,
                                                                               resource_name)]
-    to_be_deleted = [(_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version), id_dict)
-                     for id_dict in parsed_ids]
+    _prefetch_provider_api_versions(cmd.cli_ctx, resource_ids, api_version)
+    to_be_deleted = [(index, _get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version), id_dict)
+                     for index, id_dict in enumerate(parsed_ids)]
+    from azure.cli.core.util import DEFAULT_MAX_CONCURRENT_IDS
+    max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=DEFAULT_MAX_CONCURRENT_IDS)
 
-    results = []
-    from msrestazure.azure_exceptions import CloudError
+    results = {}
     while to_be_deleted:
         logger.debug("Start new loop to delete resources.")
-        operations = []
-        failed_to_delete = []
-        for rsrc_utils, id_dict in to_be_deleted:
-            try:
-                operations.append(rsrc_utils.delete())
-                resource = _build_resource_id(**id_dict) or resource_name
-                logger.debug("deleting %s", resource)
-            except CloudError as e:
-                # request to delete failed, add parsed id dict back to queue
-                id_dict['exception'] = str(e)
-                failed_to_delete.append((rsrc_utils, id_dict))
-        to_be_deleted = failed_to_delete
+        deleted, to_be_deleted = _delete_resources_concurrently(to_be_deleted, max_workers)
+        results.update(deleted)
 
         # stop deleting if none deletable
-        if not operations:
+        if not deleted:
             break
 
-        # all operations return result before next pass
-        for operation in operations:
-            results.append(operation.result())
-
     if to_be_deleted:
         error_msg_builder = ['Some resources failed to be deleted (run with `--verbose` for more information):']
-        for _, id_dict in to_be_deleted:
+        for _, _, id_dict in to_be_deleted:
             logger.info(id_dict['exception'])
             resource_id = _build_resource_id(**id_dict) or id_dict['resource_id']
             error_msg_builder.append(resource_id)
         raise CLIError(os.linesep.join(error_msg_builder))
 
-    return _single_or_collection(results)
+    return _single_or_collection([results[index] for index in sorted(results)])
 
 
 # pylint: unused-argument
@@ -906,6 +1007,7 @@ def update_resource(cmd, parameters, resource_ids=None,
                                                                               parent_resource_path,
                                                                               resource_type,
                                                                               resource_name)]
+    _prefetch_provider_api_versions(cmd.cli_ctx, resource_ids, api_version)
 
     return _single_or_collection(
         [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).update(parameters) for id_dict in parsed_ids])
@@ -923,6 +1025,7 @@ def tag_resource(cmd, tags, resource_ids=None,
                                                                               parent_resource_path,
                                                                               resource_type,
                                                                               resource_name)]
+    _prefetch_provider_api_versions(cmd.cli_ctx, resource_ids, api_version)
 
     return _single_or_collection(
         [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).tag(tags) for id_dict in parsed_ids])
@@ -940,6 +1043,7 @@ def invoke_resource_action(cmd, action, request_body=None, resource_ids=None,
                                                                               parent_resource_path,
                                                                               resource_type,
                                                                               resource_name)]
+    _prefetch_provider_api_versions(cmd.cli_ctx, resource_ids, api_version)
 
     return _single_or_collection([_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version)
                                   .invoke_action(action, request_body) for id_dict in parsed_ids])
@@ -1769,6 +1873,92 @@ def list_resource_links(cmd, scope=None, filter_string=None):
 # endregion
 
 
+class _ProviderApiVersionCache(object):
+    """
+    Caches the API versions of the resource types of each resource provider, per cloud and subscription.
+
+    Entries are kept in memory for the lifetime of the process and persisted in the configuration directory for
+    `ttl` seconds, so that bulk operations on generic resources do not GET the provider of every resource.
+    """
+
+    FILE_NAME = 'resourceProviders.json'
+
+    def __init__(self, ttl=24 * 60 * 60):
+        self.ttl = ttl
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        if self._session is None:
+            from azure.cli.core._environment import get_config_dir
+            from azure.cli.core._session import Session
+            session = Session()
+            session.load(os.path.join(get_config_dir(), self.FILE_NAME))
+            self._session = session
+        return self._session
+
+    @staticmethod
+    def _get_key(rcf):
+        subscription_id = getattr(rcf.config, 'subscription_id', None)
+        base_url = getattr(rcf.config, 'base_url', None)
+        if not isinstance(subscription_id, string_types) or not isinstance(base_url, string_types):
+            return None
+        return '{} {}'.format(base_url.rstrip('/').lower(), subscription_id.lower())
+
+    def get(self, rcf, namespace):
+        """ Returns the cached {resource type: API versions} of the provider, or None if it is not cached. """
+        key = self._get_key(rcf)
+        if key is None:
+            return None
+        with self._lock:
+            entry = (self._get_session().get(key) or {}).get(namespace.lower())
+        if not entry or entry['timestamp'] + self.ttl < time.time():
+            return None
+        return entry['resourceTypes']
+
+    def update(self, rcf, providers):
+        key = self._get_key(rcf)
+        if key is None:
+            return
+        now = time.time()
+        with self._lock:
+            session = self._get_session()
+            entries = session.data.setdefault(key, {})
+            for provider in providers:
+                entries[provider.namespace.lower()] = {'timestamp': now,
+                                                       'resourceTypes': self.get_resource_types(provider)}
+            try:
+                session.save_with_retry()
+            except (OSError, IOError) as ex:
+                logger.debug('Failed to save the resource provider cache: %s', ex)
+
+    @staticmethod
+    def get_resource_types(provider):
+        return {t.resource_type.lower(): list(t.api_versions or []) for t in provider.resource_types or []}
+
+
+_provider_api_versions = _ProviderApiVersionCache()
+_PROVIDER_PREFETCH_THRESHOLD = 5
+
+
+def _prefetch_provider_api_versions(cli_ctx, resource_ids, api_version):
+    """
+    Caches every resource provider of the subscription with a single request when API versions need to be
+    resolved for many resources of providers that are not cached yet.
+    """
+    if api_version or not resource_ids or len(resource_ids) < _PROVIDER_PREFETCH_THRESHOLD:
+        return
+    rcf = _resource_client_factory(cli_ctx)
+    namespaces = set()
+    for resource_id in resource_ids:
+        parts = parse_resource_id(resource_id)
+        namespaces.add(parts.get('child_namespace_1') or parts.get('namespace'))
+    if all(_provider_api_versions.get(rcf, n) is not None for n in namespaces if n):
+        return
+    logger.debug('Caching the API versions of all resource providers.')
+    _provider_api_versions.update(rcf, rcf.providers.list())
+
+
 class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
     def __init__(self, cli_ctx,
                  resource_group_name=None, resource_provider_namespace=None,
@@ -1969,18 +2159,22 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
 
     @staticmethod
     def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type):
-        provider = rcf.providers.get(resource_provider_namespace)
-
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0] if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
-        if not rt:
+        resource_types = _provider_api_versions.get(rcf, resource_provider_namespace)
+        if resource_types is None or resource_type_str.lower() not in resource_types:
+            # not cached yet, or a resource type registered since the provider was cached
+            provider = rcf.providers.get(resource_provider_namespace)
+            _provider_api_versions.update(rcf, [provider])
+            resource_types = _ProviderApiVersionCache.get_resource_types(provider)
+
+        if resource_type_str.lower() not in resource_types:
             raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
+        api_versions = resource_types[resource_type_str.lower()]
+        if api_versions:
+            npv = [v for v in api_versions if 'preview' not in v.lower()]
+            return npv[0] if npv else api_versions[0]
         raise IncorrectUsageError(
             'API version is required and could not be resolved for resource {}'
             .format(resource_type))
@@ -3,16 +3,19 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import shutil
+import tempfile
 import unittest
 
 try:
-    from unittest.mock import MagicMock
+    from unittest.mock import MagicMock, patch
 except ImportError:
-    from mock import MagicMock
+    from mock import MagicMock, patch
 
 from knack.util import CLIError
 from azure.cli.command_modules.resource.custom import (_ResourceUtils, _validate_resource_inputs,
-                                                       parse_resource_id)
+                                                       parse_resource_id, _ProviderApiVersionCache,
+                                                       _prefetch_provider_api_versions)
 
 
 class TestApiCheck(unittest.TestCase):
@@ -78,9 +81,70 @@ class TestApiCheck(unittest.TestCase):
                                    resource_group_name='rg', rcf=rcf)
         self.assertEqual(res_utils.api_version, "2005-01-01-preview")
 
+    def test_resolve_api_version_uses_provider_cache(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        rcf = self._get_mock_client()
+        rcf.config.subscription_id = '00000000-0000-0000-0000-000000000000'
+        rcf.config.base_url = 'https://management.azure.com'
+
+        with patch.dict('os.environ', {'AZURE_CONFIG_DIR': config_dir}):
+            with patch('azure.cli.command_modules.resource.custom._provider_api_versions', _ProviderApiVersionCache()):
+                self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test'), '2016-01-01')
+                self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'mock', 'foo/testfoo123', 'test'),
+                                 '1999-01-01')
+                self.assertEqual(rcf.providers.get.call_count, 1)
+
+            # the cache is persisted for the next command
+            with patch('azure.cli.command_modules.resource.custom._provider_api_versions', _ProviderApiVersionCache()):
+                self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'preview'),
+                                 '2005-01-01-preview')
+                self.assertEqual(rcf.providers.get.call_count, 1)
+
+                # an unknown resource type refreshes the provider
+                with self.assertRaises(CLIError):
+                    _ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'unknown')
+                self.assertEqual(rcf.providers.get.call_count, 2)
+
+            with patch('azure.cli.command_modules.resource.custom._provider_api_versions',
+                       _ProviderApiVersionCache(ttl=-1)):
+                _ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test')
+                self.assertEqual(rcf.providers.get.call_count, 3)
+
+            # other subscriptions are cached separately
+            rcf.config.subscription_id = '11111111-1111-1111-1111-111111111111'
+            with patch('azure.cli.command_modules.resource.custom._provider_api_versions', _ProviderApiVersionCache()):
+                _ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test')
+                self.assertEqual(rcf.providers.get.call_count, 4)
+
+    def test_prefetch_provider_api_versions(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        rcf = self._get_mock_client()
+        rcf.config.subscription_id = '00000000-0000-0000-0000-000000000000'
+        rcf.config.base_url = 'https://management.azure.com'
+        rcf.providers.list.return_value = [rcf.providers.get.return_value]
+        resource_ids = ['/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg/providers/'
+                        'Mock/test/test{}'.format(i) for i in range(10)]
+
+        with patch.dict('os.environ', {'AZURE_CONFIG_DIR': config_dir}), \
+                patch('azure.cli.command_modules.resource.custom._provider_api_versions', _ProviderApiVersionCache()), \
+                patch('azure.cli.command_modules.resource.custom._resource_client_factory', return_value=rcf):
+            _prefetch_provider_api_versions(None, resource_ids[:2], None)
+            _prefetch_provider_api_versions(None, resource_ids, '2016-01-01')
+            self.assertEqual(rcf.providers.list.call_count, 0)
+
+            _prefetch_provider_api_versions(None, resource_ids, None)
+            _prefetch_provider_api_versions(None, resource_ids, None)
+            self.assertEqual(rcf.providers.list.call_count, 1)
+            for resource_id in resource_ids:
+                self.assertEqual(_ResourceUtils._resolve_api_version_by_id(rcf, resource_id), '2016-01-01')
+            self.assertEqual(rcf.providers.get.call_count, 0)
+
     def _get_mock_client(self):
         client = MagicMock()
         provider = MagicMock()
+        provider.namespace = 'Mock'
         provider.resource_types = [
             self._get_mock_resource_type('skip', ['2000-01-01-preview', '2000-01-01']),
             self._get_mock_resource_type('test', ['2016-01-01-preview', '2016-01-01']),
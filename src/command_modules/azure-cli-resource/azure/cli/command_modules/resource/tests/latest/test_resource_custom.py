@@ -19,7 +19,7 @@ except ImportError:
 from azure.cli.core.util import CLIError, get_file_json, shell_safe_json_parse
 from azure.cli.command_modules.resource.custom import \
     (_get_missing_parameters, _extract_lock_params, _process_parameters, _find_missing_parameters,
-     _prompt_for_parameters, _load_file_string_or_uri)
+     _prompt_for_parameters, _load_file_string_or_uri, _get_delete_dependencies, delete_resource)
 
 
 def _simulate_no_tty():
@@ -334,5 +334,89 @@ class TestCustom(unittest.TestCase):
         self.assertTrue(str(list(results.keys())) in param_alpha_order)
 
 
+class TestDeleteResources(unittest.TestCase):
+    _RG_ID = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg/providers/'
+    _IDS = [_RG_ID + 'Microsoft.Network/virtualNetworks/vnet',
+            _RG_ID + 'Microsoft.Network/virtualNetworks/vnet/subnets/default',
+            _RG_ID + 'Microsoft.Network/publicIPAddresses/pip',
+            _RG_ID + 'Microsoft.Network/networkInterfaces/nic',
+            _RG_ID + 'Microsoft.Compute/virtualMachines/vm',
+            _RG_ID + 'Microsoft.Compute/disks/disk',
+            _RG_ID + 'Microsoft.Storage/storageAccounts/sa',
+            _RG_ID.replace('/rg/', '/other/') + 'Microsoft.Compute/virtualMachines/vm']
+
+    def test_delete_dependencies(self):
+        dependencies = _get_delete_dependencies([{'resource_id': i} for i in self._IDS])
+        self.assertEqual(dependencies, [{1, 3}, set(), {3}, {4}, set(), {4}, set(), set()])
+        self.assertEqual(_get_delete_dependencies([{'resource_name': 'vm'}]), [set()])
+
+    def test_delete_resources_in_dependency_order(self):
+        from msrestazure.azure_exceptions import CloudError
+        import threading
+        lock = threading.Lock()
+        events = []
+        attempts = {}
+
+        def _get_rsrc_util(_, id_dict, __):
+            resource_id = id_dict['resource_id']
+
+            def _delete():
+                with lock:
+                    attempts[resource_id] = attempts.get(resource_id, 0) + 1
+                    if resource_id.endswith(('/sa', '/nic')) and attempts[resource_id] == 1:
+                        raise CloudError(mock.MagicMock(status_code=409, text='', headers={}), 'Conflict')
+                    events.append(('start', resource_id))
+                poller = mock.MagicMock()
+
+                def _result():
+                    with lock:
+                        events.append(('done', resource_id))
+                    return resource_id
+                poller.result.side_effect = _result
+                return poller
+            return mock.MagicMock(delete=_delete)
+
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 4
+        with mock.patch('azure.cli.command_modules.resource.custom._get_rsrc_util_from_parsed_id', _get_rsrc_util), \
+                mock.patch('azure.cli.command_modules.resource.custom._prefetch_provider_api_versions'):
+            results = delete_resource(cmd, resource_ids=self._IDS)
+
+        self.assertEqual(results, self._IDS)
+        self.assertEqual(attempts[self._IDS[6]], 2)
+        # the resources depending on the nic are only deleted once the nic is, in the next pass
+        self.assertEqual(attempts[self._IDS[3]], 2)
+        self.assertEqual(attempts[self._IDS[0]], 1)
+        self.assertEqual(attempts[self._IDS[2]], 1)
+        for resource_id, dependency_id in [(0, 1), (0, 3), (2, 3), (3, 4), (5, 4)]:
+            self.assertLess(events.index(('done', self._IDS[dependency_id])),
+                            events.index(('start', self._IDS[resource_id])))
+
+    def test_delete_resources_failure(self):
+        from msrestazure.azure_exceptions import CloudError
+
+        rsrc_utils = {}
+
+        def _get_rsrc_util(_, id_dict, __):
+            rsrc_util = mock.MagicMock()
+            if id_dict['resource_id'].endswith('/nic'):
+                rsrc_util.delete.side_effect = CloudError(mock.MagicMock(status_code=409, text='', headers={}),
+                                                          'Conflict')
+            rsrc_utils[id_dict['resource_id']] = rsrc_util
+            return rsrc_util
+
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 4
+        with mock.patch('azure.cli.command_modules.resource.custom._get_rsrc_util_from_parsed_id', _get_rsrc_util), \
+                mock.patch('azure.cli.command_modules.resource.custom._prefetch_provider_api_versions'):
+            with assertRaisesRegex(self, CLIError, 'Some resources failed to be deleted') as cm:
+                delete_resource(cmd, resource_ids=self._IDS[2:5])
+
+        # the public IP address depends on the nic, so it is not deleted while the nic is not
+        self.assertEqual(rsrc_utils[self._IDS[2]].delete.call_count, 0)
+        self.assertEqual(rsrc_utils[self._IDS[4]].delete.call_count, 1)
+        self.assertIn(self._IDS[2].lower(), str(cm.exception).lower())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -195,7 +195,7 @@ examples:
 
 helps['storage blob copy start-batch'] = """
 type: command
-short-summary: Copy multiple blobs or files to a blob container. Use `az storage blob show` to check the status of the blobs.
+short-summary: Copy multiple blobs or files to a blob container. Use `az storage blob show` to check the status of the blobs, or `--wait` to wait for the copies to complete.
 parameters:
   - name: --destination-container -c
     type: string
@@ -229,6 +229,8 @@ examples:
   - name: Copy multiple blobs or files to a blob container. Use `az storage blob show` to check the status of the blobs. (autogenerated)
     text: az storage blob copy start-batch --account-key 00000000 --account-name MyAccount --destination-container MyDestinationContainer --source-account-key MySourceKey --source-account-name MySourceAccount --source-container MySourceContainer
     crafted: true
+  - name: Replicate a container to another account, starting 16 copies in parallel and waiting for all of them to complete.
+    text: az storage blob copy start-batch --account-name MyAccount --destination-container MyDestinationContainer --source-account-name MySourceAccount --source-container MySourceContainer --max-concurrency 16 --wait
 """
 
 helps['storage blob delete'] = """
@@ -269,6 +271,8 @@ examples:
     text: |
         date=`date -d "10 days ago" '+%Y-%m-%dT%H:%MZ'`
         az storage blob delete-batch -s MyContainer --account-name MyStorageAccount --pattern *.py --if-unmodified-since $date
+  - name: Delete the logs of 2018 deleting 32 blobs in parallel. The command fails, outputting the blobs that could not be deleted with their status and error.
+    text: az storage blob delete-batch -s MyContainer --account-name MyStorageAccount --pattern logs/2018/* --max-concurrency 32
 """
 
 helps['storage blob download-batch'] = """
@@ -288,9 +292,17 @@ parameters:
   - name: --dryrun
     type: bool
     short-summary: Show the summary of the operations to be taken instead of actually downloading the file(s).
+  - name: --max-concurrency
+    short-summary: The number of blobs downloaded in parallel.
+    long-summary: Downloads start while the blobs are still being listed. Per-blob progress is not reported when more than one blob is downloaded in parallel.
+  - name: --skip-unchanged
+    short-summary: Skip the blobs whose local file has the same size and modification time.
+    long-summary: With this flag, the modification time of the downloaded files is set to the last modified time of their blob, so that downloading again only transfers the blobs that changed since.
 examples:
   - name: Download all blobs that end with .py
     text: az storage blob download-batch -d . --pattern *.py -s MyContainer --account-name MyStorageAccount
+  - name: Sync a local folder with a container, downloading 16 blobs in parallel.
+    text: az storage blob download-batch -d . -s MyContainer --account-name MyStorageAccount --max-concurrency 16 --skip-unchanged
 """
 
 helps['storage blob exists'] = """
@@ -474,9 +486,20 @@ parameters:
     short-summary: The max length in bytes permitted for an append blob.
   - name: --lease-id
     short-summary: The active lease id for the blob
+  - name: --max-concurrency
+    short-summary: The number of files uploaded in parallel.
+    long-summary: The --max-connections budget is split among the files being uploaded at the same time. Per-file progress is replaced by the number of completed files when more than one file is uploaded in parallel.
+  - name: --journal
+    short-summary: A local file recording the uploaded files.
+    long-summary: Files recorded in the journal whose size and modification time did not change are not uploaded again, which allows resuming an interrupted batch by running the same command. A journal can only be reused for the same destination container.
+  - name: --skip-unchanged
+    short-summary: Skip the files whose size and MD5 match the existing blob.
+    long-summary: The MD5 of the uploaded files is stored in the Content-MD5 property of the blobs so that subsequent batches can compare them.
 examples:
   - name: Upload all files that end with .py unless blob exists and has been modified since given date.
     text: az storage blob upload-batch -d MyContainer --account-name MyStorageAccount -s directory_path --pattern *.py --if-unmodified-since 2018-08-27T20:51Z
+  - name: Upload the changed build artifacts with 16 files in parallel, resuming from the journal if the previous upload was interrupted.
+    text: az storage blob upload-batch -d MyContainer --account-name MyStorageAccount -s directory_path --max-concurrency 16 --max-connections 16 --journal upload.journal --skip-unchanged
 """
 
 helps['storage blob url'] = """
@@ -865,6 +888,8 @@ examples:
   - name: Upload files from a local directory to an Azure Storage File Share in a batch operation. (autogenerated)
     text: az storage file upload-batch --account-key 00000000 --account-name MyAccount --destination . --source /path/to/file
     crafted: true
+  - name: Upload files from a local directory to a file share, uploading 16 files in parallel.
+    text: az storage file upload-batch --account-name MyAccount --destination MyShare --source /path/to/directory --max-concurrency 16
 """
 
 helps['storage file url'] = """
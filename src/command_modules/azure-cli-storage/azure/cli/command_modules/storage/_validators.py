@@ -738,6 +738,9 @@ def process_blob_download_batch_parameters(cmd, namespace):
     if not os.path.exists(namespace.destination) or not os.path.isdir(namespace.destination):
         raise ValueError('incorrect usage: destination must be an existing directory')
 
+    if namespace.max_concurrency is not None and namespace.max_concurrency < 1:
+        raise ValueError('incorrect usage: --max-concurrency must be a positive number')
+
     # 2. try to extract account name and container name from source string
     _process_blob_batch_container_parameters(cmd, namespace)
 
@@ -753,6 +756,9 @@ def process_blob_upload_batch_parameters(cmd, namespace):
     if not os.path.exists(namespace.source) or not os.path.isdir(namespace.source):
         raise ValueError('incorrect usage: source must be an existing directory')
 
+    if namespace.max_concurrency is not None and namespace.max_concurrency < 1:
+        raise ValueError('incorrect usage: --max-concurrency must be a positive number')
+
     # 2. try to extract account name and container name from destination string
     _process_blob_batch_container_parameters(cmd, namespace, source=False)
 
@@ -784,6 +790,9 @@ def process_blob_upload_batch_parameters(cmd, namespace):
 
 
 def process_blob_delete_batch_parameters(cmd, namespace):
+    if namespace.max_concurrency is not None and namespace.max_concurrency < 1:
+        raise ValueError('incorrect usage: --max-concurrency must be a positive number')
+
     _process_blob_batch_container_parameters(cmd, namespace)
 
 
@@ -831,6 +840,9 @@ def process_file_upload_batch_parameters(cmd, namespace):
     if not os.path.isdir(namespace.source):
         raise ValueError('incorrect usage: source must be a directory')
 
+    if namespace.max_concurrency is not None and namespace.max_concurrency < 1:
+        raise ValueError('incorrect usage: --max-concurrency must be a positive number')
+
     # 2. try to extract account name and container name from destination string
     from .storage_url_helpers import StorageResourceIdentifier
     identifier = StorageResourceIdentifier(cmd.cli_ctx.cloud, namespace.destination)
@@ -860,6 +872,10 @@ def process_file_download_batch_parameters(cmd, namespace):
 
 def process_file_batch_source_parameters(cmd, namespace):
     from .storage_url_helpers import StorageResourceIdentifier
+    max_concurrency = getattr(namespace, 'max_concurrency', None)
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError('incorrect usage: --max-concurrency must be a positive number')
+
     identifier = StorageResourceIdentifier(cmd.cli_ctx.cloud, namespace.source)
     if identifier.is_url():
         if identifier.filename or identifier.directory:
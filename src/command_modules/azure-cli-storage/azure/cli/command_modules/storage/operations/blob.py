@@ -5,6 +5,7 @@
 
 from __future__ import print_function
 
+import calendar
 import os
 from knack.log import get_logger
 from knack.util import CLIError
@@ -13,11 +14,15 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_file_share_from_storage_client,
                                                     create_short_lived_share_sas,
                                                     create_short_lived_container_sas,
-                                                    filter_none, collect_blobs, collect_files,
+                                                    filter_none, collect_blobs, collect_files, iter_blobs,
                                                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                                                    check_precondition_success)
+                                                    check_precondition_success, get_file_md5, run_batch_jobs,
+                                                    BatchJournal)
 from azure.cli.command_modules.storage.url_quote_util import encode_for_url, make_encoded_file_url_and_params
 
+_BATCH_SUCCEEDED, _BATCH_SKIPPED, _BATCH_FAILED = 'succeeded', 'skipped', 'failed'
+_COPY_POLL_INITIAL_INTERVAL, _COPY_POLL_MAX_INTERVAL = 1, 30
+
 
 def delete_container(client, container_name, fail_not_exist=False, lease_id=None, if_modified_since=None,
                      if_unmodified_since=None, timeout=None, bypass_immutability_policy=False,
@@ -87,7 +92,7 @@ def set_service_properties(client, parameters, delete_retention=None, delete_ret
 
 def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                             destination_path=None, source_container=None, source_share=None,
-                            source_sas=None, pattern=None, dryrun=False):
+                            source_sas=None, pattern=None, dryrun=False, max_concurrency=1, wait=False):
     """Copy a group of blob or files to a blob container."""
     logger = None
     if dryrun:
@@ -99,6 +104,14 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
         logger.warning('source type %s', 'blob' if source_container else 'file')
         logger.warning('    pattern %s', pattern)
         logger.warning(' operations')
+        # keep the operations in the order of the source listing
+        max_concurrency = 1
+
+    def _start_copies(copy_results):
+        copy_results = list(filter_none(copy_results))
+        if wait:
+            _wait_for_blob_copies(client, container_name, copy_results, max_concurrency)
+        return [client.make_blob_url(container_name, blob_name) for blob_name, _ in copy_results]
 
     if source_container:
         # copy blobs for blob container
@@ -117,9 +130,9 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                 return _copy_blob_to_blob_container(client, source_client, container_name, destination_path,
                                                     source_container, source_sas, blob_name)
 
-        return list(filter_none(action_blob_copy(blob) for blob in collect_blobs(source_client,
-                                                                                 source_container,
-                                                                                 pattern)))
+        return _start_copies(run_batch_jobs(action_blob_copy,
+                                            collect_blobs(source_client, source_container, pattern),
+                                            max_workers=max_concurrency))
 
     if source_share:
         # copy blob from file share
@@ -140,41 +153,92 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                 return _copy_file_to_blob_container(client, source_client, container_name, destination_path,
                                                     source_share, source_sas, dir_name, file_name)
 
-        return list(filter_none(action_file_copy(file) for file in collect_files(cmd,
-                                                                                 source_client,
-                                                                                 source_share,
-                                                                                 pattern)))
+        return _start_copies(run_batch_jobs(action_file_copy,
+                                            collect_files(cmd, source_client, source_share, pattern,
+                                                          max_workers=max_concurrency),
+                                            max_workers=max_concurrency))
     raise ValueError('Fail to find source. Neither blob container or file share is specified')
 
 
+def _wait_for_blob_copies(client, container_name, copy_results, max_concurrency=1):
+    """
+    Poll the copies that are still pending until all of them completed, backing off between polls. Raise if any copy
+    failed or was aborted.
+    """
+    import time
+
+    logger = get_logger(__name__)
+    copy_statuses = {blob_name: copy for blob_name, copy in copy_results}
+
+    def _get_copy_status(blob_name):
+        return blob_name, client.get_blob_properties(container_name, blob_name).properties.copy
+
+    interval = _COPY_POLL_INITIAL_INTERVAL
+    pending = [blob_name for blob_name, copy in copy_statuses.items() if copy.status == 'pending']
+    while pending:
+        logger.info('%s of %s copies pending, checking again in %s seconds', len(pending), len(copy_statuses),
+                    interval)
+        time.sleep(interval)
+        interval = min(interval * 2, _COPY_POLL_MAX_INTERVAL)
+        for blob_name, copy in run_batch_jobs(_get_copy_status, pending, max_workers=max_concurrency):
+            copy_statuses[blob_name] = copy
+        pending = [blob_name for blob_name in pending if copy_statuses[blob_name].status == 'pending']
+
+    failures = sorted((blob_name, copy) for blob_name, copy in copy_statuses.items() if copy.status != 'success')
+    logger.warning('%s of %s copies succeeded, %s failed', len(copy_statuses) - len(failures), len(copy_statuses),
+                   len(failures))
+    if failures:
+        raise CLIError('Failed to copy the following blobs to container {}:\n{}'.format(
+            container_name, '\n'.join('  {}: {} {}'.format(blob_name, copy.status, copy.status_description or '')
+                                      for blob_name, copy in failures)))
+
+
 # pylint: disable=unused-argument
 def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
+                                progress_callback=None, max_connections=2, max_concurrency=1, skip_unchanged=False):
+    logger = get_logger(__name__)
 
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
+    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob):
         # TODO: try catch IO exception
         destination_path = os.path.join(destination_folder, normalized_blob_name)
+        if skip_unchanged and _is_local_file_unchanged(destination_path, blob.properties):
+            logger.info('skipping %s: the local file has the same size and modification time', blob.name)
+            return None
+
         destination_folder = os.path.dirname(destination_path)
         if not os.path.exists(destination_folder):
             mkdir_p(destination_folder)
 
-        blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
-        return blob.name
-
-    source_blobs = collect_blobs(client, source_container_name, pattern)
-    blobs_to_download = {}
-    for blob_name in source_blobs:
-        # remove starting path seperator and normalize
-        normalized_blob_name = normalize_blob_file_path(None, blob_name)
-        if normalized_blob_name in blobs_to_download:
-            raise CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
-                           'to select for a subset of blobs to download OR utilize the `storage blob download` '
-                           'command instead to download individual blobs.'.format(normalized_blob_name))
-        blobs_to_download[normalized_blob_name] = blob_name
+        blob_progress_callback = None
+        if progress_callback and max_concurrency == 1:
+            blob_progress_callback = progress_callback
+        else:
+            logger.info('downloading %s', blob.name)
+        downloaded = blob_service.get_blob_to_path(container, blob.name, destination_path,
+                                                   max_connections=max_connections,
+                                                   progress_callback=blob_progress_callback)
+        # keep the last modified time of the blob, so that the next sync can tell whether the blob changed
+        last_modified = downloaded.properties.last_modified or blob.properties.last_modified
+        if skip_unchanged and last_modified:
+            timestamp = calendar.timegm(last_modified.utctimetuple())
+            os.utime(destination_path, (timestamp, timestamp))
+        return downloaded.name
+
+    def _iter_blobs_to_download():
+        # the blobs are downloaded while they are listed, so a collision is detected as soon as its path shows up again
+        normalized_blob_names = set()
+        for index, blob in enumerate(iter_blobs(client, source_container_name, pattern)):
+            # remove starting path seperator and normalize
+            normalized_blob_name = normalize_blob_file_path(None, blob.name)
+            if normalized_blob_name in normalized_blob_names:
+                raise CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
+                               'to select for a subset of blobs to download OR utilize the `storage blob download` '
+                               'command instead to download individual blobs.'.format(normalized_blob_name))
+            normalized_blob_names.add(normalized_blob_name)
+            yield index, normalized_blob_name, blob
 
     if dryrun:
-        logger = get_logger(__name__)
+        source_blobs = [blob.name for _, _, blob in _iter_blobs_to_download()]
         logger.warning('download action: from %s to %s', source, destination)
         logger.warning('    pattern %s', pattern)
         logger.warning('  container %s', source_container_name)
@@ -184,33 +248,52 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             logger.warning('  - %s', b)
         return []
 
+    def _download_indexed_blob(indexed_blob):
+        index, normalized_blob_name, blob = indexed_blob
+        # add blob name and number to progress message
+        if progress_callback and max_concurrency == 1:
+            progress_callback.message = '{}: "{}"'.format(index + 1, blob.name)
+        return _download_blob(client, source_container_name, destination, normalized_blob_name, blob)
+
     # Tell progress reporter to reuse the same hook
     if progress_callback:
         progress_callback.reuse = True
 
     results = []
-    for index, blob_normed in enumerate(blobs_to_download):
-        # add blob name and number to progress message
-        if progress_callback:
-            progress_callback.message = '{}/{}: "{}"'.format(
-                index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
-        results.append(_download_blob(
-            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed]))
+    num_skipped = 0
+    for result in run_batch_jobs(_download_indexed_blob, _iter_blobs_to_download(), max_workers=max_concurrency):
+        if result is None:
+            num_skipped += 1
+        else:
+            results.append(result)
 
     # end progress hook
     if progress_callback:
         progress_callback.hook.end()
+    if num_skipped:
+        logger.warning('%s of %s blobs skipped as unchanged', num_skipped, num_skipped + len(results))
 
     return results
 
 
+def _is_local_file_unchanged(file_path, blob_properties):
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return False
+    if file_stat.st_size != blob_properties.content_length or not blob_properties.last_modified:
+        return False
+    return int(file_stat.st_mtime) == calendar.timegm(blob_properties.last_modified.utctimetuple())
+
+
 def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  # pylint: disable=too-many-locals
                               source_files=None, destination_path=None,
                               destination_container_name=None, blob_type=None,
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_concurrency=1, journal_file=None,
+                              skip_unchanged=False):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -238,40 +321,100 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         def _upload_blob(*args, **kwargs):
             return upload_blob(*args, **kwargs)
 
-        # Tell progress reporter to reuse the same hook
-        if progress_callback:
-            progress_callback.reuse = True
+        max_concurrency = max_concurrency or 1
+        # the connections are a budget shared by the files uploaded at the same time
+        connections_per_blob = max(1, max_connections // max_concurrency) if max_connections else max_connections
+        journal = None
+        if journal_file:
+            journal = BatchJournal(journal_file, destination=client.make_blob_url(destination_container_name, ''))
+
+        def _upload_source_file(indexed_source_file):
+            index, (src, dst) = indexed_source_file
+            blob_name = normalize_blob_file_path(destination_path, dst)
+            file_stat = os.stat(src)
+            if journal and journal.is_completed(blob_name, size=file_stat.st_size, mtime=file_stat.st_mtime):
+                logger.info('skipping %s: uploaded by a previous batch', src)
+                return _BATCH_SKIPPED, None, None
 
-        for index, source_file in enumerate(source_files):
-            src, dst = source_file
-            # logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
-
-            # add blob name and number to progress message
-            if progress_callback:
-                progress_callback.message = '{}/{}: "{}"'.format(
-                    index + 1, len(source_files), normalize_blob_file_path(destination_path, dst))
-
-            include, result = _upload_blob(cmd, client, destination_container_name,
-                                           normalize_blob_file_path(destination_path, dst), src,
+            if skip_unchanged:
+                file_md5 = get_file_md5(src)
+                if _is_blob_unchanged(client, destination_container_name, blob_name, file_stat.st_size, file_md5):
+                    logger.info('skipping %s: the blob has the same size and MD5', src)
+                    if journal:
+                        journal.record(blob_name, size=file_stat.st_size, mtime=file_stat.st_mtime)
+                    return _BATCH_SKIPPED, None, None
+                # store the MD5 with the blob, so that the next batch can tell whether the file changed
+                guessed_content_settings = _with_content_md5(t_content_settings, guessed_content_settings, file_md5)
+
+            blob_progress_callback = None
+            if progress_callback and max_concurrency == 1:
+                # add blob name and number to progress message
+                progress_callback.message = '{}/{}: "{}"'.format(index + 1, len(source_files), blob_name)
+                blob_progress_callback = progress_callback
+
+            include, result = _upload_blob(cmd, client, destination_container_name, blob_name, src,
                                            blob_type=blob_type, content_settings=guessed_content_settings,
                                            metadata=metadata, validate_content=validate_content,
-                                           maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
+                                           maxsize_condition=maxsize_condition, max_connections=connections_per_blob,
+                                           lease_id=lease_id, progress_callback=blob_progress_callback,
                                            if_modified_since=if_modified_since,
                                            if_unmodified_since=if_unmodified_since, if_match=if_match,
                                            if_none_match=if_none_match, timeout=timeout)
-            if include:
-                results.append(_create_return_result(dst, guessed_content_settings, result))
+            if not include:
+                return _BATCH_FAILED, None, None
+            if journal:
+                journal.record(blob_name, size=file_stat.st_size, mtime=file_stat.st_mtime)
+            return _BATCH_SUCCEEDED, guessed_content_settings, result
+
+        # Tell progress reporter to reuse the same hook
+        if progress_callback:
+            progress_callback.reuse = True
+
+        num_skipped = 0
+        try:
+            for index, (status, blob_content_settings, result) in enumerate(
+                    run_batch_jobs(_upload_source_file, enumerate(source_files), max_workers=max_concurrency)):
+                if status == _BATCH_SUCCEEDED:
+                    results.append(_create_return_result(source_files[index][1], blob_content_settings, result))
+                elif status == _BATCH_SKIPPED:
+                    num_skipped += 1
+                if progress_callback and max_concurrency > 1:
+                    progress_callback.hook.add(message='{}/{} files'.format(index + 1, len(source_files)),
+                                               value=index + 1, total_val=len(source_files))
+        finally:
+            if journal:
+                journal.close()
         # end progress hook
         if progress_callback:
             progress_callback.hook.end()
-        num_failures = len(source_files) - len(results)
+        if num_skipped:
+            logger.warning('%s of %s files skipped as unchanged', num_skipped, len(source_files))
+        num_failures = len(source_files) - len(results) - num_skipped
         if num_failures:
             logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, len(source_files))
     return results
 
 
+def _is_blob_unchanged(client, container_name, blob_name, size, content_md5):
+    from azure.common import AzureMissingResourceHttpError
+    try:
+        properties = client.get_blob_properties(container_name, blob_name).properties
+    except AzureMissingResourceHttpError:
+        return False
+    return properties.content_length == size and properties.content_settings.content_md5 == content_md5
+
+
+def _with_content_md5(settings_class, content_settings, content_md5):
+    return settings_class(
+        content_type=content_settings.content_type,
+        content_encoding=content_settings.content_encoding,
+        content_disposition=content_settings.content_disposition,
+        content_language=content_settings.content_language,
+        content_md5=content_md5,
+        cache_control=content_settings.cache_control)
+
+
 def upload_blob(cmd, client, container_name, blob_name, file_path, blob_type=None, content_settings=None, metadata=None,
                 validate_content=False, maxsize_condition=None, max_connections=2, lease_id=None, tier=None,
                 if_modified_since=None, if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None,
@@ -371,9 +514,11 @@ def show_blob(cmd, client, container_name, blob_name, snapshot=None, lease_id=No
     return blob
 
 
-def storage_blob_delete_batch(client, source, source_container_name, pattern=None, lease_id=None,
+def storage_blob_delete_batch(cmd, client, source, source_container_name, pattern=None, lease_id=None,
                               delete_snapshots=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_concurrency=1):
+    from azure.common import AzureHttpError
+
     @check_precondition_success
     def _delete_blob(blob_name):
         delete_blob_args = {
@@ -389,10 +534,18 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
         }
         return client.delete_blob(**delete_blob_args)
 
+    def _try_delete_blob(blob_name):
+        try:
+            include, _ = _delete_blob(blob_name)
+            return _BATCH_SUCCEEDED if include else _BATCH_FAILED, None
+        except AzureHttpError as ex:
+            # keep deleting the other blobs and report the failures once all of them were processed
+            return _BATCH_FAILED, {'Blob': blob_name, 'Status': ex.status_code, 'Error': str(ex).split('\n')[0]}
+
     logger = get_logger(__name__)
-    source_blobs = list(collect_blobs(client, source_container_name, pattern))
 
     if dryrun:
+        source_blobs = list(collect_blobs(client, source_container_name, pattern))
         if if_modified_since:
             logger.warning('--if-modified-since argument is ignored when using --dry-run.')
         if if_unmodified_since:
@@ -406,10 +559,31 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
             logger.warning('  - %s', blob)
         return []
 
-    results = [result for include, result in (_delete_blob(blob) for blob in source_blobs) if include]
-    num_failures = len(source_blobs) - len(results)
-    if num_failures:
-        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, len(source_blobs))
+    num_blobs = 0
+    num_failed_preconditions = 0
+    failures = []
+    for status, failure in run_batch_jobs(_try_delete_blob, collect_blobs(client, source_container_name, pattern),
+                                          max_workers=max_concurrency):
+        num_blobs += 1
+        if status == _BATCH_FAILED and failure:
+            failures.append(failure)
+        elif status == _BATCH_FAILED:
+            num_failed_preconditions += 1
+    if num_failed_preconditions:
+        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failed_preconditions, num_blobs)
+    if failures:
+        # the command fails, so the failures are written out in the requested output format beforehand
+        _write_batch_output(cmd, failures)
+        raise CLIError('{} of {} blobs failed to be deleted.'.format(len(failures), num_blobs))
+    return None
+
+
+def _write_batch_output(cmd, result):
+    import sys
+    from knack.util import CommandResultItem
+    output = cmd.cli_ctx.output
+    output.out(CommandResultItem(result), formatter=output.get_formatter(cmd.cli_ctx.invocation.data['output']),
+               out_file=sys.stdout)
 
 
 def generate_sas_blob_uri(client, container_name, blob_name, permission=None,
@@ -438,8 +612,8 @@ def _copy_blob_to_blob_container(blob_service, source_blob_service, destination_
                                                         sas_token=source_sas)
     destination_blob_name = normalize_blob_file_path(destination_path, source_blob_name)
     try:
-        blob_service.copy_blob(destination_container, destination_blob_name, source_blob_url)
-        return blob_service.make_blob_url(destination_container, destination_blob_name)
+        return destination_blob_name, blob_service.copy_blob(destination_container, destination_blob_name,
+                                                             source_blob_url)
     except AzureException:
         error_template = 'Failed to copy blob {} to container {}.'
         raise CLIError(error_template.format(source_blob_name, destination_container))
@@ -456,8 +630,7 @@ def _copy_file_to_blob_container(blob_service, source_file_service, destination_
     destination_blob_name = normalize_blob_file_path(destination_path, source_path)
 
     try:
-        blob_service.copy_blob(destination_container, destination_blob_name, file_url)
-        return blob_service.make_blob_url(destination_container, destination_blob_name)
+        return destination_blob_name, blob_service.copy_blob(destination_container, destination_blob_name, file_url)
     except AzureException as ex:
         error_template = 'Failed to copy file {} to container {}. {}'
         raise CLIError(error_template.format(source_file_name, destination_container, ex))
@@ -13,9 +13,11 @@ from knack.log import get_logger
 from azure.cli.command_modules.storage.util import (filter_none, collect_blobs, collect_files,
                                                     create_blob_service_from_storage_client,
                                                     create_short_lived_container_sas, create_short_lived_share_sas,
-                                                    guess_content_type)
+                                                    guess_content_type, run_batch_jobs)
 from azure.cli.command_modules.storage.url_quote_util import encode_for_url, make_encoded_file_url_and_params
 
+_FILE_UPLOAD_ATTEMPTS = 3
+
 
 def create_share_url(client, share_name, unc=None, protocol=None):
     url = client.make_file_url(share_name, None, '', protocol=protocol).rstrip('/')
@@ -48,7 +50,7 @@ def list_share_files(cmd, client, share_name, directory_name=None, timeout=None,
 
 def storage_file_upload_batch(cmd, client, destination, source, destination_path=None, pattern=None, dryrun=False,
                               validate_content=False, content_settings=None, max_connections=1, metadata=None,
-                              progress_callback=None):
+                              progress_callback=None, max_concurrency=1):
     """ Upload local files to Azure Storage File Share in batch """
 
     from azure.cli.command_modules.storage.util import glob_files_locally, normalize_blob_file_path
@@ -66,16 +68,12 @@ def storage_file_upload_batch(cmd, client, destination, source, destination_path
                  'Type': guess_content_type(src, content_settings, settings_class).content_type} for src, dst in
                 source_files]
 
-    # TODO: Performance improvement
-    # 1. Upload files in parallel
-    def _upload_action(src, dst):
-        dst = normalize_blob_file_path(destination_path, dst)
-        dir_name = os.path.dirname(dst)
-        file_name = os.path.basename(dst)
-
-        _make_directory_in_files_share(client, destination, dir_name)
+    def _upload_action(source_file):
+        src, dst = source_file
+        dir_name, _, file_name = dst.rpartition('/')
         create_file_args = {'share_name': destination, 'directory_name': dir_name, 'file_name': file_name,
-                            'local_file_path': src, 'progress_callback': progress_callback,
+                            'local_file_path': src,
+                            'progress_callback': progress_callback if max_concurrency == 1 else None,
                             'content_settings': guess_content_type(src, content_settings, settings_class),
                             'metadata': metadata, 'max_connections': max_connections}
 
@@ -83,22 +81,48 @@ def storage_file_upload_batch(cmd, client, destination, source, destination_path
             create_file_args['validate_content'] = validate_content
 
         logger.warning('uploading %s', src)
-        client.create_file_from_path(**create_file_args)
+        _upload_file_with_retry(client, create_file_args)
 
         return client.make_file_url(destination, dir_name, file_name)
 
-    return list(_upload_action(src, dst) for src, dst in source_files)
+    source_files = [(src, normalize_blob_file_path(destination_path, dst)) for src, dst in source_files]
+    # create every directory once, before uploading the files in them
+    _make_directory_tree_in_files_share(client, destination, (dst.rpartition('/')[0] for _, dst in source_files),
+                                        max_concurrency)
+    return list(run_batch_jobs(_upload_action, source_files, max_workers=max_concurrency))
+
+
+def _upload_file_with_retry(file_service, create_file_args):
+    """
+    Upload a file, starting over when the upload fails with an error that can be transient, in addition to the retries
+    of the individual requests done by the SDK.
+    """
+    import time
+    from azure.common import AzureException, AzureHttpError
+    from knack.util import CLIError
+
+    for attempt in range(_FILE_UPLOAD_ATTEMPTS):
+        try:
+            return file_service.create_file_from_path(**create_file_args)
+        except AzureException as ex:
+            if isinstance(ex, AzureHttpError) and ex.status_code < 500 and ex.status_code not in [408, 429]:
+                raise
+            if attempt == _FILE_UPLOAD_ATTEMPTS - 1:
+                raise CLIError('Failed to upload {} after {} attempts: {}'.format(
+                    create_file_args['local_file_path'], _FILE_UPLOAD_ATTEMPTS, ex))
+            get_logger(__name__).warning('retrying upload of %s: %s', create_file_args['local_file_path'], ex)
+            time.sleep(2 ** attempt)
 
 
 def storage_file_download_batch(cmd, client, source, destination, pattern=None, dryrun=False, validate_content=False,
-                                max_connections=1, progress_callback=None, snapshot=None):
+                                max_connections=1, progress_callback=None, snapshot=None, max_concurrency=1):
     """
     Download files from file share to local directory in batch
     """
 
     from azure.cli.command_modules.storage.util import glob_files_remotely, mkdir_p
 
-    source_files = glob_files_remotely(cmd, client, source, pattern)
+    source_files = glob_files_remotely(cmd, client, source, pattern, max_workers=max_concurrency)
 
     if dryrun:
         source_files_list = list(source_files)
@@ -122,7 +146,8 @@ def storage_file_download_batch(cmd, client, source, destination, pattern=None,
 
         get_file_args = {'share_name': source, 'directory_name': pair[0], 'file_name': pair[1],
                          'file_path': os.path.join(destination, *pair), 'max_connections': max_connections,
-                         'progress_callback': progress_callback, 'snapshot': snapshot}
+                         'progress_callback': progress_callback if max_concurrency == 1 else None,
+                         'snapshot': snapshot}
 
         if cmd.supported_api_version(min_api='2016-05-31'):
             get_file_args['validate_content'] = validate_content
@@ -130,7 +155,7 @@ def storage_file_download_batch(cmd, client, source, destination, pattern=None,
         client.get_file_to_path(**get_file_args)
         return client.make_file_url(source, *pair)
 
-    return list(_download_action(f) for f in source_files)
+    return list(run_batch_jobs(_download_action, source_files, max_workers=max_concurrency))
 
 
 def storage_file_copy_batch(cmd, client, source_client, destination_share=None, destination_path=None,
@@ -210,7 +235,7 @@ def storage_file_copy_batch(cmd, client, source_client, destination_share=None,
     raise ValueError('Fail to find source. Neither blob container or file share is specified.')
 
 
-def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, timeout=None):
+def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, timeout=None, max_concurrency=1):
     """
     Delete files from file share in batch
     """
@@ -222,7 +247,7 @@ def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, t
         return client.delete_file(**delete_file_args)
 
     from azure.cli.command_modules.storage.util import glob_files_remotely
-    source_files = list(glob_files_remotely(cmd, client, source, pattern))
+    source_files = list(glob_files_remotely(cmd, client, source, pattern, max_workers=max_concurrency))
 
     if dryrun:
         logger = get_logger(__name__)
@@ -235,8 +260,8 @@ def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, t
             logger.warning('  - %s/%s', f[0], f[1])
         return []
 
-    for f in source_files:
-        delete_action(f)
+    for _ in run_batch_jobs(delete_action, source_files, max_workers=max_concurrency):
+        pass
 
 
 def _create_file_and_directory_from_blob(file_service, blob_service, share, container, sas, blob_name,
@@ -291,6 +316,31 @@ def _create_file_and_directory_from_file(file_service, source_file_service, shar
         raise CLIError(error_template.format(file_name, source_share, share))
 
 
+def _make_directory_tree_in_files_share(file_service, file_share, directory_paths, max_concurrency=1):
+    """
+    Create all the given directories and their parents once. The directories of a level are created in parallel, after
+    their parents on the previous level.
+    """
+    from azure.common import AzureHttpError
+    from knack.util import CLIError
+
+    levels = {}
+    for directory_path in directory_paths:
+        parts = directory_path.split('/') if directory_path else []
+        for depth in range(1, len(parts) + 1):
+            levels.setdefault(depth, set()).add('/'.join(parts[:depth]))
+
+    def _create_directory(dir_name):
+        try:
+            file_service.create_directory(share_name=file_share, directory_name=dir_name, fail_on_exist=False)
+        except AzureHttpError:
+            raise CLIError('Failed to create directory {}'.format(dir_name))
+
+    for depth in sorted(levels):
+        for _ in run_batch_jobs(_create_directory, sorted(levels[depth]), max_workers=max_concurrency):
+            pass
+
+
 def _make_directory_in_files_share(file_service, file_share, directory_path, existing_dirs=None):
     """
     Create directories recursively.
@@ -27,6 +27,14 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd(cmd, storage_account_info)
         self.assertEqual(41, sum(len(f) for r, d, f in os.walk(local_folder)))
 
+        # download in parallel, then sync again without downloading the unchanged blobs
+        local_folder = self.create_temp_dir()
+        cmd = 'storage blob download-batch -s {} -d "{}" --max-concurrency 8 --skip-unchanged'.format(
+            src_container, local_folder)
+        self.storage_cmd(cmd, storage_account_info).assert_with_checks(JMESPathCheck('length(@)', 41))
+        self.assertEqual(41, sum(len(f) for r, d, f in os.walk(local_folder)))
+        self.storage_cmd(cmd, storage_account_info).assert_with_checks(JMESPathCheck('length(@)', 0))
+
         # download recursively with wild card *, and use URL as source
         local_folder = self.create_temp_dir()
         src_url = self.storage_cmd('storage blob url -c {} -n readme -otsv', storage_account_info, src_container).output
@@ -110,6 +118,21 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd('storage blob list -c {} --prefix some_dir',
                          storage_account_info, container).assert_with_checks(JMESPathCheck('length(@)', 4))
 
+        # upload files in parallel, then upload again skipping unchanged blobs and those recorded in the journal
+        container = self.create_container(storage_account_info)
+        journal = os.path.join(self.create_temp_dir(), 'upload.journal')
+        self.storage_cmd('storage blob upload-batch -s "{}" -d {} --max-concurrency 8 --journal "{}"',
+                         storage_account_info, test_dir, container, journal)
+        self.storage_cmd('storage blob list -c {}', storage_account_info, container).assert_with_checks(
+            JMESPathCheck('length(@)', 41))
+        self.storage_cmd('storage blob upload-batch -s "{}" -d {} --max-concurrency 8 --journal "{}"',
+                         storage_account_info, test_dir, container, journal).assert_with_checks(
+                             JMESPathCheck('length(@)', 0))
+        # the service stored the MD5 of the blobs uploaded with a single Put Blob
+        self.storage_cmd('storage blob upload-batch -s "{}" -d {} --max-concurrency 8 --skip-unchanged',
+                         storage_account_info, test_dir, container).assert_with_checks(
+                             JMESPathCheck('length(@)', 0))
+
     @ResourceGroupPreparer()
     @StorageAccountPreparer()
     @StorageTestFilesPreparer()
@@ -156,6 +179,14 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd('storage file download-batch -s {} -d "{}"', storage_account_info, src_share, local_folder)
         self.assertEqual(41, sum(len(f) for r, d, f in os.walk(local_folder)))
 
+        # upload in parallel
+        src_share = self.create_share(storage_account_info)
+        local_folder = self.create_temp_dir()
+        self.storage_cmd('storage file upload-batch -s "{}" -d {} --max-concurrency 8', storage_account_info,
+                         test_dir, src_share).assert_with_checks(JMESPathCheck('length(@)', 41))
+        self.storage_cmd('storage file download-batch -s {} -d "{}"', storage_account_info, src_share, local_folder)
+        self.assertEqual(41, sum(len(f) for r, d, f in os.walk(local_folder)))
+
         # upload with pattern apple/*
         src_share = self.create_share(storage_account_info)
         local_folder = self.create_temp_dir()
@@ -235,6 +266,15 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd('storage blob list -c {}',
                          dst_account_info, dst_container).assert_with_checks(JMESPathCheck('length(@)', 4))
 
+        # from blob container to container between different accounts in parallel, waiting for the copies
+        dst_container = self.create_container(dst_account_info)
+        self.storage_cmd('storage blob copy start-batch --source-container {} '
+                         '--destination-container {} --source-account-name {} --source-account-key {}'
+                         ' --max-concurrency 8 --wait', dst_account_info, src_container, dst_container,
+                         src_account_info[0], src_account_info[1]).assert_with_checks(JMESPathCheck('length(@)', 41))
+        self.storage_cmd('storage blob list -c {} --query "[?properties.copy.status!=\'success\']"',
+                         dst_account_info, dst_container).assert_with_checks(JMESPathCheck('length(@)', 0))
+
         # from file share to blob container with a sas in same account
         dst_container = self.create_container(src_account_info)
 
@@ -386,6 +426,14 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd('storage blob list -c {}', storage_account_info, src_container).assert_with_checks(
             JMESPathCheck('length(@)', 41))
 
+        # delete in parallel, failing on the blob that cannot be deleted without deleting its snapshots
+        src_container = create_and_populate_container()
+        self.storage_cmd('storage blob snapshot -c {} -n readme', storage_account_info, src_container)
+        self.storage_cmd_negative('storage blob delete-batch -s {} --max-concurrency 8', storage_account_info,
+                                  src_container)
+        self.storage_cmd('storage blob list -c {}', storage_account_info, src_container).assert_with_checks(
+            JMESPathCheck('length(@)', 1))
+
     @ResourceGroupPreparer()
     @StorageAccountPreparer()
     @StorageTestFilesPreparer()
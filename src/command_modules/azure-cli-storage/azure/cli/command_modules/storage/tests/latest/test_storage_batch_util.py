@@ -0,0 +1,276 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from fnmatch import fnmatch
+
+import mock
+
+from azure.cli.command_modules.storage.util import (BatchJournal, collect_blobs, get_file_md5, glob_files_remotely,
+                                                    run_batch_jobs)
+
+
+class _Blob(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, name):
+        self.name = name
+        self.properties = None
+
+
+class _BlobPrefix(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, name):
+        self.name = name
+
+
+class _FakeBlobService(object):
+    def __init__(self, blob_names):
+        self.blob_names = sorted(blob_names)
+        self.list_calls = []
+
+    def list_blobs(self, container_name, prefix=None, delimiter=None):
+        self.list_calls.append((prefix, delimiter))
+        prefixes = set()
+        for name in self.blob_names:
+            if prefix and not name.startswith(prefix):
+                continue
+            rest = name[len(prefix or ''):]
+            if delimiter and delimiter in rest:
+                virtual_dir = name[:len(prefix or '') + rest.index(delimiter) + 1]
+                if virtual_dir not in prefixes:
+                    prefixes.add(virtual_dir)
+                    yield _BlobPrefix(virtual_dir)
+            else:
+                yield _Blob(name)
+
+
+class _Directory(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, name):
+        self.name = name
+
+
+class _File(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, name):
+        self.name = name
+
+
+class _FakeFileService(object):
+    def __init__(self, file_paths):
+        self.file_paths = file_paths
+        self.listed_directories = []
+        self.lock = threading.Lock()
+
+    def list_directories_and_files(self, share_name, directory_name):
+        with self.lock:
+            self.listed_directories.append(directory_name)
+        prefix = directory_name + os.sep if directory_name else ''
+        directories = set()
+        for path in self.file_paths:
+            path = os.path.join(*path.split('/'))
+            if not path.startswith(prefix):
+                continue
+            rest = path[len(prefix):].split(os.sep)
+            if len(rest) == 1:
+                yield _File(rest[0])
+            elif rest[0] not in directories:
+                directories.add(rest[0])
+                yield _Directory(rest[0])
+
+
+class TestStorageBatchUtil(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_run_batch_jobs_keeps_order(self):
+        lock = threading.Lock()
+        running = {'current': 0, 'max': 0}
+
+        def _job(item):
+            import time
+            with lock:
+                running['current'] += 1
+                running['max'] = max(running['max'], running['current'])
+            time.sleep(0.01 * (item % 3))
+            with lock:
+                running['current'] -= 1
+            return item * 2
+
+        self.assertEqual(list(run_batch_jobs(_job, iter(range(20)), max_workers=4)), [i * 2 for i in range(20)])
+        self.assertLessEqual(running['max'], 4)
+        self.assertEqual(list(run_batch_jobs(_job, range(5))), [0, 2, 4, 6, 8])
+
+    def test_run_batch_jobs_raises(self):
+        def _job(item):
+            if item == 3:
+                raise ValueError('job failed')
+            return item
+
+        results = []
+        with self.assertRaises(ValueError):
+            for result in run_batch_jobs(_job, range(10), max_workers=2):
+                results.append(result)
+        self.assertEqual(results, [0, 1, 2])
+
+    def test_batch_journal(self):
+        path = os.path.join(self.temp_dir, 'logs', 'batch.journal')
+        journal = BatchJournal(path)
+        self.assertFalse(journal.is_completed('a'))
+        journal.record('a', size=10, mtime=1.5)
+        journal.record(u'dir/\u00e9', size=3, mtime=2.0)
+        journal.close()
+
+        # a truncated line left by an interrupted batch is ignored
+        with open(path, 'a') as stream:
+            stream.write('{"name": "b", "si')
+
+        journal = BatchJournal(path)
+        self.assertTrue(journal.is_completed('a', size=10, mtime=1.5))
+        self.assertTrue(journal.is_completed(u'dir/\u00e9', size=3, mtime=2.0))
+        self.assertFalse(journal.is_completed('a', size=11, mtime=1.5))
+        self.assertFalse(journal.is_completed('b'))
+        journal.close()
+
+    def test_batch_journal_destination(self):
+        from knack.util import CLIError
+        path = os.path.join(self.temp_dir, 'batch.journal')
+        journal = BatchJournal(path, destination='https://account.blob.core.windows.net/container1/')
+        journal.record('a', size=10, mtime=1.5)
+        journal.close()
+
+        journal = BatchJournal(path, destination='https://account.blob.core.windows.net/container1/')
+        self.assertTrue(journal.is_completed('a', size=10, mtime=1.5))
+        journal.record('b', size=1, mtime=1.0)
+        journal.close()
+        with open(path, 'r') as stream:
+            self.assertEqual(len(stream.readlines()), 3)
+
+        # a journal of another destination cannot be reused
+        with self.assertRaises(CLIError):
+            BatchJournal(path, destination='https://account.blob.core.windows.net/container2/')
+
+    def test_collect_blobs_matches_fnmatch(self):
+        blob_names = ['readme', 'logs/2019/app/a.gz', 'logs/2019/app/b.txt', 'logs/2019/web/c.gz',
+                      'logs/2018/app/d.gz', 'logs/20x/app/e.gz', 'logs/2019/app/deep/f.gz', 'logsa/g.gz',
+                      'apple/file_0', 'butter/charlie/file_0', '[literal/h', 'a?b/i']
+        patterns = ['*', 'logs/*', 'logs/2019/*.gz', 'logs/20??/app/*.gz', 'logs/20[0-9][!8]/app/?.gz', 'logs?2019*',
+                    '*/file_0', 'apple/*', 'logs/2019/app/a.gz?', '[literal/*', 'a[?]b/*', 'logs/201[', 'nonexists/*']
+        for pattern in patterns:
+            service = _FakeBlobService(blob_names)
+            self.assertEqual(sorted(collect_blobs(service, 'container', pattern)),
+                             sorted(n for n in blob_names if fnmatch(n, pattern)), pattern)
+
+    def test_collect_blobs_prunes_listing(self):
+        service = _FakeBlobService(['logs/2019/app/a.gz', 'logs/2019/web/b.gz', 'logs/2018/app/c.gz', 'other/d.gz'])
+        self.assertEqual(list(collect_blobs(service, 'container', 'logs/2019/*.gz')),
+                         ['logs/2019/app/a.gz', 'logs/2019/web/b.gz'])
+        self.assertEqual(service.list_calls, [('logs/2019/', None)])
+
+        service = _FakeBlobService(['logs/2019/app/a.gz', 'logs/2019/web/b.gz', 'logs/2018/app/c.gz', 'other/d.gz'])
+        self.assertEqual(list(collect_blobs(service, 'container', 'logs/201?/app/*')),
+                         ['logs/2018/app/c.gz', 'logs/2019/app/a.gz'])
+        self.assertEqual(service.list_calls, [('logs/201', '/'), ('logs/2018/', '/'), ('logs/2018/app/', None),
+                                              ('logs/2019/', '/'), ('logs/2019/app/', None)])
+
+    def test_collect_blobs_case_insensitive_match(self):
+        service = _FakeBlobService(['logs/a.gz', 'LOGS/b.gz', 'other/c.gz'])
+        with mock.patch('azure.cli.command_modules.storage.util._is_match_case_sensitive', return_value=False), \
+                mock.patch('azure.cli.command_modules.storage.util._match_path',
+                           side_effect=lambda path, pattern: fnmatch(path.lower(), pattern.lower())):
+            self.assertEqual(sorted(collect_blobs(service, 'container', 'logs/*')), ['LOGS/b.gz', 'logs/a.gz'])
+        self.assertEqual(service.list_calls, [(None, None)])
+
+    def test_glob_files_remotely(self):
+        file_paths = ['readme', 'apple/file_0', 'apple/file_1', 'butter/file_0', 'butter/charlie/file_0',
+                      'duff/edward/file_0', 'duff/edward/file_1', 'logs/2019/app/a.gz', 'logs/2018/app/b.gz']
+        cmd = mock.MagicMock()
+        cmd.get_models.return_value = (_Directory, _File)
+
+        service = _FakeFileService(file_paths)
+        self.assertEqual(sorted('/'.join(filter(None, (d.replace(os.sep, '/'), f)))
+                                for d, f in glob_files_remotely(cmd, service, 'share', None)), sorted(file_paths))
+
+        service = _FakeFileService(file_paths)
+        self.assertEqual(sorted(glob_files_remotely(cmd, service, 'share', '*/file_0')),
+                         sorted([('apple', 'file_0'), ('butter', 'file_0'),
+                                 (os.path.join('butter', 'charlie'), 'file_0'),
+                                 (os.path.join('duff', 'edward'), 'file_0')]))
+
+        # subtrees that cannot contain a match are not listed
+        service = _FakeFileService(file_paths)
+        self.assertEqual(list(glob_files_remotely(cmd, service, 'share', 'logs/2019/*')),
+                         [(os.path.join('logs', '2019', 'app'), 'a.gz')])
+        self.assertEqual(sorted(service.listed_directories),
+                         ['', 'logs', os.path.join('logs', '2019'), os.path.join('logs', '2019', 'app')])
+
+        # the files are yielded in the order of a breadth-first walk, however many directories are listed at a time
+        expected = [('', 'readme'), ('apple', 'file_0'), ('apple', 'file_1'), ('butter', 'file_0'),
+                    (os.path.join('butter', 'charlie'), 'file_0'), (os.path.join('duff', 'edward'), 'file_0'),
+                    (os.path.join('duff', 'edward'), 'file_1'), (os.path.join('logs', '2019', 'app'), 'a.gz'),
+                    (os.path.join('logs', '2018', 'app'), 'b.gz')]
+        for max_workers in [1, 4]:
+            service = _FakeFileService(file_paths)
+            self.assertEqual(list(glob_files_remotely(cmd, service, 'share', None, max_workers=max_workers)),
+                             expected)
+
+        # the directories found are listed no more than max_workers * 2 ahead of the consumer
+        service = _FakeFileService(file_paths)
+        files = glob_files_remotely(cmd, service, 'share', None, max_workers=1)
+        self.assertEqual([next(files), next(files)], expected[:2])
+        self.assertNotIn('duff', service.listed_directories)
+        self.assertEqual(list(files), expected[2:])
+
+        # where the match ignores case, no directory is pruned
+        service = _FakeFileService(file_paths)
+        with mock.patch('azure.cli.command_modules.storage.util._is_match_case_sensitive', return_value=False):
+            self.assertEqual(list(glob_files_remotely(cmd, service, 'share', 'logs/2019/*')),
+                             [(os.path.join('logs', '2019', 'app'), 'a.gz')])
+        self.assertEqual(len(service.listed_directories), 11)
+
+    def test_download_batch_detects_collisions(self):
+        from knack.util import CLIError
+        from azure.cli.command_modules.storage.operations.blob import storage_blob_download_batch
+
+        service = _FakeBlobService(['a/b', 'c', '/a/b'])
+        service.get_blob_to_path = mock.MagicMock()
+        with self.assertRaises(CLIError):
+            storage_blob_download_batch(service, 'container', self.temp_dir, 'container', dryrun=True)
+        service.get_blob_to_path.assert_not_called()
+        with self.assertRaises(CLIError):
+            storage_blob_download_batch(service, 'container', self.temp_dir, 'container', max_concurrency=4)
+
+    def test_delete_batch_outputs_failures(self):
+        from azure.common import AzureHttpError
+        from knack.util import CLIError
+        from azure.cli.command_modules.storage.operations.blob import storage_blob_delete_batch
+
+        def _delete_blob(container_name, blob_name, **kwargs):
+            if blob_name == 'b':
+                raise AzureHttpError('Conflict\nmore details', 409)
+
+        service = _FakeBlobService(['a', 'b', 'c'])
+        service.delete_blob = mock.MagicMock(side_effect=_delete_blob)
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.invocation.data = {'output': 'json'}
+        with self.assertRaisesRegexp(CLIError, '1 of 3 blobs failed to be deleted.'):
+            storage_blob_delete_batch(cmd, service, 'container', 'container', max_concurrency=2)
+        self.assertEqual(service.delete_blob.call_count, 3)
+        cmd.cli_ctx.output.get_formatter.assert_called_once_with('json')
+        self.assertEqual(cmd.cli_ctx.output.out.call_args[0][0].result,
+                         [{'Blob': 'b', 'Status': 409, 'Error': 'Conflict'}])
+
+    def test_get_file_md5(self):
+        path = os.path.join(self.temp_dir, 'file')
+        with open(path, 'wb') as stream:
+            stream.write(b'hello world')
+        self.assertEqual(get_file_md5(path), 'XrY7u+Ae7tCTyyK7j1rNww==')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,7 +19,8 @@ from azure.cli.command_modules.storage._validators import (get_permission_valida
                                                            process_blob_source_uri, get_char_options_validator,
                                                            get_source_file_or_blob_service_client,
                                                            validate_encryption_source, validate_source_uri,
-                                                           validate_encryption_services)
+                                                           validate_encryption_services,
+                                                           process_file_batch_source_parameters)
 from azure.cli.testsdk import api_version_constraint
 
 
@@ -139,6 +140,14 @@ class TestStorageValidators(unittest.TestCase):
             process_blob_source_uri(MockCmd(self.cli),
                                     Namespace(copy_source='https://example.com', source_account_name='account_name'))
 
+    def test_storage_process_file_batch_max_concurrency(self):
+        with self.assertRaises(ValueError):
+            process_file_batch_source_parameters(MockCmd(self.cli),
+                                                 Namespace(source='share', account_name='name', max_concurrency=0))
+        namespace = Namespace(source='share', account_name='name', max_concurrency=4)
+        process_file_batch_source_parameters(MockCmd(self.cli), namespace)
+        self.assertEqual(namespace.source, 'share')
+
     def test_storage_get_char_options_validator(self):
         with self.assertRaises(ValueError) as cm:
             get_char_options_validator('abc', 'no_such_property')(object())
@@ -10,6 +10,21 @@ import os
 def collect_blobs(blob_service, container, pattern=None):
     """
     List the blobs in the given blob container, filter the blob by comparing their path to the given pattern.
+    Returns a generator of the blob names.
+    """
+    for blob in iter_blobs(blob_service, container, pattern):
+        try:
+            yield blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
+        except NameError:
+            yield blob.name
+
+
+def iter_blobs(blob_service, container, pattern=None):
+    """
+    Yield the blobs in the given blob container whose path matches the given pattern, along with their properties.
+    The literal prefix of the pattern is used to list the blobs on the service side, and virtual directories that no
+    blob matching the pattern can be under are not listed, unless the match ignores case as it does on Windows. The
+    blobs are yielded as the listing pages arrive.
     """
     if not blob_service:
         raise ValueError('missing parameter blob_service')
@@ -18,25 +33,114 @@ def collect_blobs(blob_service, container, pattern=None):
         raise ValueError('missing parameter container')
 
     if not _pattern_has_wildcards(pattern):
-        return [pattern] if blob_service.exists(container, pattern) else []
-
-    results = []
-    for blob in blob_service.list_blobs(container):
+        from azure.common import AzureMissingResourceHttpError
         try:
-            blob_name = blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
-        except NameError:
-            blob_name = blob.name
-
-        if not pattern or _match_path(blob_name, pattern):
-            results.append(blob_name)
-
-    return results
-
-
-def collect_files(cmd, file_service, share, pattern=None):
+            yield blob_service.get_blob_properties(container, pattern)
+        except AzureMissingResourceHttpError:
+            pass
+        return
+
+    if not pattern or not _is_match_case_sensitive():
+        # where _match_path ignores case, a prefix of the pattern cannot be used to narrow the listing
+        for blob in blob_service.list_blobs(container):
+            if not pattern or _match_path(blob.name, pattern):
+                yield blob
+        return
+
+    tokens = _tokenize_pattern(pattern)
+    prefix = ''
+    for kind, value in tokens:
+        if kind != 'char':
+            break
+        prefix += value
+
+    for blob in _iter_blobs_under_prefix(blob_service, container, pattern, tokens, prefix,
+                                         _advance_pattern(tokens, _close_pattern_states(tokens, {0}), prefix)):
+        yield blob
+
+
+def _iter_blobs_under_prefix(blob_service, container, pattern, tokens, prefix, states):
+    if any(state < len(tokens) and tokens[state][0] == '*' for state in states):
+        # a '*' can match the rest of any blob name, so none of the virtual directories can be pruned
+        for blob in blob_service.list_blobs(container, prefix=prefix or None):
+            if _match_path(blob.name, pattern):
+                yield blob
+        return
+
+    for item in blob_service.list_blobs(container, prefix=prefix or None, delimiter='/'):
+        if not hasattr(item, 'properties'):
+            # a BlobPrefix, or virtual directory, is only walked when a blob under it can match the pattern
+            sub_states = _advance_pattern(tokens, states, item.name[len(prefix):])
+            if sub_states:
+                for blob in _iter_blobs_under_prefix(blob_service, container, pattern, tokens, item.name, sub_states):
+                    yield blob
+        elif _match_path(item.name, pattern):
+            yield item
+
+
+def _tokenize_pattern(pattern):
+    """ Split a pattern into ('char', c), ('?', None), ('[', seq) and ('*', None) tokens, the same way fnmatch does. """
+    tokens = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if not tokens or tokens[-1][0] != '*':
+                tokens.append(('*', None))
+        elif c == '?':
+            tokens.append(('?', None))
+        elif c == '[':
+            j = i + 1
+            if j < n and pattern[j] == '!':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                tokens.append(('char', c))
+            else:
+                tokens.append(('[', pattern[i:j + 1]))
+                i = j
+        else:
+            tokens.append(('char', c))
+        i += 1
+    return tokens
+
+
+def _close_pattern_states(tokens, states):
+    closed = set()
+    for state in states:
+        closed.add(state)
+        while state < len(tokens) and tokens[state][0] == '*':
+            state += 1
+            closed.add(state)
+    return closed
+
+
+def _advance_pattern(tokens, states, text):
+    """ Return the positions in the pattern tokens that can be reached after matching text, an empty set if none. """
+    from fnmatch import fnmatchcase
+    for c in text:
+        next_states = set()
+        for state in states:
+            if state == len(tokens):
+                continue
+            kind, value = tokens[state]
+            if kind == '*':
+                next_states.add(state)
+            elif kind == '?' or (kind == '[' and fnmatchcase(c, value)) or (kind == 'char' and c == value):
+                next_states.add(state + 1)
+        states = _close_pattern_states(tokens, next_states)
+        if not states:
+            break
+    return states
+
+
+def collect_files(cmd, file_service, share, pattern=None, max_workers=1):
     """
     Search files in the the given file share recursively. Filter the files by matching their path to the given pattern.
-    Returns a iterable of tuple (dir, name).
+    Returns a iterable of tuple (dir, name). Up to max_workers directories are listed at the same time.
     """
     if not file_service:
         raise ValueError('missing parameter file_service')
@@ -47,7 +151,7 @@ def collect_files(cmd, file_service, share, pattern=None):
     if not _pattern_has_wildcards(pattern):
         return [pattern]
 
-    return glob_files_remotely(cmd, file_service, share, pattern)
+    return glob_files_remotely(cmd, file_service, share, pattern, max_workers=max_workers)
 
 
 def create_blob_service_from_storage_client(cmd, client):
@@ -81,20 +185,54 @@ def glob_files_locally(folder_path, pattern):
                 yield (full_path, full_path[len_folder_path:])
 
 
-def glob_files_remotely(cmd, client, share_name, pattern):
-    """glob the files in remote file share based on the given pattern"""
+def glob_files_remotely(cmd, client, share_name, pattern, max_workers=1):
+    """
+    glob the files in remote file share based on the given pattern. Up to max_workers directories are listed at the
+    same time, no more than max_workers * 2 ahead of the consumer, and the directories no file matching the pattern
+    can be under are not listed. The files are yielded in the order of a breadth-first walk of the share, as the
+    directories are listed.
+    """
     from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
     t_dir, t_file = cmd.get_models('file.models#Directory', 'file.models#File')
 
-    queue = deque([""])
-    while queue:
-        current_dir = queue.pop()
-        for f in client.list_directories_and_files(share_name, current_dir):
-            if isinstance(f, t_file):
-                if not pattern or _match_path(os.path.join(current_dir, f.name), pattern):
-                    yield current_dir, f.name
-            elif isinstance(f, t_dir):
-                queue.appendleft(os.path.join(current_dir, f.name))
+    # where _match_path ignores case, the case-sensitive pruning could skip directories with matching files
+    tokens = _tokenize_pattern(pattern.replace(os.sep, '/')) if pattern and _is_match_case_sensitive() else None
+
+    def _can_match_under(directory_path):
+        return not tokens or bool(_advance_pattern(tokens, _close_pattern_states(tokens, {0}), directory_path + '/'))
+
+    def _list_directory(directory):
+        return directory, list(client.list_directories_and_files(share_name, directory[0]))
+
+    max_workers = max(1, max_workers or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # each directory is tracked by its native path, which is yielded, and its '/' separated path used for pruning.
+        # the listings are consumed in the order they were submitted, so the walk does not depend on their timing, and
+        # the directories found are only submitted while fewer than max_workers * 2 listings are pending
+        queued = deque([("", "")])
+        pending = deque()
+
+        def _submit_queued():
+            while queued and len(pending) < max_workers * 2:
+                pending.append(executor.submit(_list_directory, queued.popleft()))
+
+        try:
+            _submit_queued()
+            while pending:
+                (current_dir, current_path), entries = pending.popleft().result()
+                for f in entries:
+                    if isinstance(f, t_file):
+                        if not pattern or _match_path(os.path.join(current_dir, f.name), pattern):
+                            yield current_dir, f.name
+                    elif isinstance(f, t_dir):
+                        sub_path = '/'.join((current_path, f.name)) if current_path else f.name
+                        if _can_match_under(sub_path):
+                            queued.append((os.path.join(current_dir, f.name), sub_path))
+                _submit_queued()
+        finally:
+            for future in pending:
+                future.cancel()
 
 
 def create_short_lived_blob_sas(cmd, account_name, account_key, container, blob):
@@ -172,6 +310,11 @@ def _match_path(path, pattern):
     return fnmatch(path, pattern)
 
 
+def _is_match_case_sensitive():
+    """ Whether _match_path compares case-sensitively. fnmatch normalizes the case of both sides on Windows. """
+    return os.path.normcase('aA/') == 'aA/'
+
+
 def guess_content_type(file_path, original, settings_class):
     if original.content_encoding or original.content_type:
         return original
@@ -225,3 +368,103 @@ def check_precondition_success(func):
                 raise
             return False, None
     return wrapper
+
+
+def get_file_md5(file_path):
+    """
+    Compute the base64 encoded MD5 hash of a local file, as it is reported in the Content-MD5 property of a blob.
+    """
+    import base64
+    import hashlib
+
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode('utf-8')
+
+
+def run_batch_jobs(func, items, max_workers=1):
+    """
+    Call func on each of the items with up to max_workers threads and yield the results in the order of the items.
+    Items are consumed lazily so the input can be a generator. If a call raises, the jobs that have not started are
+    cancelled and the error is raised.
+    """
+    if not max_workers or max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= max_workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class BatchJournal(object):
+    """
+    An append-only record of the entries completed by a batch command, which allows an interrupted batch to resume
+    where it stopped. Each line is a JSON object with the name of the entry and the attributes it was completed with.
+    The first line records the destination of the batch, and a journal cannot be reused for another destination.
+    """
+
+    def __init__(self, path, destination=None):
+        import json
+        import threading
+        from knack.util import CLIError
+
+        self.path = os.path.realpath(os.path.expanduser(path))
+        self.destination = destination
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._stream = None
+        if os.path.isfile(self.path):
+            with open(self.path, 'r') as stream:
+                for line in stream:
+                    try:
+                        entry = json.loads(line)
+                        if 'name' not in entry and 'destination' in entry:
+                            if entry['destination'] != destination:
+                                raise CLIError("The journal '{}' records a batch to '{}', not to '{}'. Use another "
+                                               "journal file.".format(path, entry['destination'], destination))
+                            continue
+                        self.entries[entry['name']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        # a line can be truncated when the previous batch was interrupted
+                        continue
+
+    def is_completed(self, name, **attributes):
+        entry = self.entries.get(name)
+        return entry is not None and all(entry.get(k) == v for k, v in attributes.items())
+
+    def record(self, name, **attributes):
+        import json
+
+        attributes['name'] = name
+        line = json.dumps(attributes) + '\n'
+        with self._lock:
+            if self._stream is None:
+                mkdir_p(os.path.dirname(self.path))
+                self._stream = open(self.path, 'a')
+                if not self._stream.tell():
+                    self._stream.write(json.dumps({'destination': self.destination}) + '\n')
+            self._stream.write(line)
+            self._stream.flush()
+            self.entries[name] = attributes
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
@@ -4,13 +4,20 @@
 # --------------------------------------------------------------------------------------------
 
 import json
+import os
+import threading
+import time
 
+from knack.log import get_logger
 from knack.util import CLIError
 
 from azure.cli.core.commands.parameters import get_one_of_subscription_locations
 from azure.cli.core.commands.arm import resource_exists
 
 from ._client_factory import _compute_client_factory
+from ._vm_utils import get_catalog_key, load_catalog_session
+
+logger = get_logger(__name__)
 
 
 def _resource_not_exists(cli_ctx, resource_type):
@@ -29,42 +36,159 @@ def _get_thread_count():
     return 5  # don't increase too much till https://github.com/Azure/msrestazure-for-python/issues/6 is fixed
 
 
+class _VMImageCatalog(object):
+    """
+    Caches the VM image publishers, offers, skus and versions of each location, per cloud and subscription, and the
+    image alias doc.
+
+    Every listing is persisted in a file per location under the `vmImages` directory of the configuration directory,
+    so that resolving an image only reads the catalog of its location, and is reused for `ttl` seconds. When the
+    offers of a publisher are listed again and have not changed, the skus cached for the publisher are kept for up to
+    `max_age` seconds since they were listed, so that refreshing the catalog only walks the offers of the publishers
+    whose offers changed. Versions are published without changing the offers, so they are always listed again after
+    `ttl` seconds.
+
+    `ttl` can be overridden per call, e.g. with 0 to list everything again and refresh the catalog.
+    """
+
+    DIR_NAME = 'vmImages'
+
+    def __init__(self, ttl=24 * 60 * 60, max_age=7 * 24 * 60 * 60, directory=None):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.directory = directory
+        self._sessions = {}
+        self._modified = set()
+        self._lock = threading.Lock()
+
+    def _get_session(self, key):
+        """ Returns the session persisting the catalog of the key. Must be called under the lock. """
+        session = self._sessions.get(key)
+        if session is None:
+            import hashlib
+            file_name = os.path.join(self.DIR_NAME, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+            session = self._sessions[key] = load_catalog_session(file_name, self.directory)
+        return session
+
+    def _is_fresh(self, entry, now, ttl):
+        return entry['checked'] + ttl > now and entry['listed'] + self.max_age > now
+
+    def get_cached_listing(self, client, location, path, ttl=None):
+        """ Returns the cached names listed under the path, e.g. ('Canonical', 'UbuntuServer') for the skus of an
+        offer, or None if they are not cached or expired. """
+        key = get_catalog_key(client, location)
+        if key is None:
+            return None
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._get_session(key).get(':'.join(path).lower())
+        return entry['names'] if entry and self._is_fresh(entry, time.time(), ttl) else None
+
+    def get_listing(self, client, location, path, list_names, ttl=None):
+        """ Returns the names listed under the path from the catalog, or from list_names() if they are not cached or
+        expired. """
+        names = self.get_cached_listing(client, location, path, ttl=ttl)
+        if names is not None:
+            return names
+        names = list_names()
+        key = get_catalog_key(client, location)
+        if key is None:
+            return names
+
+        path_key = ':'.join(path).lower()
+        now = time.time()
+        with self._lock:
+            listings = self._get_session(key).data
+            previous = listings.get(path_key)
+            if len(path) == 1 and previous and sorted(previous['names']) == sorted(names):
+                # the offers of the publisher did not change, keep the skus of its offers
+                prefix = path_key + ':'
+                for listing_key, entry in listings.items():
+                    if (listing_key.startswith(prefix) and ':' not in listing_key[len(prefix):] and
+                            entry['listed'] + self.max_age > now):
+                        entry['checked'] = now
+            listings[path_key] = {'names': names, 'checked': now, 'listed': now}
+            self._modified.add(key)
+        return names
+
+    def get_alias_doc(self, url, download, ttl=None):
+        """ Returns the image alias doc at the url, downloading it with download() if it is not cached or expired. """
+        key = 'aliasDoc {}'.format(url)
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._get_session(key).get('doc')
+        if entry and entry['checked'] + ttl > now:
+            return entry['doc']
+        doc = download()
+        with self._lock:
+            self._get_session(key).data['doc'] = {'doc': doc, 'checked': now}
+            self._modified.add(key)
+        return doc
+
+    def save(self):
+        with self._lock:
+            for key in list(self._modified):
+                try:
+                    self._sessions[key].save_with_retry()
+                    self._modified.discard(key)
+                except (OSError, IOError) as ex:
+                    logger.debug('Failed to save the VM image catalog: %s', ex)
+
+
+_image_catalog = _VMImageCatalog()
+
+
+def _get_image_catalog_ttl(cli_ctx):
+    """ Returns the seconds the VM image catalog is reused for, configured with `az configure` in the `vm` section or
+    through AZURE_VM_IMAGE_CATALOG_TTL. 0 lists the images again and refreshes the catalog. """
+    return cli_ctx.config.getint('vm', 'image_catalog_ttl', fallback=_image_catalog.ttl)
+
+
 def load_images_thru_services(cli_ctx, publisher, offer, sku, location):
     from concurrent.futures import ThreadPoolExecutor, as_completed
     all_images = []
     client = _compute_client_factory(cli_ctx)
     if location is None:
         location = get_one_of_subscription_locations(cli_ctx)
+    ttl = _get_image_catalog_ttl(cli_ctx)
+
+    def _list(path, list_func, *args):
+        return _image_catalog.get_listing(client, location, path,
+                                          lambda: [r.name for r in list_func(location, *args)], ttl=ttl)
 
     def _load_images_from_publisher(publisher):
-        offers = client.virtual_machine_images.list_offers(location, publisher)
+        offers = _list((publisher,), client.virtual_machine_images.list_offers, publisher)
         if offer:
-            offers = [o for o in offers if _matched(offer, o.name)]
+            offers = [o for o in offers if _matched(offer, o)]
         for o in offers:
-            skus = client.virtual_machine_images.list_skus(location, publisher, o.name)
+            skus = _list((publisher, o), client.virtual_machine_images.list_skus, publisher, o)
             if sku:
-                skus = [s for s in skus if _matched(sku, s.name)]
+                skus = [s for s in skus if _matched(sku, s)]
             for s in skus:
-                images = client.virtual_machine_images.list(location, publisher, o.name, s.name)
+                images = _list((publisher, o, s), client.virtual_machine_images.list, publisher, o, s)
                 for i in images:
                     all_images.append({
                         'publisher': publisher,
-                        'offer': o.name,
-                        'sku': s.name,
-                        'version': i.name})
-
-    publishers = client.virtual_machine_images.list_publishers(location)
-    if publisher:
-        publishers = [p for p in publishers if _matched(publisher, p.name)]
+                        'offer': o,
+                        'sku': s,
+                        'version': i})
 
-    publisher_num = len(publishers)
-    if publisher_num > 1:
-        with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
-            tasks = [executor.submit(_load_images_from_publisher, p.name) for p in publishers]
-            for t in as_completed(tasks):
-                t.result()  # don't use the result but expose exceptions from the threads
-    elif publisher_num == 1:
-        _load_images_from_publisher(publishers[0].name)
+    try:
+        publishers = _list((), client.virtual_machine_images.list_publishers)
+        if publisher:
+            publishers = [p for p in publishers if _matched(publisher, p)]
+
+        publisher_num = len(publishers)
+        if publisher_num > 1:
+            with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+                tasks = [executor.submit(_load_images_from_publisher, p) for p in publishers]
+                for t in as_completed(tasks):
+                    t.result()  # don't use the result but expose exceptions from the threads
+        elif publisher_num == 1:
+            _load_images_from_publisher(publishers[0])
+    finally:
+        _image_catalog.save()
 
     return all_images
 
@@ -78,11 +202,16 @@ def load_images_from_aliases_doc(cli_ctx, publisher=None, offer=None, sku=None):
     except CloudEndpointNotSetException:
         raise CLIError("'endpoint_vm_image_alias_doc' isn't configured. Please invoke 'az cloud update' to configure "
                        "it or use '--all' to retrieve images from server")
-    # under hack mode(say through proxies with unsigned cert), opt out the cert verification
-    response = requests.get(target_url, verify=(not should_disable_connection_verify()))
-    if response.status_code != 200:
-        raise CLIError("Failed to retrieve image alias doc '{}'. Error: '{}'".format(target_url, response))
-    dic = json.loads(response.content.decode())
+
+    def _download():
+        # under hack mode(say through proxies with unsigned cert), opt out the cert verification
+        response = requests.get(target_url, verify=(not should_disable_connection_verify()))
+        if response.status_code != 200:
+            raise CLIError("Failed to retrieve image alias doc '{}'. Error: '{}'".format(target_url, response))
+        return json.loads(response.content.decode())
+
+    dic = _image_catalog.get_alias_doc(target_url, _download, ttl=_get_image_catalog_ttl(cli_ctx))
+    _image_catalog.save()
     try:
         all_images = []
         result = (dic['outputs']['aliases']['value'])
@@ -180,12 +309,21 @@ def _create_image_instance(publisher, offer, sku, version):
 
 
 def _get_latest_image_version(cli_ctx, location, publisher, offer, sku):
-    top_one = _compute_client_factory(cli_ctx).virtual_machine_images.list(location,
-                                                                           publisher,
-                                                                           offer,
-                                                                           sku,
-                                                                           top=1,
-                                                                           orderby='name desc')
+    from distutils.version import LooseVersion  # pylint: disable=no-name-in-module,import-error
+    client = _compute_client_factory(cli_ctx)
+    versions = _image_catalog.get_cached_listing(client, location, (publisher, offer, sku),
+                                                 ttl=_get_image_catalog_ttl(cli_ctx))
+    if versions:
+        try:
+            return max(versions, key=LooseVersion)
+        except TypeError:  # versions which can't be compared
+            pass
+    top_one = client.virtual_machine_images.list(location,
+                                                 publisher,
+                                                 offer,
+                                                 sku,
+                                                 top=1,
+                                                 orderby='name desc')
     if not top_one:
         raise CLIError("Can't resolve the version of '{}:{}:{}'".format(publisher, offer, sku))
     return top_one[0].name
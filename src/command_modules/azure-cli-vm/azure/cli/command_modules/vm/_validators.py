@@ -17,12 +17,14 @@ from knack.util import CLIError
 from azure.cli.core.commands.validators import (
     get_default_location_from_resource_group, validate_file_or_dict, validate_parameter_set, validate_tags)
 from azure.cli.core.util import hash_string
-from azure.cli.command_modules.vm._vm_utils import check_existence, get_target_network_api, get_storage_blob_uri
+from azure.cli.command_modules.vm._vm_utils import (cached_lookup, check_existence, get_target_network_api,
+                                                    get_storage_blob_uri, prefetch_existence, prefetch_lookup,
+                                                    PrefetchExecutor)
 from azure.cli.command_modules.vm._template_builder import StorageProfile
 import azure.cli.core.keys as keys
 
 from ._client_factory import _compute_client_factory
-from ._actions import _get_latest_image_version
+from ._actions import _get_latest_image_version, _get_thread_count
 logger = get_logger(__name__)
 
 
@@ -316,12 +318,11 @@ def _get_storage_profile_description(profile):
 
 
 def _validate_location(cmd, namespace, zone_info, size_info):
-    from ._vm_utils import list_sku_info
+    from ._vm_utils import get_sku_info
     if not namespace.location:
         get_default_location_from_resource_group(cmd, namespace)
         if zone_info:
-            sku_infos = list_sku_info(cmd.cli_ctx, namespace.location)
-            temp = next((x for x in sku_infos if x.name.lower() == size_info.lower()), None)
+            temp = get_sku_info(cmd.cli_ctx, namespace.location, 'virtualMachines', size_info)
             # For Stack (compute - 2017-03-30), Resource_sku doesn't implement location_info property
             if not hasattr(temp, 'location_info'):
                 return
@@ -567,10 +568,10 @@ def _validate_vm_vmss_create_vnet(cmd, namespace, for_scale_set=False):
         logger.debug('no subnet specified. Attempting to find an existing Vnet and subnet...')
 
         # if nothing specified, try to find an existing vnet and subnet in the target resource group
-        client = get_network_client(cmd.cli_ctx).virtual_networks
+        vnets = cached_lookup(cmd.cli_ctx, ('virtual_networks', rg), _list_virtual_networks, cmd.cli_ctx, rg)
 
         # find VNET in target resource group that matches the VM's location with a matching subnet
-        for vnet_match in (v for v in client.list(rg) if v.location == location and v.subnets):
+        for vnet_match in (v for v in vnets if v.location == location and v.subnets):
 
             # 1 - find a suitable existing vnet/subnet
             result = None
@@ -672,8 +673,8 @@ def _validate_vm_vmss_accelerated_networking(cli_ctx, namespace):
                            'Standard_D8s_v3']
         new_4core_sizes = [x.lower() for x in new_4core_sizes]
         if size not in new_4core_sizes:
-            compute_client = _compute_client_factory(cli_ctx)
-            sizes = compute_client.virtual_machine_sizes.list(namespace.location)
+            sizes = cached_lookup(cli_ctx, ('virtual_machine_sizes', namespace.location), _list_vm_sizes, cli_ctx,
+                                  namespace.location)
             size_info = next((s for s in sizes if s.name.lower() == size), None)
             if size_info is None or size_info.number_of_cores < 8:
                 return
@@ -1008,8 +1009,9 @@ def _validate_vm_vmss_msi(cmd, namespace, from_set_command=False):
             if identities and MSI_LOCAL_ID not in identities:
                 raise CLIError("usage error: '--scope'/'--role' is only applicable when assign system identity")
             # keep 'identity_role' for output as logical name is more readable
-            setattr(namespace, 'identity_role_id', _resolve_role_id(cmd.cli_ctx, namespace.identity_role,
-                                                                    namespace.identity_scope))
+            setattr(namespace, 'identity_role_id',
+                    cached_lookup(cmd.cli_ctx, ('role_id', namespace.identity_role, namespace.identity_scope),
+                                  _resolve_role_id, cmd.cli_ctx, namespace.identity_role, namespace.identity_scope))
     elif namespace.identity_scope or getattr(namespace.identity_role, 'is_default', None) is None:
         raise CLIError('usage error: --assign-identity [--scope SCOPE] [--role ROLE]')
 
@@ -1044,31 +1046,75 @@ def _resolve_role_id(cli_ctx, role, scope):
     return role_id
 
 
+def _prefetch_vm_vmss_create_lookups(cmd, namespace, executor, for_scale_set=False):
+    """ Start the remote lookups of the create validators that only depend on the command arguments, so that they run
+    concurrently with each other and with the rest of the validation. The validators get the results through
+    cached_lookup, with the same keys. """
+    from msrestazure.tools import parse_resource_id, is_valid_resource_id
+    from ._vm_utils import MSI_LOCAL_ID
+    cli_ctx = cmd.cli_ctx
+    rg = namespace.resource_group_name
+
+    if not for_scale_set:
+        if namespace.storage_account and namespace.use_unmanaged_disk:
+            storage_id = parse_resource_id(namespace.storage_account)
+            prefetch_existence(cli_ctx, executor, storage_id['name'], storage_id.get('resource_group', rg),
+                               'Microsoft.Storage', 'storageAccounts')
+        if namespace.availability_set:
+            as_id = parse_resource_id(namespace.availability_set)
+            prefetch_existence(cli_ctx, executor, as_id['name'], as_id.get('resource_group', rg),
+                               'Microsoft.Compute', 'availabilitySets')
+        if namespace.nsg:
+            prefetch_existence(cli_ctx, executor, namespace.nsg, rg, 'Microsoft.Network', 'networkSecurityGroups')
+        if namespace.public_ip_address:
+            prefetch_existence(cli_ctx, executor, namespace.public_ip_address, rg,
+                               'Microsoft.Network', 'publicIPAddresses')
+
+    vnet, subnet = namespace.vnet_name, namespace.subnet
+    if not vnet and not subnet and not getattr(namespace, 'nics', None):
+        prefetch_lookup(cli_ctx, executor, ('virtual_networks', rg), _list_virtual_networks, cli_ctx, rg)
+    elif subnet and is_valid_resource_id(subnet) != bool(vnet) and '/' not in (vnet or ''):
+        prefetch_existence(cli_ctx, executor, subnet, rg, 'Microsoft.Network', 'subnets', vnet, 'virtualNetworks')
+
+    if namespace.proximity_placement_group:
+        ppg_id = parse_resource_id(namespace.proximity_placement_group)
+        prefetch_existence(cli_ctx, executor, ppg_id['name'], ppg_id.get('resource_group', rg),
+                           'Microsoft.Compute', 'proximityPlacementGroups')
+
+    identities = namespace.assign_identity or []
+    if namespace.assign_identity is not None and namespace.identity_scope and \
+            (not identities or MSI_LOCAL_ID in identities):
+        prefetch_lookup(cli_ctx, executor, ('role_id', namespace.identity_role, namespace.identity_scope),
+                        _resolve_role_id, cli_ctx, namespace.identity_role, namespace.identity_scope)
+
+
 def process_vm_create_namespace(cmd, namespace):
     validate_tags(namespace)
-    _validate_location(cmd, namespace, namespace.zone, namespace.size)
-    validate_asg_names_or_ids(cmd, namespace)
-    _validate_vm_create_storage_profile(cmd, namespace)
-    if namespace.storage_profile in [StorageProfile.SACustomImage,
-                                     StorageProfile.SAPirImage]:
-        _validate_vm_create_storage_account(cmd, namespace)
-
-    _validate_vm_create_availability_set(cmd, namespace)
-    _validate_vm_vmss_create_vnet(cmd, namespace)
-    _validate_vm_create_nsg(cmd, namespace)
-    _validate_vm_vmss_create_public_ip(cmd, namespace)
-    _validate_vm_create_nics(cmd, namespace)
-    _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace)
-    _validate_vm_vmss_create_auth(namespace)
-    validate_proximity_placement_group(cmd, namespace)
-
-    if namespace.secrets:
-        _validate_secrets(namespace.secrets, namespace.os_type)
-    if namespace.license_type and namespace.os_type.lower() != 'windows':
-        raise CLIError('usage error: --license-type is only applicable on Windows VM')
-    _validate_vm_vmss_msi(cmd, namespace)
-    if namespace.boot_diagnostics_storage:
-        namespace.boot_diagnostics_storage = get_storage_blob_uri(cmd.cli_ctx, namespace.boot_diagnostics_storage)
+    with PrefetchExecutor(max_workers=_get_thread_count()) as executor:
+        _prefetch_vm_vmss_create_lookups(cmd, namespace, executor)
+        _validate_location(cmd, namespace, namespace.zone, namespace.size)
+        validate_asg_names_or_ids(cmd, namespace)
+        _validate_vm_create_storage_profile(cmd, namespace)
+        if namespace.storage_profile in [StorageProfile.SACustomImage,
+                                         StorageProfile.SAPirImage]:
+            _validate_vm_create_storage_account(cmd, namespace)
+
+        _validate_vm_create_availability_set(cmd, namespace)
+        _validate_vm_vmss_create_vnet(cmd, namespace)
+        _validate_vm_create_nsg(cmd, namespace)
+        _validate_vm_vmss_create_public_ip(cmd, namespace)
+        _validate_vm_create_nics(cmd, namespace)
+        _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace)
+        _validate_vm_vmss_create_auth(namespace)
+        validate_proximity_placement_group(cmd, namespace)
+
+        if namespace.secrets:
+            _validate_secrets(namespace.secrets, namespace.os_type)
+        if namespace.license_type and namespace.os_type.lower() != 'windows':
+            raise CLIError('usage error: --license-type is only applicable on Windows VM')
+        _validate_vm_vmss_msi(cmd, namespace)
+        if namespace.boot_diagnostics_storage:
+            namespace.boot_diagnostics_storage = get_storage_blob_uri(cmd.cli_ctx, namespace.boot_diagnostics_storage)
 # endregion
 
 
@@ -1217,6 +1263,14 @@ def get_network_client(cli_ctx):
     return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cli_ctx))
 
 
+def _list_virtual_networks(cli_ctx, resource_group_name):
+    return list(get_network_client(cli_ctx).virtual_networks.list(resource_group_name))
+
+
+def _list_vm_sizes(cli_ctx, location):
+    return list(_compute_client_factory(cli_ctx).virtual_machine_sizes.list(location))
+
+
 def get_network_lb(cli_ctx, resource_group_name, lb_name):
     from msrestazure.azure_exceptions import CloudError
     network_client = get_network_client(cli_ctx)
@@ -1234,20 +1288,22 @@ def process_vmss_create_namespace(cmd, namespace):
             namespace.vm_sku = 'Standard_DS1_v2'
         else:
             namespace.vm_sku = 'Standard_D1_v2'
-    _validate_location(cmd, namespace, namespace.zones, namespace.vm_sku)
-    validate_asg_names_or_ids(cmd, namespace)
-    _validate_vm_create_storage_profile(cmd, namespace, for_scale_set=True)
-    _validate_vm_vmss_create_vnet(cmd, namespace, for_scale_set=True)
-
-    _validate_vmss_single_placement_group(namespace)
-    _validate_vmss_create_load_balancer_or_app_gateway(cmd, namespace)
-    _validate_vmss_create_subnet(namespace)
-    _validate_vmss_create_public_ip(cmd, namespace)
-    _validate_vmss_create_nsg(cmd, namespace)
-    _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace)
-    _validate_vm_vmss_create_auth(namespace)
-    _validate_vm_vmss_msi(cmd, namespace)
-    validate_proximity_placement_group(cmd, namespace)
+    with PrefetchExecutor(max_workers=_get_thread_count()) as executor:
+        _prefetch_vm_vmss_create_lookups(cmd, namespace, executor, for_scale_set=True)
+        _validate_location(cmd, namespace, namespace.zones, namespace.vm_sku)
+        validate_asg_names_or_ids(cmd, namespace)
+        _validate_vm_create_storage_profile(cmd, namespace, for_scale_set=True)
+        _validate_vm_vmss_create_vnet(cmd, namespace, for_scale_set=True)
+
+        _validate_vmss_single_placement_group(namespace)
+        _validate_vmss_create_load_balancer_or_app_gateway(cmd, namespace)
+        _validate_vmss_create_subnet(namespace)
+        _validate_vmss_create_public_ip(cmd, namespace)
+        _validate_vmss_create_nsg(cmd, namespace)
+        _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace)
+        _validate_vm_vmss_create_auth(namespace)
+        _validate_vm_vmss_msi(cmd, namespace)
+        validate_proximity_placement_group(cmd, namespace)
 
     if namespace.secrets:
         _validate_secrets(namespace.secrets, namespace.os_type)
@@ -6,6 +6,8 @@
 import json
 import os
 import re
+import threading
+import time
 try:
     from urllib.parse import urlparse
 except ImportError:
@@ -13,12 +15,16 @@ except ImportError:
 
 from knack.log import get_logger
 from knack.util import CLIError
+from six import string_types
 
 logger = get_logger(__name__)
 
 
 MSI_LOCAL_ID = '[system]'
 
+_INVOCATION_LOOKUPS_KEY = 'vm_lookups'
+_invocation_lookups_lock = threading.Lock()
+
 
 def get_target_network_api(cli_ctx):
     """ Since most compute calls don't need advanced network functionality, we can target a supported, but not
@@ -40,11 +46,79 @@ def read_content_if_is_file(string_or_file):
     return content
 
 
-def _resolve_api_version(cli_ctx, provider_namespace, resource_type, parent_path):
+def _get_invocation_lookups(cli_ctx):
+    invocation = getattr(cli_ctx, 'invocation', None)
+    data = getattr(invocation, 'data', None)
+    if not isinstance(data, dict):
+        return None
+    return data.setdefault(_INVOCATION_LOOKUPS_KEY, {})
+
+
+def cached_lookup(cli_ctx, key, func, *args):
+    """ Returns func(*args), memoized under the given key for the rest of the command invocation. If the lookup was
+    started with prefetch_lookup, waits for its result. """
+    from concurrent.futures import Future
+    future, owner = None, False
+    with _invocation_lookups_lock:
+        lookups = _get_invocation_lookups(cli_ctx)
+        if lookups is not None:
+            future = lookups.get(key)
+            if future is None:
+                future = lookups[key] = Future()
+                owner = True
+    if future is None:
+        return func(*args)
+    if owner:
+        try:
+            future.set_result(func(*args))
+        except BaseException as ex:  # pylint: disable=broad-except
+            future.set_exception(ex)
+    return future.result()
+
+
+def prefetch_lookup(cli_ctx, executor, key, func, *args):
+    """ Starts a lookup on the executor so that a later cached_lookup with the same key gets its result. """
+    with _invocation_lookups_lock:
+        lookups = _get_invocation_lookups(cli_ctx)
+        if lookups is not None and key not in lookups:
+            lookups[key] = executor.submit(func, *args)
+
+
+class PrefetchExecutor(object):
+    """ A thread pool to prefetch lookups on while the arguments are validated. When the validation fails, the lookups
+    that did not start yet are cancelled and the running ones are not waited for, so that the error is reported at
+    once. """
+
+    def __init__(self, max_workers):
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = []
+
+    def submit(self, func, *args, **kwargs):
+        future = self._executor.submit(func, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            for future in self._futures:
+                future.cancel()
+        self._executor.shutdown(wait=exc_type is None)
+        return False
+
+
+def _get_provider(cli_ctx, provider_namespace):
     from azure.cli.core.commands.client_factory import get_mgmt_service_client
     from azure.cli.core.profiles import ResourceType
     client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES)
-    provider = client.providers.get(provider_namespace)
+    return cached_lookup(cli_ctx, ('provider', provider_namespace.lower()), client.providers.get, provider_namespace)
+
+
+def _resolve_api_version(cli_ctx, provider_namespace, resource_type, parent_path):
+    provider = _get_provider(cli_ctx, provider_namespace)
 
     # If available, we will use parent resource's api-version
     resource_type_str = (parent_path.split('/')[0] if parent_path else resource_type)
@@ -69,6 +143,19 @@ def log_pprint_template(template):
 
 def check_existence(cli_ctx, value, resource_group, provider_namespace, resource_type,
                     parent_name=None, parent_type=None):
+    args = (value, resource_group, provider_namespace, resource_type, parent_name, parent_type)
+    return cached_lookup(cli_ctx, ('check_existence',) + args, _check_existence, cli_ctx, *args)
+
+
+def prefetch_existence(cli_ctx, executor, value, resource_group, provider_namespace, resource_type,
+                       parent_name=None, parent_type=None):
+    """ Starts check_existence with the given arguments on the executor. """
+    args = (value, resource_group, provider_namespace, resource_type, parent_name, parent_type)
+    prefetch_lookup(cli_ctx, executor, ('check_existence',) + args, _check_existence, cli_ctx, *args)
+
+
+def _check_existence(cli_ctx, value, resource_group, provider_namespace, resource_type,
+                     parent_name=None, parent_type=None):
     # check for name or ID and set the type flags
     from azure.cli.core.commands.client_factory import get_mgmt_service_client
     from msrestazure.azure_exceptions import CloudError
@@ -114,17 +201,163 @@ def get_key_vault_base_url(cli_ctx, vault_name):
     return 'https://{}{}'.format(vault_name, suffix)
 
 
-def list_sku_info(cli_ctx, location=None):
+def get_catalog_key(client, *parts):
+    """ Returns the key under which the resources listed with the client are cached, made of its cloud, subscription
+    and the given parts, or None if the client is not bound to a subscription. """
+    subscription_id = getattr(client.config, 'subscription_id', None)
+    base_url = getattr(client.config, 'base_url', None)
+    if not isinstance(subscription_id, string_types) or not isinstance(base_url, string_types):
+        return None
+    return ' '.join([base_url.rstrip('/').lower(), subscription_id.lower()] + [x.lower() for x in parts])
+
+
+def load_catalog_session(file_name, directory=None):
+    """ Loads the session persisting a catalog, from a path relative to the directory, the configuration directory by
+    default. """
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core._session import Session
+    path = os.path.join(directory or get_config_dir(), file_name)
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    session = Session()
+    session.load(path)
+    return session
+
+
+class _ResourceSkuCatalog(object):
+    """
+    Caches the compute resource SKUs of each cloud and subscription.
+
+    The service only lists the SKUs of every location at once, so the listing is persisted in the configuration
+    directory for `ttl` seconds, split by location and compressed. Only the SKUs of the requested location are
+    decompressed and deserialized, and they are indexed by resource type and name.
+    """
+
+    FILE_NAME = 'resourceSkus.json'
+
+    def __init__(self, ttl=24 * 60 * 60, directory=None):
+        self.ttl = ttl
+        self.directory = directory
+        self._session = None
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = load_catalog_session(self.FILE_NAME, self.directory)
+        return self._session
+
+    @staticmethod
+    def _compress(skus):
+        import base64
+        import zlib
+        return base64.b64encode(zlib.compress(json.dumps(skus).encode('utf-8'))).decode('ascii')
+
+    @staticmethod
+    def _decompress(data):
+        import base64
+        import zlib
+        return json.loads(zlib.decompress(base64.b64decode(data)).decode('utf-8'))
+
+    def _refresh(self, client, key):
+        """ Lists the SKUs of every location and saves them grouped by location. Must be called under the lock. """
+        locations = {}
+        for sku in client.resource_skus.list():
+            data = sku.serialize(keep_readonly=True)
+            for sku_location in set(x.lower() for x in (sku.locations or [''])):
+                locations.setdefault(sku_location, []).append(data)
+        entry = {'checked': time.time(), 'locations': {x: self._compress(s) for x, s in locations.items()}}
+        session = self._get_session()
+        session.data[key] = entry
+        try:
+            session.save_with_retry()
+        except (OSError, IOError) as ex:
+            logger.debug('Failed to save the resource SKU catalog: %s', ex)
+        return entry
+
+    def refresh(self, client):
+        """ Lists the SKUs again, whether the cached ones expired or not. """
+        key = get_catalog_key(client)
+        if key is not None:
+            with self._lock:
+                self._refresh(client, key)
+
+    def _get_index(self, client, location, ttl=None):
+        """ Returns the SKUs of the location (of every location if None) indexed by lower-cased resource type, and by
+        lower-cased resource type and name. """
+        key = get_catalog_key(client)
+        location = location.lower() if location else None
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._get_session().get(key)
+            if not entry or entry['checked'] + ttl <= time.time():
+                entry = self._refresh(client, key)
+            index = self._indexes.get((key, location))
+            if index and index['checked'] == entry['checked']:
+                return index
+
+            if location:
+                skus = self._decompress(entry['locations'][location]) if location in entry['locations'] else []
+            else:
+                # a SKU available in several locations is stored under each of them, list it once
+                skus = [x for sku_location, data in entry['locations'].items() for x in self._decompress(data)
+                        if sku_location == (x.get('locations') or [''])[0].lower()]
+            sku_model = client.resource_skus.models.ResourceSku
+            skus = [sku_model.deserialize(x) for x in skus]
+            index = {'checked': entry['checked'], 'skus': skus, 'by_type': {}, 'by_name': {}}
+            for sku in skus:
+                resource_type = (sku.resource_type or '').lower()
+                index['by_type'].setdefault(resource_type, []).append(sku)
+                index['by_name'].setdefault((resource_type, (sku.name or '').lower()), sku)
+            self._indexes[(key, location)] = index
+            return index
+
+    def list_skus(self, client, location=None, resource_type=None, ttl=None):
+        """ Returns the SKUs of the location, or of every location if None, optionally of a single resource type. """
+        if get_catalog_key(client) is None:
+            result = [x for x in client.resource_skus.list()
+                      if not location or location.lower() in [y.lower() for y in (x.locations or [])]]
+            if resource_type:
+                result = [x for x in result if (x.resource_type or '').lower() == resource_type.lower()]
+            return result
+        index = self._get_index(client, location, ttl)
+        return list(index['by_type'].get(resource_type.lower(), [])) if resource_type else list(index['skus'])
+
+    def get_sku(self, client, location, resource_type, name, ttl=None):
+        """ Returns the SKU of the resource type with the given name in the location, or None. """
+        if get_catalog_key(client) is None:
+            return next((x for x in self.list_skus(client, location, resource_type)
+                         if (x.name or '').lower() == name.lower()), None)
+        return self._get_index(client, location, ttl)['by_name'].get((resource_type.lower(), name.lower()))
+
+
+_resource_sku_catalog = _ResourceSkuCatalog()
+
+
+def _get_sku_catalog_ttl(cli_ctx, client):
+    """ Returns the seconds the resource SKU catalog is reused for, configured with `az configure` in the `vm` section
+    or through AZURE_VM_SKU_CATALOG_TTL. With 0, the SKUs are listed again once per command. """
+    ttl = cli_ctx.config.getint('vm', 'sku_catalog_ttl', fallback=_resource_sku_catalog.ttl)
+    if ttl > 0:
+        return ttl
+    cached_lookup(cli_ctx, ('refresh_sku_catalog',), _resource_sku_catalog.refresh, client)
+    return None
+
+
+def list_sku_info(cli_ctx, location=None, resource_type=None):
     from ._client_factory import _compute_client_factory
 
-    def _match_location(l, locations):
-        return next((x for x in locations if x.lower() == l.lower()), None)
+    def _list_sku_info():
+        client = _compute_client_factory(cli_ctx)
+        return _resource_sku_catalog.list_skus(client, location, resource_type, _get_sku_catalog_ttl(cli_ctx, client))
 
+    return cached_lookup(cli_ctx, ('list_sku_info', location, resource_type), _list_sku_info)
+
+
+def get_sku_info(cli_ctx, location, resource_type, name):
+    from ._client_factory import _compute_client_factory
     client = _compute_client_factory(cli_ctx)
-    result = client.resource_skus.list()
-    if location:
-        result = [r for r in result if _match_location(location, r.locations)]
-    return result
+    return _resource_sku_catalog.get_sku(client, location, resource_type, name, _get_sku_catalog_ttl(cli_ctx, client))
 
 
 def normalize_disk_info(image_data_disks=None,
@@ -703,51 +703,101 @@ def get_vm(cmd, resource_group_name, vm_name, expand=None):
 
 
 def get_vm_details(cmd, resource_group_name, vm_name):
-    from msrestazure.tools import parse_resource_id
     from azure.cli.command_modules.vm._vm_utils import get_target_network_api
     result = get_instance_view(cmd, resource_group_name, vm_name)
     network_client = get_mgmt_service_client(
         cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
+    _set_vm_details(result, network_client)
+    return result
+
+
+def _set_vm_details(vm, network_client, nics=None, public_ip_addresses=None):
+    """ Set the power state and the network details of a VM retrieved with its instance view. The NICs and public IP
+    addresses are looked up by lower-cased id in the given dictionaries, and retrieved one by one if not found. """
+    from msrestazure.tools import parse_resource_id
+    nics = nics or {}
+    public_ip_addresses = public_ip_addresses or {}
     public_ips = []
     fqdns = []
     private_ips = []
     mac_addresses = []
     # pylint: disable=line-too-long,no-member
-    for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+    for nic_ref in vm.network_profile.network_interfaces:
+        nic = nics.get(nic_ref.id.lower())
+        if nic is None:
+            nic_parts = parse_resource_id(nic_ref.id)
+            nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
         if nic.mac_address:
             mac_addresses.append(nic.mac_address)
         for ip_configuration in nic.ip_configurations:
             if ip_configuration.private_ip_address:
                 private_ips.append(ip_configuration.private_ip_address)
             if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
+                public_ip_info = public_ip_addresses.get(ip_configuration.public_ip_address.id.lower())
+                if public_ip_info is None:
+                    res = parse_resource_id(ip_configuration.public_ip_address.id)
+                    public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
+                                                                            res['name'])
                 if public_ip_info.ip_address:
                     public_ips.append(public_ip_info.ip_address)
                 if public_ip_info.dns_settings:
                     fqdns.append(public_ip_info.dns_settings.fqdn)
 
-    setattr(result, 'power_state',
-            ','.join([s.display_status for s in result.instance_view.statuses if s.code.startswith('PowerState/')]))
-    setattr(result, 'public_ips', ','.join(public_ips))
-    setattr(result, 'fqdns', ','.join(fqdns))
-    setattr(result, 'private_ips', ','.join(private_ips))
-    setattr(result, 'mac_addresses', ','.join(mac_addresses))
-    del result.instance_view  # we don't need other instance_view info as people won't care
-    return result
+    setattr(vm, 'power_state',
+            ','.join([s.display_status for s in vm.instance_view.statuses if s.code.startswith('PowerState/')]))
+    setattr(vm, 'public_ips', ','.join(public_ips))
+    setattr(vm, 'fqdns', ','.join(fqdns))
+    setattr(vm, 'private_ips', ','.join(private_ips))
+    setattr(vm, 'mac_addresses', ','.join(mac_addresses))
+    del vm.instance_view  # we don't need other instance_view info as people won't care
+
+
+def _list_vms_details(cmd, vms, resource_group_name=None):
+    """ Get the details of many VMs. Instead of retrieving the NICs and public IP addresses of each VM one by one,
+    they are listed once, in the whole subscription or in the resource groups referenced by the VMs of the given
+    resource group, and joined with the VMs by id. The instance views are retrieved concurrently. """
+    from concurrent.futures import ThreadPoolExecutor
+    from azure.cli.command_modules.vm._actions import _get_thread_count
+    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
+    network_client = get_mgmt_service_client(
+        cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
+
+    def _list_by_id(operations, resource_ids):
+        if resource_group_name:
+            # NICs and public IP addresses can live in other resource groups than their VM
+            groups = sorted({_parse_rg_name(i)[0].lower() for i in resource_ids})
+            resources = [r for g in groups for r in operations.list(g)]
+        elif resource_ids:
+            resources = operations.list_all()
+        else:
+            resources = []
+        return {r.id.lower(): r for r in resources}
+
+    nic_ids = {n.id.lower() for v in vms for n in v.network_profile.network_interfaces}
+    nics = _list_by_id(network_client.network_interfaces, nic_ids)
+    public_ip_addresses = _list_by_id(network_client.public_ip_addresses,
+                                      [c.public_ip_address.id for i, n in nics.items() if i in nic_ids
+                                       for c in n.ip_configurations if c.public_ip_address])
+
+    def _get_vm_details(vm):
+        result = get_instance_view(cmd, _parse_rg_name(vm.id)[0], vm.name)
+        _set_vm_details(result, network_client, nics, public_ip_addresses)
+        return result
+
+    if len(vms) <= 1:
+        return [_get_vm_details(v) for v in vms]
+    with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+        return list(executor.map(_get_vm_details, vms))
 
 
 def list_skus(cmd, location=None, size=None, zone=None, show_all=None, resource_type=None):
     from ._vm_utils import list_sku_info
-    result = list_sku_info(cmd.cli_ctx, location)
+    if (size or zone) and not resource_type:
+        resource_type = 'virtualMachines'
+    result = list_sku_info(cmd.cli_ctx, location, resource_type)
     if not show_all:
         result = [x for x in result if not [y for y in (x.restrictions or [])
                                             if y.reason_code == 'NotAvailableForSubscription']]
-    if resource_type:
-        result = [x for x in result if x.resource_type.lower() == resource_type.lower()]
     if size:
         result = [x for x in result if x.resource_type == 'virtualMachines' and size.lower() in x.name.lower()]
     if zone:
@@ -761,7 +811,7 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(cmd, _parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        return _list_vms_details(cmd, list(vm_list), resource_group_name)
 
     return list(vm_list)
 
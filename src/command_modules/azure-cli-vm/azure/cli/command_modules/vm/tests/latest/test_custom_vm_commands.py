@@ -3,6 +3,10 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+import shutil
+import tempfile
+import time
 import unittest
 import mock
 
@@ -14,7 +18,7 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _LINUX_ACCESS_EXT,
                                                  _WINDOWS_ACCESS_EXT,
                                                  _get_extension_instance_name,
-                                                 get_boot_log)
+                                                 get_boot_log, list_vm, list_skus)
 from azure.cli.command_modules.vm.custom import \
     (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
 
@@ -237,6 +241,62 @@ class TestVmCustom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client', autospec=True)
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory', autospec=True)
+    def test_list_vm_show_details(self, factory_mock, network_client_factory_mock):
+        def _id(resource_group, provider, name):
+            return '/subscriptions/sub1/resourceGroups/{}/providers/{}/{}'.format(resource_group, provider, name)
+
+        def _vm(name, nic_ids):
+            vm = mock.MagicMock()
+            vm.id, vm.name = _id('rg1', 'Microsoft.Compute/virtualMachines', name), name
+            vm.network_profile.network_interfaces = [mock.MagicMock(id=i) for i in nic_ids]
+            vm.instance_view.statuses = [InstanceViewStatus(code='PowerState/running', display_status='VM running')]
+            return vm
+
+        def _nic(nic_id, private_ip, public_ip_id=None):
+            ip_configuration = mock.MagicMock(private_ip_address=private_ip)
+            ip_configuration.public_ip_address = mock.MagicMock(id=public_ip_id) if public_ip_id else None
+            return mock.MagicMock(id=nic_id, mac_address=None, ip_configurations=[ip_configuration])
+
+        nic1 = _id('rg1', 'Microsoft.Network/networkInterfaces', 'nic1')
+        nic2 = _id('RG2', 'Microsoft.Network/networkInterfaces', 'nic2')
+        pip1 = _id('rg1', 'Microsoft.Network/publicIPAddresses', 'pip1')
+        vms = {'vm1': _vm('vm1', [nic1]), 'vm2': _vm('vm2', [nic2.lower()])}
+        compute_client = factory_mock.return_value
+        compute_client.virtual_machines.list_all.return_value = [vms['vm1'], vms['vm2']]
+        compute_client.virtual_machines.list.return_value = [vms['vm1'], vms['vm2']]
+        compute_client.virtual_machines.get.side_effect = lambda resource_group, name, expand: vms[name]
+        network_client = network_client_factory_mock.return_value
+        nics = [_nic(nic1, '10.0.0.4', pip1), _nic(nic2, '10.0.0.5')]
+        network_client.network_interfaces.list_all.return_value = nics
+        network_client.network_interfaces.list.side_effect = lambda resource_group: [
+            n for n in nics if '/resourcegroups/{}/'.format(resource_group) in n.id.lower()]
+        network_client.public_ip_addresses.list_all.return_value = [mock.MagicMock(id=pip1, ip_address='1.2.3.4',
+                                                                                   dns_settings=None)]
+        network_client.public_ip_addresses.list.return_value = []
+
+        result = list_vm(_get_test_cmd(), show_details=True)
+
+        self.assertEqual([r.name for r in result], ['vm1', 'vm2'])
+        self.assertEqual([r.private_ips for r in result], ['10.0.0.4', '10.0.0.5'])
+        self.assertEqual([r.public_ips for r in result], ['1.2.3.4', ''])
+        self.assertEqual([r.power_state for r in result], ['VM running', 'VM running'])
+        # the network resources are listed once instead of retrieved for each VM
+        network_client.network_interfaces.get.assert_not_called()
+        network_client.public_ip_addresses.get.assert_not_called()
+        self.assertEqual(compute_client.virtual_machines.get.call_count, 2)
+
+        # in a resource group, only the resource groups of the NICs and public IP addresses are listed
+        for vm in vms.values():
+            vm.instance_view = mock.MagicMock(statuses=[])
+        network_client.public_ip_addresses.get.return_value = mock.MagicMock(ip_address='1.2.3.4', dns_settings=None)
+        result = list_vm(_get_test_cmd(), resource_group_name='rg1', show_details=True)
+        self.assertEqual([r.private_ips for r in result], ['10.0.0.4', '10.0.0.5'])
+        self.assertEqual(sorted(c[0][0] for c in network_client.network_interfaces.list.call_args_list), ['rg1', 'rg2'])
+        network_client.public_ip_addresses.list.assert_called_once_with('rg1')
+        network_client.public_ip_addresses.get.assert_called_once_with('rg1', 'pip1')
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)
@@ -401,6 +461,92 @@ class TestVMBootLog(unittest.TestCase):
             get_sdk_mock.assert_called_with(cli_ctx_mock, ResourceType.DATA_STORAGE, 'blob.blockblobservice#BlockBlobService')
 
 
+class TestResourceSkuCatalog(unittest.TestCase):
+    def setUp(self):
+        from azure.cli.command_modules.vm._vm_utils import _ResourceSkuCatalog
+        self.temp_dir = tempfile.mkdtemp()
+        self.catalog = _ResourceSkuCatalog(directory=self.temp_dir)
+
+        ResourceSku = get_sdk(DummyCli(), ResourceType.MGMT_COMPUTE, 'ResourceSku', mod='models',
+                              operation_group='resource_skus')
+        self.skus = [
+            ResourceSku.deserialize({'resourceType': 'virtualMachines', 'name': 'Standard_DS1_v2',
+                                     'locations': ['eastus2'],
+                                     'locationInfo': [{'location': 'eastus2', 'zones': ['1', '2']}]}),
+            ResourceSku.deserialize({'resourceType': 'virtualMachines', 'name': 'Standard_A1', 'locations': ['eastus2'],
+                                     'locationInfo': [{'location': 'eastus2'}],
+                                     'restrictions': [{'type': 'Location', 'values': ['eastus2'],
+                                                       'reasonCode': 'NotAvailableForSubscription'}]}),
+            ResourceSku.deserialize({'resourceType': 'virtualMachines', 'name': 'Standard_DS1_v2',
+                                     'locations': ['westus'], 'locationInfo': [{'location': 'westus'}]}),
+            ResourceSku.deserialize({'resourceType': 'disks', 'name': 'Premium_LRS',
+                                     'locations': ['westus', 'eastus2']})]
+        self.client = mock.MagicMock()
+        self.client.config.subscription_id = 'sub1'
+        self.client.config.base_url = 'https://management.azure.com/'
+        self.client.resource_skus.models.ResourceSku = ResourceSku
+        self.client.resource_skus.list.side_effect = lambda: iter(self.skus)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _list_skus(self, **kwargs):
+        with mock.patch('azure.cli.command_modules.vm._vm_utils._resource_sku_catalog', self.catalog), \
+                mock.patch('azure.cli.command_modules.vm._client_factory._compute_client_factory',
+                           return_value=self.client):
+            return sorted((x.resource_type, x.name, x.locations[0]) for x in list_skus(_get_test_cmd(), **kwargs))
+
+    def test_list_skus_from_catalog(self):
+        self.assertEqual(self._list_skus(location='EastUS2'),
+                         [('disks', 'Premium_LRS', 'westus'), ('virtualMachines', 'Standard_DS1_v2', 'eastus2')])
+        self.assertEqual(self._list_skus(location='eastus2', show_all=True, resource_type='VirtualMachines'),
+                         [('virtualMachines', 'Standard_A1', 'eastus2'),
+                          ('virtualMachines', 'Standard_DS1_v2', 'eastus2')])
+        self.assertEqual(self._list_skus(size='ds1', zone=True), [('virtualMachines', 'Standard_DS1_v2', 'eastus2')])
+        # the SKU available in both locations is listed once
+        self.assertEqual(len(self._list_skus()), 3)
+        self.assertEqual(self.client.resource_skus.list.call_count, 1)
+
+        # the catalog is persisted, and listed again after the ttl
+        self.catalog._get_session().load(self.catalog._get_session().filename)
+        self.catalog._indexes = {}
+        self.assertEqual(self._list_skus(location='westus', resource_type='disks'),
+                         [('disks', 'Premium_LRS', 'westus')])
+        self.assertEqual(self.client.resource_skus.list.call_count, 1)
+        self.skus.pop()
+        with mock.patch('time.time', return_value=time.time() + 2 * 24 * 60 * 60):
+            self.assertEqual(self._list_skus(location='westus', resource_type='disks'), [])
+        self.assertEqual(self.client.resource_skus.list.call_count, 2)
+
+    def test_sku_catalog_ttl_can_be_configured(self):
+        self._list_skus(location='westus')
+        self.skus.pop()
+        # a ttl of 0 lists the SKUs again, once per command
+        with mock.patch.dict('os.environ', {'AZURE_VM_SKU_CATALOG_TTL': '0'}):
+            self.assertEqual(self._list_skus(location='westus'), [('virtualMachines', 'Standard_DS1_v2', 'westus')])
+        self.assertEqual(self.client.resource_skus.list.call_count, 2)
+        self.assertEqual(self._list_skus(location='westus'), [('virtualMachines', 'Standard_DS1_v2', 'westus')])
+        self.assertEqual(self.client.resource_skus.list.call_count, 2)
+
+    def test_validate_location_zones_from_catalog(self):
+        from azure.cli.command_modules.vm._validators import _validate_location
+        namespace = mock.MagicMock(location=None, resource_group_name='rg1')
+
+        def _set_location(location):
+            namespace.location = location
+
+        with mock.patch('azure.cli.command_modules.vm._vm_utils._resource_sku_catalog', self.catalog), \
+                mock.patch('azure.cli.command_modules.vm._client_factory._compute_client_factory',
+                           return_value=self.client), \
+                mock.patch('azure.cli.command_modules.vm._validators.get_default_location_from_resource_group',
+                           side_effect=lambda cmd, ns: _set_location('eastus2')):
+            _validate_location(_get_test_cmd(), namespace, '1', 'standard_ds1_v2')
+            namespace.location = None
+            with self.assertRaisesRegexp(CLIError, "availability zone is not yet supported"):
+                _validate_location(_get_test_cmd(), namespace, '1', 'Standard_A1')
+        self.assertEqual(self.client.resource_skus.list.call_count, 1)
+
+
 class FakedVM(object):  # pylint: disable=too-few-public-methods
     def __init__(self, nics=None, disks=None, os_disk=None):
         self.network_profile = NetworkProfile(network_interfaces=nics)
@@ -22,7 +22,9 @@ from azure.cli.command_modules.vm._validators import (_validate_vm_vmss_create_v
                                                       _validate_vm_vmss_create_auth,
                                                       _validate_vm_create_storage_profile,
                                                       _validate_vmss_single_placement_group,
-                                                      _validate_vmss_create_load_balancer_or_app_gateway)
+                                                      _validate_vmss_create_load_balancer_or_app_gateway,
+                                                      _prefetch_vm_vmss_create_lookups)
+from azure.cli.command_modules.vm._vm_utils import check_existence, PrefetchExecutor
 
 
 def _get_test_cmd():
@@ -485,5 +487,66 @@ class TestBigVMSSDefaults(unittest.TestCase):
         self.assertRaises(CLIError, _validate_vmss_create_load_balancer_or_app_gateway, cmd, ns)
 
 
+class TestVMCreatePreflight(unittest.TestCase):
+
+    @mock.patch('azure.cli.command_modules.vm._validators._list_virtual_networks', autospec=True)
+    @mock.patch('azure.cli.command_modules.vm._vm_utils._check_existence', autospec=True)
+    def test_vm_create_lookups_are_prefetched(self, check_existence_mock, list_vnets_mock):
+        from concurrent.futures import ThreadPoolExecutor
+        check_existence_mock.side_effect = lambda cli_ctx, value, *args: value != 'nsg1'
+        list_vnets_mock.return_value = []
+        cmd = _get_test_cmd()
+        cmd.cli_ctx.invocation = mock.MagicMock(data={})
+
+        ns = argparse.Namespace()
+        ns.resource_group_name = 'rg1'
+        ns.location = 'westus'
+        ns.storage_account, ns.use_unmanaged_disk = 'sa1', False
+        ns.availability_set = '/subscriptions/sub1/resourceGroups/rg2/providers/Microsoft.Compute/availabilitySets/as1'
+        ns.nsg, ns.public_ip_address = 'nsg1', ''
+        ns.vnet_name, ns.subnet, ns.nics = None, None, None
+        ns.proximity_placement_group = None
+        ns.assign_identity, ns.identity_scope = None, None
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            _prefetch_vm_vmss_create_lookups(cmd, ns, executor)
+
+        self.assertEqual(sorted(c[0][1] for c in check_existence_mock.call_args_list), ['as1', 'nsg1'])
+        list_vnets_mock.assert_called_once_with(cmd.cli_ctx, 'rg1')
+
+        # the validators get the prefetched results
+        self.assertTrue(check_existence(cmd.cli_ctx, 'as1', 'rg2', 'Microsoft.Compute', 'availabilitySets'))
+        self.assertFalse(check_existence(cmd.cli_ctx, 'nsg1', 'rg1', 'Microsoft.Network', 'networkSecurityGroups'))
+        _validate_vm_vmss_create_vnet(cmd, ns)
+        self.assertEqual(ns.vnet_type, 'new')
+        self.assertEqual(check_existence_mock.call_count, 2)
+        self.assertEqual(list_vnets_mock.call_count, 1)
+
+        # other lookups are made, and memoized, on demand
+        self.assertTrue(check_existence(cmd.cli_ctx, 'pip1', 'rg1', 'Microsoft.Network', 'publicIPAddresses'))
+        self.assertTrue(check_existence(cmd.cli_ctx, 'pip1', 'rg1', 'Microsoft.Network', 'publicIPAddresses'))
+        self.assertEqual(check_existence_mock.call_count, 3)
+
+    def test_prefetches_are_not_waited_for_on_validation_errors(self):
+        import threading
+        started, release = threading.Event(), threading.Event()
+
+        def _lookup():
+            started.set()
+            release.wait(10)
+
+        try:
+            with self.assertRaises(CLIError):
+                with PrefetchExecutor(max_workers=1) as executor:
+                    running = executor.submit(_lookup)
+                    queued = executor.submit(_lookup)
+                    started.wait(10)
+                    raise CLIError('usage error')
+            # the error is raised while the running lookup is still blocked, and the queued one never starts
+            self.assertFalse(running.done())
+            self.assertTrue(queued.cancelled())
+        finally:
+            release.set()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,9 @@
 # --------------------------------------------------------------------------------------------
 
 import os.path
+import shutil
+import tempfile
+import time
 import unittest
 import mock
 
@@ -70,5 +73,118 @@ class TestVMImage(unittest.TestCase):
             load_images_from_aliases_doc(cli_ctx)
 
 
+class _FakeImageResource(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, name):
+        self.name = name
+
+
+class TestVMImageCatalog(unittest.TestCase):
+    def setUp(self):
+        from azure.cli.command_modules.vm._actions import _VMImageCatalog
+        self.temp_dir = tempfile.mkdtemp()
+        self.catalog = _VMImageCatalog(directory=self.temp_dir)
+
+        self.images = {'Canonical': {'UbuntuServer': {'16.04-LTS': ['16.04.201901140', '16.04.201906280'],
+                                                      '18.04-LTS': ['18.04.201906271']}},
+                       'OpenLogic': {'CentOS': {'7.5': ['7.5.20180815']}}}
+        self.client = mock.MagicMock()
+        self.client.config.subscription_id = 'sub1'
+        self.client.config.base_url = 'https://management.azure.com/'
+        images = self.client.virtual_machine_images
+        images.list_publishers.side_effect = lambda loc: [_FakeImageResource(p) for p in self.images]
+        images.list_offers.side_effect = lambda loc, p: [_FakeImageResource(o) for o in self.images[p]]
+        images.list_skus.side_effect = lambda loc, p, o: [_FakeImageResource(s) for s in self.images[p][o]]
+        images.list.side_effect = lambda loc, p, o, s, **kwargs: [_FakeImageResource(v)
+                                                                  for v in self.images[p][o][s]]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _load_images(self, publisher=None, offer=None, sku=None):
+        from azure.cli.command_modules.vm._actions import load_images_thru_services
+        with mock.patch('azure.cli.command_modules.vm._actions._image_catalog', self.catalog), \
+                mock.patch('azure.cli.command_modules.vm._actions._compute_client_factory',
+                           return_value=self.client):
+            return sorted(':'.join([i['publisher'], i['offer'], i['sku'], i['version']])
+                          for i in load_images_thru_services(DummyCli(), publisher, offer, sku, 'westus'))
+
+    def _count_calls(self):
+        images = self.client.virtual_machine_images
+        counts = [images.list_publishers.call_count, images.list_offers.call_count, images.list_skus.call_count,
+                  images.list.call_count]
+        self.client.reset_mock()
+        return counts
+
+    def test_image_catalog_is_reused(self):
+        self.assertEqual(self._load_images(publisher='canonical', sku='18.04'),
+                         ['Canonical:UbuntuServer:18.04-LTS:18.04.201906271'])
+        self.assertEqual(self._count_calls(), [1, 1, 1, 1])
+
+        all_images = self._load_images()
+        self.assertEqual(len(all_images), 4)
+        # only the listings not cached yet are made
+        self.assertEqual(self._count_calls(), [0, 1, 1, 2])
+        self.assertEqual(self._load_images(), all_images)
+        self.assertEqual(self._count_calls(), [0, 0, 0, 0])
+
+        # the latest version is served from the catalog
+        from azure.cli.command_modules.vm._actions import _get_latest_image_version
+        with mock.patch('azure.cli.command_modules.vm._actions._image_catalog', self.catalog), \
+                mock.patch('azure.cli.command_modules.vm._actions._compute_client_factory',
+                           return_value=self.client):
+            self.assertEqual(_get_latest_image_version(DummyCli(), 'westus', 'Canonical', 'UbuntuServer',
+                                                       '16.04-LTS'), '16.04.201906280')
+        self.assertEqual(self._count_calls(), [0, 0, 0, 0])
+
+    def test_image_catalog_refreshes_changed_publishers(self):
+        all_images = self._load_images()
+        self._count_calls()
+
+        # after the ttl, only the publishers whose offers changed are walked again
+        now = time.time()
+        self.images['OpenLogic']['CentOS-HPC'] = {'7.6': ['7.6.20190529']}
+        with mock.patch('time.time', return_value=now + 2 * 24 * 60 * 60):
+            self.assertEqual(self._load_images(), sorted(all_images + ['OpenLogic:CentOS-HPC:7.6:7.6.20190529']))
+        self.assertEqual(self._count_calls(), [1, 2, 2, 4])
+
+        # listings older than max_age are made again, even if the offers did not change
+        with mock.patch('time.time', return_value=now + 8 * 24 * 60 * 60):
+            self._load_images()
+        self.assertEqual(self._count_calls(), [1, 2, 1, 4])
+
+    def test_image_catalog_lists_versions_again_after_ttl(self):
+        from azure.cli.command_modules.vm._actions import _get_latest_image_version
+        self._load_images()
+        self._count_calls()
+
+        # versions are published without changing the offers, so they are not kept past the ttl
+        now = time.time()
+        self.images['Canonical']['UbuntuServer']['16.04-LTS'].append('16.04.201907010')
+        with mock.patch('time.time', return_value=now + 2 * 24 * 60 * 60):
+            self.assertIn('Canonical:UbuntuServer:16.04-LTS:16.04.201907010', self._load_images())
+            with mock.patch('azure.cli.command_modules.vm._actions._image_catalog', self.catalog), \
+                    mock.patch('azure.cli.command_modules.vm._actions._compute_client_factory',
+                               return_value=self.client):
+                self.assertEqual(_get_latest_image_version(DummyCli(), 'westus', 'Canonical', 'UbuntuServer',
+                                                           '16.04-LTS'), '16.04.201907010')
+        self.assertEqual(self._count_calls(), [1, 2, 0, 3])
+
+        # the catalog of each location is kept in its own file
+        catalog_files = os.listdir(os.path.join(self.temp_dir, self.catalog.DIR_NAME))
+        self.assertEqual(len([x for x in catalog_files if x.endswith('.json')]), 1)
+
+    def test_image_catalog_ttl_can_be_configured(self):
+        all_images = self._load_images()
+        self._count_calls()
+
+        # a ttl of 0 lists everything again and refreshes the catalog
+        self.images['OpenLogic']['CentOS']['7.5'].append('7.5.20190101')
+        with mock.patch.dict('os.environ', {'AZURE_VM_IMAGE_CATALOG_TTL': '0'}):
+            self.assertEqual(self._load_images(), sorted(all_images + ['OpenLogic:CentOS:7.5:7.5.20190101']))
+        self.assertEqual(self._count_calls(), [1, 2, 2, 3])
+        self.assertEqual(len(self._load_images()), 5)
+        self.assertEqual(self._count_calls(), [0, 0, 0, 0])
+
+
 if __name__ == '__main__':
     unittest.main()